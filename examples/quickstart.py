@@ -13,12 +13,12 @@ async def main():
         mode="fast",
         observability_level="basic"
     )
-    pipeline = AsyncPipeline(config)
-    
     query = "latest advancements in quantum computing 2024"
     print(f"Searching for: {query}")
     
-    output = await pipeline.run(query)
+    # The pipeline keeps connections and models warm until the block exits
+    async with AsyncPipeline(config) as pipeline:
+        output = await pipeline.run(query)
     
     print(f"\nSearch completed in {output.elapsed_ms}ms")
     print(f"Results: {len(output.results)}")
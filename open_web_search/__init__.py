@@ -16,26 +16,13 @@ async def search(query: str, mode: str = "balanced", **kwargs) -> PipelineOutput
     """
     global _default_pipeline
     
-    # If kwargs exist, we might need a temporary config or update the global one.
-    # For simplicity in v1: Create ephemeral pipeline if custom config needed, 
-    # or reuse global if standard.
-    
     if kwargs:
-        # Custom run (Level 2)
+        # Custom run (Level 2): ephemeral pipeline, released right after the query
         cfg = LinkerConfig(mode=mode, **kwargs)
-        # Verify if we need to close this pipeline after use? 
-        # AsyncPipeline usually doesn't hold heavy persistent resources except HTTP client.
-        # But let's be safe and context manage it if possible, or just run it.
-        # AsyncPipeline doesn't utilize __aenter__ yet in code I saw, but let's check.
-        # The code in pipeline.py has a close() method.
-        pipeline = AsyncPipeline(cfg)
-        try:
+        async with AsyncPipeline(cfg) as pipeline:
             return await pipeline.run(query)
-        finally:
-            if hasattr(pipeline, 'close'): # Graceful check
-                 await pipeline.close()
 
-    # Default run (Level 1)
+    # Default run (Level 1): long-lived pipeline, connection pools and models stay warm
     if not _default_pipeline:
         _default_pipeline = AsyncPipeline(LinkerConfig(mode=mode))
         
@@ -1,6 +1,14 @@
-from typing import Optional, List, Literal, Union
+from typing import Annotated, Optional, List, Literal, Set, Union
 from pydantic import BaseModel, Field
 
+class CacheNeutral:
+    """
+    Field marker for knobs that never change a query's output (secrets, cache and resource
+    tuning). QueryResultCache.fingerprint leaves them out, so tuning them keeps cached results.
+    """
+
+CACHE_NEUTRAL = CacheNeutral()
+
 class SecurityConfig(BaseModel):
     allowed_domains: List[str] = Field(default_factory=list)
     blocked_domains: List[str] = Field(default_factory=list)
@@ -15,19 +23,31 @@ class LinkerConfig(BaseModel):
     
     # Engine Settings
     engine_provider: Literal["ddg", "google_cse", "searxng"] = "ddg"
-    engine_api_key: Optional[str] = None
+    engine_api_key: Annotated[Optional[str], CACHE_NEUTRAL] = None
     engine_base_url: Optional[str] = "http://localhost:8787"  # Default to local SearXNG
     
     # LLM Settings (For Planner/Synthesizer)
     llm_base_url: Optional[str] = None
-    llm_api_key: str = "EMPTY"
+    llm_api_key: Annotated[str, CACHE_NEUTRAL] = "EMPTY"
     llm_model: str = "gpt-3.5-turbo" # Or local model name
     
     # Reader Settings
     reader_type: Literal["trafilatura", "browser"] = "trafilatura"
-    reader_timeout: int = 10
+    reader_timeout: int = 10 # Per-URL deadline (the browser path counts navigation + rendering + extraction)
     reader_max_pages: int = 5
     reader_user_agent: str = "LinkerSearch/0.1"
+    reader_max_per_host: int = 2 # Concurrent connections per host (politeness + avoids 429s)
+    reader_host_rate: float = 2.0 # Token-bucket refill per host (requests/sec, 0 = unlimited)
+    reader_host_burst: int = 4 # Token-bucket size per host
+    reader_max_backoff: float = 60.0 # Cap on 429/503 backoff (Retry-After or exponential)
+    extraction_mode: Annotated[Literal["thread", "process"], CACHE_NEUTRAL] = "process" # HTML extraction in worker processes (multi-core) or threads
+    extraction_workers: Annotated[Optional[int], CACHE_NEUTRAL] = None # Extraction pool size (None = CPU count, capped at 8). Independent of `concurrency`
+    pdf_max_mb: int = 25 # Streamed PDF downloads are aborted past this size
+    pdf_max_pages: int = 50 # Stop parsing after this many pages (outline-matched sections first)
+    pdf_max_chars: int = 200_000 # ...or this many characters
+    browser_context_max_uses: Annotated[int, CACHE_NEUTRAL] = 50 # Pooled browser contexts are recycled after this many pages
+    browser_max_rss_mb: Annotated[Optional[int], CACHE_NEUTRAL] = None # Memory cap across Chromium processes (None = unlimited)
+    browser_readiness: Literal["adaptive", "domcontentloaded"] = "adaptive" # Return once main text stops growing / content selector appears
     
     # Crawler Settings (The Web Walker)
     use_neural_crawler: bool = False
@@ -36,6 +56,15 @@ class LinkerConfig(BaseModel):
 
     # Search Settings
     search_language: str = "auto"  # 'auto' (defaults to 'us-en'), 'en-US', 'ko-KR', etc.
+
+    search_strategy: Literal["failover", "hedged", "parallel"] = "hedged" # How multiple engines are combined
+    search_hedge_delay: float = 2.0 # Seconds before the secondary engine is launched (hedged)
+
+    # SERP Cache (per engine + query + region)
+    enable_serp_cache: bool = True
+    serp_cache_ttl: int = 3600 # Evergreen queries
+    serp_cache_news_ttl: int = 300 # Time-sensitive queries (news, prices, 'latest', years...)
+    serp_cache_stale_ttl: int = 900 # Serve stale while revalidating in the background
     
     # Refiner Settings
     chunk_size: int = 1000
@@ -45,24 +74,54 @@ class LinkerConfig(BaseModel):
     min_relevance: float = 0.01 # Lowered to accept Search Snippets (v0.5 Universality)
     enable_snippet_fallback: bool = True # Toggle for comparison experiments
     enable_stealth_escalation: bool = True # Try Playwright if Trafilatura fails
+    enable_domain_health: bool = True # Negative cache + per-domain circuit breakers (skip known-dead URLs/blocked domains)
+    circuit_failure_threshold: int = 3 # Consecutive failures before a domain's circuit opens
+    circuit_open_seconds: int = 300 # First open period (doubles per re-trip, capped at 1h), then one half-open probe
+    negative_cache_ttl: int = 900 # Max TTL for remembered blocked/errored URLs (404/410 are kept 1h)
+    enable_fetch_strategy: bool = True # Learn per host whether HTTP, the browser or the snippet works, and go there directly
+    fetch_strategy_reprobe_every: int = 10 # Re-try HTTP on every Nth URL of a host routed away from it
 
     # FlashRanker Settings (ADR 004)
-    reranker_type: Literal["fast", "flash"] = "fast" # 'fast'=Bi-Encoder, 'flash'=Cross-Encoder/SLM
+    reranker_type: Literal["fast", "flash", "cascade"] = "fast" # 'fast'=Bi-Encoder, 'flash'=Cross-Encoder/SLM, 'cascade'=BM25 -> Bi-Encoder -> Cross-Encoder
     reranker_model: str = "BAAI/bge-reranker-v2-m3" # Default Flash model
+    reranker_token_budget: Annotated[int, CACHE_NEUTRAL] = 8192 # Padded tokens per cross-encoder batch (pairs are length-sorted, batch size = budget // longest pair)
+    reranker_max_length: Optional[int] = None # Truncate (query, chunk) pairs to this many tokens up front (None = model's max length)
+    cascade_bm25_top_n: int = 50 # Cascade stage 1: chunks kept by BM25
+    cascade_bi_encoder_top_m: int = 15 # Cascade stage 2: chunks kept by MiniLM for the cross-encoder (it keeps max_evidence)
+    cascade_bi_encoder_budget_ms: Optional[int] = 1000 # Over budget: keep the BM25 order (None = no limit)
+    cascade_cross_encoder_budget_ms: Optional[int] = 3000 # No new batch after it; unscored chunks rank after scored ones
+    cascade_early_exit_margin: Optional[float] = 0.3 # Skip later stages when top score - runner-up >= margin (None = never)
     device: Literal["auto", "cpu", "cuda", "mps"] = "auto" # Inference Device
 
     # Enterprise Settings (Phase 17)
     custom_headers: dict = Field(default_factory=dict) # Cookie, Authorization, etc.
     
+    # Result Cache (whole-pipeline, query level)
+    enable_result_cache: Annotated[bool, CACHE_NEUTRAL] = True
+    result_cache_ttl: Annotated[int, CACHE_NEUTRAL] = 600 # 10 minutes
+    result_cache_max_entries: Annotated[int, CACHE_NEUTRAL] = 256
+    result_cache_similarity: Annotated[float, CACHE_NEUTRAL] = 0.95 # Cosine threshold for near-duplicate queries (>= 1.0 disables)
+
     # Runtime
     concurrency: int = 5
     max_retries: int = 2
     cache_ttl: int = 3600 # 1 hour
     cache_dir: str = ".linker_cache"
+    page_cache_memory_mb: Annotated[int, CACHE_NEUTRAL] = 64 # Hot in-memory tier of the page store (disk tier is compressed, keyed by content hash)
+    enable_embedding_cache: Annotated[bool, CACHE_NEUTRAL] = True # Chunk embeddings reused across queries/rounds (float16 memmap under cache_dir)
+    embedding_cache_size: Annotated[int, CACHE_NEUTRAL] = 50_000 # Rows before LRU eviction (~37MB for MiniLM)
 
     security: SecurityConfig = Field(default_factory=SecurityConfig)
     
-    observability_level: Literal["basic", "full"] = "basic"
+    observability_level: Annotated[Literal["basic", "full"], CACHE_NEUTRAL] = "basic"
+
+    @classmethod
+    def cache_neutral_fields(cls) -> Set[str]:
+        """Fields marked CACHE_NEUTRAL (excluded from the result cache fingerprint)."""
+        return {
+            name for name, field in cls.model_fields.items()
+            if any(isinstance(m, CacheNeutral) for m in field.metadata)
+        }
 
     def set_mode(self, mode: Literal["turbo", "fast", "balanced", "deep"]):
         """
@@ -16,6 +16,19 @@ class DeepResearchLoop:
         self.synthesizer = AnswerSynthesizer(self.config)
         self.max_depth = 2 # Allow 1 follow-up round by default
 
+    async def start(self) -> "DeepResearchLoop":
+        await self.pipeline.start()
+        return self
+
+    async def aclose(self):
+        await self.pipeline.aclose()
+
+    async def __aenter__(self) -> "DeepResearchLoop":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
     async def run(self, query: str) -> PipelineOutput:
         """
         Executes the full research loop with adaptive iteration.
@@ -1,27 +1,54 @@
 import asyncio
+import itertools
+import os
 import time
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+import numpy as np
 from loguru import logger
 
 from open_web_search.config import LinkerConfig
-from open_web_search.schemas.results import PipelineOutput, SearchResult, FetchedPage, EvidenceChunk
+from open_web_search.schemas.results import PipelineOutput, PipelineEvent, SearchResult, FetchedPage, EvidenceChunk
 
+from open_web_search.engines.base import BaseSearchEngine
+from open_web_search.engines.cached import CachedSearchEngine
 from open_web_search.engines.ddg import DuckDuckGoEngine
 from open_web_search.engines.searxng import SearxngEngine
 from open_web_search.readers.v2_reader import V2Reader
 from open_web_search.readers.pdf_reader import PdfReader
+from open_web_search.readers.router import NON_HTML_TYPES, looks_like_pdf_url
+from open_web_search.readers.strategy import FetchStrategyTable
 from open_web_search.readers.browser import PlaywrightReader
+from open_web_search.refiners.cascade import CascadeRefiner
+from open_web_search.refiners.chunks import Chunker
 from open_web_search.refiners.keyword import KeywordRefiner
 from open_web_search.refiners.hybrid import HybridRefiner
 from open_web_search.security.guards import SecurityGuard
 from open_web_search.core.planner import Planner
 from open_web_search.crawling.crawler import NeuralCrawler
 from open_web_search.crawling.analyzer import LinkAnalyzer
+from open_web_search.utils.cache import CacheManager, PageCache, TieredPageStore
+from open_web_search.utils.health import PROBE_REASON, SHORT_PAGE_CHARS, DomainHealth, classify_failure, looks_like_challenge
+from open_web_search.utils.models import ModelRegistry
+from open_web_search.utils.query_cache import QueryResultCache
+from open_web_search.utils.scheduler import FetchScheduler
 
 class AsyncPipeline:
+    """
+    Long-lived search pipeline: Plan -> Search -> Read -> Refine.
+
+    Connection pools, reader thread pools, browsers and models stay warm across runs,
+    so one instance should serve many queries. Release them explicitly:
+
+        async with AsyncPipeline(config) as pipeline:
+            output = await pipeline.run(query)
+    """
     def __init__(self, config: Optional[LinkerConfig] = None):
         self.config = config or LinkerConfig()
-        self.request_id = f"req_{int(time.time()*1000)}"
+        self._run_counter = itertools.count(1)
+        self.request_id = f"req_{int(time.time()*1000)}" # Id of the most recent run
+        self._started = False
+        self._closed = False
         
         # Initialize components
         # Initialize components
@@ -30,11 +57,11 @@ class AsyncPipeline:
         # 1. Primary: SearXNG
         if self.config.engine_provider == "searxng" and self.config.engine_base_url:
             try:
-                engines.append(SearxngEngine(
+                engines.append(self._with_serp_cache(SearxngEngine(
                     base_url=self.config.engine_base_url, 
                     language=self.config.search_language,
                     max_retries=self.config.max_retries
-                ))
+                )))
             except Exception as e:
                 logger.error(f"Failed to init SearXNG: {e}")
 
@@ -48,10 +75,10 @@ class AsyncPipeline:
             if self.config.search_language and self.config.search_language != "auto":
                 ddg_region = self.config.search_language
                 
-            engines.append(DuckDuckGoEngine(
+            engines.append(self._with_serp_cache(DuckDuckGoEngine(
                 region=ddg_region,
                 max_retries=self.config.max_retries
-            ))
+            )))
         except Exception as e:
             logger.error(f"Failed to init DDG: {e}")
             
@@ -64,35 +91,77 @@ class AsyncPipeline:
             logger.critical("No search engines available! Pipeline effectively broken.")
         
         from open_web_search.engines.composite import CompositeSearchEngine
-        self.engine = CompositeSearchEngine(engines)
+        self.engine = CompositeSearchEngine(
+            engines,
+            strategy=self.config.search_strategy,
+            hedge_delay=self.config.search_hedge_delay
+        )
             
+        # One politeness scheduler shared by every reader, the crawler and the browser fallback
+        self.scheduler = FetchScheduler(
+            max_concurrency=self.config.concurrency,
+            per_host_concurrency=self.config.reader_max_per_host,
+            per_host_rate=self.config.reader_host_rate,
+            per_host_burst=self.config.reader_host_burst,
+            max_backoff=self.config.reader_max_backoff
+        )
+
+        # Pages are chunked once (on fetch/cache load) and every refiner reuses the chunks
+        self.chunker = Chunker(self.config.chunk_size, self.config.chunk_overlap)
+
+        # PDF Reader (also takes over bodies the HTML reader sniffs as PDF)
+        self.pdf_reader = PdfReader(
+            concurrency=2,
+            scheduler=self.scheduler,
+            max_bytes=self.config.pdf_max_mb * 1024 * 1024,
+            max_pages=self.config.pdf_max_pages,
+            max_chars=self.config.pdf_max_chars,
+            extraction_mode=self.config.extraction_mode,
+            extraction_workers=self.config.extraction_workers
+        )
+
         if self.config.reader_type == "browser":
             self.reader = PlaywrightReader(
                 concurrency=self.config.concurrency,
-                custom_headers=self.config.custom_headers
+                custom_headers=self.config.custom_headers,
+                scheduler=self.scheduler,
+                context_max_uses=self.config.browser_context_max_uses,
+                max_browser_rss_mb=self.config.browser_max_rss_mb,
+                timeout=self.config.reader_timeout,
+                readiness=self.config.browser_readiness
             )
         else:
             self.reader = V2Reader(
                 concurrency=self.config.concurrency,
-                custom_headers=self.config.custom_headers
+                custom_headers=self.config.custom_headers,
+                max_per_host=self.config.reader_max_per_host,
+                timeout=self.config.reader_timeout,
+                extraction_mode=self.config.extraction_mode,
+                extraction_workers=self.config.extraction_workers,
+                scheduler=self.scheduler,
+                page_cache=self._page_cache("v2page"),
+                pdf_reader=self.pdf_reader
             )
-            
-        # PDF Reader
-        self.pdf_reader = PdfReader(concurrency=2)
         
         # Crawler (Web Walker) Integration
         self.crawler = None
         if self.config.use_neural_crawler and self.config.reader_type == "browser":
             try:
-                analyzer = LinkAnalyzer(model_name="all-MiniLM-L6-v2")
+                analyzer = LinkAnalyzer(model_name="all-MiniLM-L6-v2", device=self.config.device)
                 # We cast self.reader to PlaywrightReader since we checked the type
-                self.crawler = NeuralCrawler(reader=self.reader, analyzer=analyzer)
+                self.crawler = NeuralCrawler(reader=self.reader, analyzer=analyzer, chunker=self.chunker)
                 logger.info("Neural Web Walker enabled.")
             except Exception as e:
                 logger.error(f"Failed to init NeuralCrawler: {e}")
         
         # 4. Refiner (FlashRanker Integration - ADR 004)
-        if self.config.reranker_type == "flash":
+        if self.config.reranker_type == "cascade":
+            logger.info("[Pipeline] Using cascade reranking (BM25 -> Bi-Encoder -> Cross-Encoder)")
+            self.refiner = CascadeRefiner(
+                self.config,
+                embedding_cache_dir=os.path.join(self.config.cache_dir, "embeddings") if self.config.enable_embedding_cache else None
+            )
+        elif self.config.reranker_type == "flash":
             from open_web_search.refiners.flash import FlashRefiner
             logger.info("⚡ [Pipeline] Using FlashRanker (SLM Cross-Encoder)")
             self.refiner = FlashRefiner(self.config)
@@ -100,20 +169,129 @@ class AsyncPipeline:
             # Default Hybrid Refiner (Bi-Encoder)
             self.refiner = HybridRefiner(
                 chunk_size=self.config.chunk_size, 
-                min_relevance=self.config.min_relevance
+                chunk_overlap=self.config.chunk_overlap,
+                min_relevance=self.config.min_relevance,
+                device=self.config.device,
+                embedding_cache_dir=os.path.join(self.config.cache_dir, "embeddings") if self.config.enable_embedding_cache else None,
+                embedding_cache_size=self.config.embedding_cache_size
             )
             
+        # run_stream scores each page as it lands; with a cross-encoder that would run the model
+        # once per page and again in the final pass, so streamed events use BM25 instead
+        self.stream_refiner = self.refiner
+        if self.config.reranker_type in ("flash", "cascade"):
+            self.stream_refiner = KeywordRefiner(
+                chunk_size=self.config.chunk_size,
+                min_relevance=self.config.min_relevance,
+                top_k=self.config.max_evidence,
+                chunk_overlap=self.config.chunk_overlap
+            )
+
         self.security = SecurityGuard(self.config.security)
         self.planner = Planner(self.config)
         self._resilient_browser = None # Lazy loaded singleton for resilience
 
+        # Negative cache + per-domain circuit breakers, shared across runs and pipelines
+        self.health = None
+        if self.config.enable_domain_health:
+            self.health = DomainHealth.get_instance(
+                CacheManager.get_instance(cache_dir=self.config.cache_dir, ttl=self.config.cache_ttl),
+                failure_threshold=self.config.circuit_failure_threshold,
+                open_seconds=self.config.circuit_open_seconds,
+                negative_ttl=self.config.negative_cache_ttl
+            )
+
+        # Learned per-host fetcher choice (HTTP vs browser vs snippet), only meaningful with an HTTP reader
+        self.strategy = None
+        if self.config.enable_fetch_strategy and not isinstance(self.reader, PlaywrightReader):
+            self.strategy = FetchStrategyTable.get_instance(
+                CacheManager.get_instance(cache_dir=self.config.cache_dir, ttl=self.config.cache_ttl),
+                reprobe_every=self.config.fetch_strategy_reprobe_every
+            )
+
+    def _with_serp_cache(self, engine: BaseSearchEngine) -> BaseSearchEngine:
+        if not self.config.enable_serp_cache:
+            return engine
+        return CachedSearchEngine(
+            engine,
+            ttl=self.config.serp_cache_ttl,
+            news_ttl=self.config.serp_cache_news_ttl,
+            stale_ttl=self.config.serp_cache_stale_ttl,
+            cache=CacheManager.get_instance(cache_dir=self.config.cache_dir, ttl=self.config.cache_ttl)
+        )
+
+    async def _refine(self, pages: List[FetchedPage], query: str, output: PipelineOutput) -> List[EvidenceChunk]:
+        """Final refine of a run; the cascade records its per-stage counts/timings in output.trace."""
+        if isinstance(self.refiner, CascadeRefiner):
+            return await self.refiner.refine(pages, query, trace=output.trace.setdefault("refine", {}))
+        return await self.refiner.refine(pages, query)
+
+    def _page_cache(self, namespace: str) -> PageCache:
+        cache = CacheManager.get_instance(cache_dir=self.config.cache_dir, ttl=self.config.cache_ttl)
+        store = TieredPageStore.get_instance(cache, memory_limit_bytes=self.config.page_cache_memory_mb * 1024 * 1024)
+        return PageCache(cache, namespace=namespace, ttl=self.config.cache_ttl, store=store, chunker=self.chunker)
+
+    async def start(self) -> "AsyncPipeline":
+        """
+        Warms up resources that are otherwise created lazily on the first query
+        (browser process, cross-encoder weights). Safe to call more than once.
+        """
+        if self._closed:
+            raise RuntimeError("AsyncPipeline is closed. Create a new instance.")
+        if self._started:
+            return self
+        self._started = True
+
+        if isinstance(self.reader, PlaywrightReader):
+            await self.reader.start()
+        loop = asyncio.get_running_loop()
+        if hasattr(self.refiner, "_lazy_load"):
+            # Blocking model load, keep it off the event loop
+            await loop.run_in_executor(None, self.refiner._lazy_load)
+        await loop.run_in_executor(None, ModelRegistry.get_instance().warmup_all)
+        logger.info("[AsyncPipeline] Started (resources warm).")
+        return self
+
+    async def aclose(self):
+        """Releases connection pools, thread pools and browsers. Idempotent."""
+        if self._closed:
+            return
+        self._closed = True
+        for resource in (self.engine, self.reader, self.pdf_reader, self._resilient_browser, self.refiner):
+            if resource is None or not hasattr(resource, "close"):
+                continue
+            try:
+                result = resource.close()
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"[AsyncPipeline] Failed to close {resource.__class__.__name__}: {e}")
+        logger.info("[AsyncPipeline] Closed.")
+
+    # Backwards compatible alias
+    close = aclose
+
+    async def __aenter__(self) -> "AsyncPipeline":
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+
     async def run(self, query: str, context: Optional[dict] = None) -> PipelineOutput:
         start_time = time.time()
-        logger.info(f"[{self.request_id}] Pipeline started for query: {query}")
+        req_id = self._new_request_id()
+        logger.info(f"[{req_id}] Pipeline started for query: {query}")
         
         output = PipelineOutput(query=query)
         if context and "blocked_domains" in context:
-            logger.info(f"[{self.request_id}] Context awareness: Blocked {context['blocked_domains']}")
+            logger.info(f"[{req_id}] Context awareness: Blocked {context['blocked_domains']}")
+
+        if self.config.enable_result_cache:
+            cached, cache_stats = await self._lookup_result_cache(query, context, start_time)
+            if cached:
+                logger.info(f"[{req_id}] Result cache hit ({cache_stats['match']}) for query: {query}")
+                return cached
+            output.telemetry["result_cache"] = cache_stats
         
         try:
             # 1. Plan
@@ -121,51 +299,34 @@ class AsyncPipeline:
             output.rewritten_queries = rewritten_queries
             
             # 2. Search
-            logger.info(f"[{self.request_id}] Rewritten Queries: {rewritten_queries}")
-            results = await self.engine.search(rewritten_queries)
+            logger.info(f"[{req_id}] Rewritten Queries: {rewritten_queries}")
+            results, search_stats = await self.engine.search_with_telemetry(rewritten_queries)
             output.results = results
-            logger.info(f"[{self.request_id}] Found {len(results)} results")
+            if search_stats:
+                output.telemetry["search"] = search_stats
+            logger.info(f"[{req_id}] Found {len(results)} results")
             
             if not results:
                 return output
 
             # 3. Filter & Read (or Crawl)
-            urls = []
-            pdf_urls = []
-            
-            for r in results:
-                if self.security.is_allowed_url(r.url):
-                    # Robust PDF Detection
-                    lower_url = r.url.lower()
-                    if lower_url.endswith(".pdf") or "/pdf/" in lower_url:
-                        pdf_urls.append(r.url)
-                    else:
-                        urls.append(r.url)
-                        
-                    if len(urls) + len(pdf_urls) >= self.config.reader_max_pages:
-                        break
+            urls, pdf_urls = self._select_targets(results, seen=set())
             
-            logger.debug(f"[{self.request_id}] Target URLs: {len(urls)} HTML, {len(pdf_urls)} PDF")
+            logger.debug(f"[{req_id}] Target URLs: {len(urls)} HTML, {len(pdf_urls)} PDF")
             
             pages = []
             
             # --- EXTREME OPTIMIZATION: ZERO-FETCH TURBO MODE ---
             if getattr(self.config, "mode", "balanced") == "turbo":
-                logger.info(f"[{self.request_id}] ⚡ TURBO MODE: Bypassing Reader, using Search Snippets only.")
+                logger.info(f"[{req_id}] ⚡ TURBO MODE: Bypassing Reader, using Search Snippets only.")
                 # Directly construct virtual pages from snippets
                 for r in results:
                     if r.url in urls or r.url in pdf_urls:
-                        vp = FetchedPage(
-                            url=r.url,
-                            title=r.title,
-                            text_plain=f"Source: {r.url}\nTitle: {r.title}\n\nSummary (from Search Engine):\n{r.snippet}",
-                            status_code=200
-                        )
-                        pages.append(vp)
+                        pages.append(self._snippet_page(r))
             else:
                 # Browser/Standard Reading
                 if self.crawler:
-                    logger.info(f"[{self.request_id}] Engaging Neural Web Walker...")
+                    logger.info(f"[{req_id}] Engaging Neural Web Walker...")
                     # Crawl recursively starting from HTML URLs
                     if urls:
                         pages.extend(await self.crawler.crawl(
@@ -175,19 +336,25 @@ class AsyncPipeline:
                             depth=self.config.crawler_max_depth
                         ))
                 elif urls:
-                    logger.debug(f"[{self.request_id}] Reading {len(urls)} pages (Standard)")
-                    pages.extend(await self.reader.read_many(urls))
+                    # Known-dead URLs and open circuits skip the HTTP fetch entirely
+                    routing = output.telemetry.setdefault("fetch_routing", self._new_routing_stats())
+                    fetch_urls, browser_urls, skipped = self._route_reads(urls, req_id, routing)
+                    logger.debug(f"[{req_id}] Reading {len(fetch_urls)} pages (Standard)")
+                    if fetch_urls:
+                        pages.extend(await self._read_http(fetch_urls))
+                    pages.extend(self._routed_page(url, "browser") for url in browser_urls)
                     
                     # --- STEALTH ESCALATION (Phase 16 - Resilient Upgrade) ---
                     if self.config.enable_stealth_escalation and not isinstance(self.reader, PlaywrightReader):
-                        pages, stats = await self._recover_with_browser(pages, self.request_id)
+                        pages, stats = await self._recover_with_browser(pages, req_id)
                         output.telemetry.update(stats)
                     # -------------------------------------
+                    pages.extend(skipped)
                 
                 # PDF Reading
                 if pdf_urls and self.pdf_reader:
-                    logger.debug(f"[{self.request_id}] Reading {len(pdf_urls)} PDF documents")
-                    pages.extend(await self.pdf_reader.read_many(pdf_urls))
+                    logger.debug(f"[{req_id}] Reading {len(pdf_urls)} PDF documents")
+                    pages.extend(await self.pdf_reader.read_many(pdf_urls, query=query))
             
             
             # Sanitize pages
@@ -198,77 +365,452 @@ class AsyncPipeline:
             url_to_snippet = {r.url: (r.snippet, r.title) for r in results}
             
             for p in pages:
-                if p.text_plain:
-                    p.text_plain = self.security.sanitize_text(p.text_plain)
-                if p.text_markdown:
-                    p.text_markdown = self.security.sanitize_text(p.text_markdown)
-                
-                # Check for blocking/failure
-                is_failed = False
-                if not p.text_plain or len(p.text_plain) < 50:
-                    is_failed = True
-                if p.error or (p.status_code and p.status_code >= 400):
-                    is_failed = True
-                
-                # Cognitive Unblocking: Always track blocked/failed domains
-                if is_failed:
-                     try:
-                         from urllib.parse import urlparse
-                         domain = urlparse(p.url).netloc.replace("www.", "")
-                         # Basic dedupe
-                         if domain not in output.blocked_domains:
-                             output.blocked_domains.append(domain)
-                     except:
-                         pass
-
-                if is_failed and self.config.enable_snippet_fallback:
-                     snippet, original_title = url_to_snippet.get(p.url, ("", ""))
-                     if snippet and len(snippet) > 20:
-                         logger.warning(f"[{self.request_id}] Fallback to Snippet for {p.url} (Reason: {p.error or 'Blocked'})")
-                         # Construct fallback page
-                         p.text_plain = f"Source: {p.url}\nTitle: {original_title}\n\nSummary (from Search Engine):\n{snippet}"
-                         p.text_markdown = p.text_plain
-                         p.error = None # Clear error so it is processed
-                         p.status_code = 200 # Soft success
-                     else:
-                         # Truly dead
-                         logger.warning(f"[{self.request_id}] Page dead and no snippet: {p.url}")
-                         continue
-                
-                final_pages.append(p)
+                final_page = self._finalize_page(p, url_to_snippet, output, req_id)
+                if final_page is not None:
+                    final_pages.append(final_page)
             
             output.pages = final_pages
             
             # 4. Refine
-            logger.debug(f"[{self.request_id}] Refining evidence")
-            evidence = await self.refiner.refine(pages, query)
+            logger.debug(f"[{req_id}] Refining evidence")
+            evidence = await self._refine(pages, query, output)
             output.evidence = evidence
-            logger.info(f"[{self.request_id}] Extracted {len(evidence)} evidence chunks")
+            logger.info(f"[{req_id}] Extracted {len(evidence)} evidence chunks")
+            await self._store_result_cache(query, context, output)
 
         except Exception as e:
-            logger.exception(f"[{self.request_id}] Pipeline failed")
+            logger.exception(f"[{req_id}] Pipeline failed")
             output.trace["error"] = str(e)
         
         finally:
             output.elapsed_ms = int((time.time() - start_time) * 1000)
             output.trace["total_ms"] = output.elapsed_ms
-            # Clean up if needed
-            if hasattr(self.engine, 'close'):
-                if asyncio.iscoroutinefunction(self.engine.close):
-                    await self.engine.close()
-            # If we didn't use crawler, close reader? Reader usually shared or persistent?
-            # PlaywrightReader usually needs explicit close if it started the browser.
-            # But here we might want to keep it open? 
-            # For now, let's close it to be safe and avoid zombies in CLI usage.
-            if hasattr(self.reader, 'close'):
-                 await self.reader.close()
-            # Cleanup Resilient Browser if initialized
-            if self._resilient_browser and hasattr(self._resilient_browser, 'close'):
-                await self._resilient_browser.close()
+            # Resources are intentionally kept warm for the next run; see aclose().
             
         return output
 
-        return output
+    async def run_stream(
+        self,
+        query: str,
+        context: Optional[dict] = None,
+        deadline: Optional[float] = None
+    ) -> AsyncIterator[PipelineEvent]:
+        """
+        Streaming variant of `run` with overlapped stages.
+        Pages start fetching as soon as each rewritten query returns, and every page is
+        sanitized and scored as soon as it lands, so the slowest URL no longer gates the
+        evidence of the fast ones.
+
+        Yields PipelineEvents ('plan', 'results', 'page', 'evidence') and always finishes
+        with a 'done' event carrying the full PipelineOutput.
+        If `deadline` (seconds) expires, outstanding fetches are cancelled and the best
+        evidence found so far is returned.
+        """
+        start_time = time.time()
+        req_id = self._new_request_id()
+        expires_at = start_time + deadline if deadline else None
+        logger.info(f"[{req_id}] Streaming pipeline started for query: {query} (deadline={deadline})")
+
+        output = PipelineOutput(query=query)
+        stream_stats = {"deadline_hit": False, "first_evidence_ms": None, "pages_pending": 0}
+        output.telemetry["stream"] = stream_stats
+        if context and "blocked_domains" in context:
+            logger.info(f"[{req_id}] Context awareness: Blocked {context['blocked_domains']}")
+
+        if self.config.enable_result_cache:
+            cached, cache_stats = await self._lookup_result_cache(query, context, start_time)
+            if cached:
+                logger.info(f"[{req_id}] Result cache hit ({cache_stats['match']}) for query: {query}")
+                yield PipelineEvent(type="done", elapsed_ms=cached.elapsed_ms, output=cached)
+                return
+            output.telemetry["result_cache"] = cache_stats
+
+        def remaining() -> Optional[float]:
+            if expires_at is None:
+                return None
+            return max(0.0, expires_at - time.time())
+
+        def event(event_type: str, **payload) -> PipelineEvent:
+            return PipelineEvent(type=event_type, elapsed_ms=int((time.time() - start_time) * 1000), **payload)
+
+        queue: asyncio.Queue = asyncio.Queue()
+        tasks: Set[asyncio.Task] = set()
+        seen_urls: Set[str] = set()
+        crawl_urls: List[str] = []
+        url_to_snippet: Dict[str, Tuple[Optional[str], str]] = {}
+        partial_evidence: List[EvidenceChunk] = []
+        is_turbo = getattr(self.config, "mode", "balanced") == "turbo"
+
+        def spawn(coro) -> None:
+            task = asyncio.ensure_future(coro)
+            tasks.add(task)
+
+            def _on_done(t: asyncio.Task) -> None:
+                tasks.discard(t)
+                queue.put_nowait(None)  # Wake the consumer so it can re-check for completion
+            task.add_done_callback(_on_done)
+
+        async def handle_page(page: FetchedPage, is_pdf: bool, escalate: bool = True) -> None:
+            if (escalate and not is_pdf and self.config.enable_stealth_escalation
+                    and not isinstance(self.reader, PlaywrightReader) and self._needs_recovery(page)):
+                recovered, stats = await self._recover_with_browser([page], req_id)
+                page = recovered[0]
+                self._merge_recovery_stats(output.telemetry, stats)
+
+            final_page = self._finalize_page(page, url_to_snippet, output, req_id)
+            if final_page is None:
+                return
+            output.pages.append(final_page)
+            await queue.put(event("page", page=final_page))
+
+            chunks = await self.stream_refiner.refine([final_page], query) # Model rerank happens once, in the final pass
+            if chunks:
+                if stream_stats["first_evidence_ms"] is None:
+                    stream_stats["first_evidence_ms"] = int((time.time() - start_time) * 1000)
+                partial_evidence.extend(chunks)
+                await queue.put(event("evidence", evidence=chunks))
+
+        async def fetch(url: str, is_pdf: bool) -> None:
+            try:
+                if is_pdf:
+                    pages = await self.pdf_reader.read_many([url], query=query)
+                else:
+                    pages = await self._read_http([url])
+                for page in pages:
+                    await handle_page(page, is_pdf)
+            except Exception as e:
+                logger.warning(f"[{req_id}] Streamed fetch failed for {url}: {e}")
+
+        async def search_phase(rewritten_queries: List[str]) -> None:
+            try:
+                async for batch in self.engine.search_stream(rewritten_queries):
+                    fresh = [r for r in batch if r.url not in url_to_snippet]
+                    if not fresh:
+                        continue
+                    for r in fresh:
+                        url_to_snippet[r.url] = (r.snippet, r.title)
+                    output.results.extend(fresh)
+                    await queue.put(event("results", results=fresh))
+
+                    urls, pdf_urls = self._select_targets(fresh, seen=seen_urls)
+                    if is_turbo:
+                        for r in fresh:
+                            if r.url in urls or r.url in pdf_urls:
+                                await handle_page(self._snippet_page(r), is_pdf=False)
+                        continue
+                    if self.crawler:
+                        # The Web Walker is a sequential best-first search, it starts once all seeds are known
+                        crawl_urls.extend(urls)
+                    else:
+                        routing = output.telemetry.setdefault("fetch_routing", self._new_routing_stats())
+                        fetch_urls, browser_urls, skipped = self._route_reads(urls, req_id, routing)
+                        for url in fetch_urls:
+                            spawn(fetch(url, is_pdf=False))
+                        for url in browser_urls:
+                            spawn(handle_page(self._routed_page(url, "browser"), is_pdf=False))
+                        for page in skipped:
+                            await handle_page(page, is_pdf=False, escalate=False)
+                    if self.pdf_reader:
+                        for url in pdf_urls:
+                            spawn(fetch(url, is_pdf=True))
+
+                if self.crawler and crawl_urls:
+                    logger.info(f"[{req_id}] Engaging Neural Web Walker...")
+                    crawled = await self.crawler.crawl(
+                        start_urls=crawl_urls,
+                        query=query,
+                        max_pages=self.config.crawler_max_pages,
+                        depth=self.config.crawler_max_depth
+                    )
+                    for page in crawled:
+                        await handle_page(page, is_pdf=False)
+            except Exception as e:
+                logger.exception(f"[{req_id}] Streamed search failed")
+                output.trace["error"] = str(e)
+
+        try:
+            # 1. Plan
+            rewritten_queries = await asyncio.wait_for(self.planner.plan(query, context), timeout=remaining())
+            output.rewritten_queries = rewritten_queries
+            yield event("plan", rewritten_queries=rewritten_queries)
+
+            # 2-4. Search -> Read -> Refine, overlapped
+            spawn(search_phase(rewritten_queries))
+            while tasks or not queue.empty():
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=remaining())
+                except asyncio.TimeoutError:
+                    stream_stats["deadline_hit"] = True
+                    stream_stats["pages_pending"] = len(tasks)
+                    logger.warning(f"[{req_id}] Deadline hit with {len(tasks)} tasks pending. Returning best evidence so far.")
+                    break
+                if item is not None:
+                    yield item
+
+            # Final pass: rescore everything together so scores are comparable across pages.
+            # If the deadline is already gone, the per-page evidence is the best we have.
+            if not stream_stats["deadline_hit"] and output.pages:
+                try:
+                    output.evidence = await asyncio.wait_for(self._refine(output.pages, query, output), timeout=remaining())
+                except asyncio.TimeoutError:
+                    stream_stats["deadline_hit"] = True
+            if stream_stats["deadline_hit"] or not output.evidence:
+                output.evidence = self._best_so_far(partial_evidence)
+            logger.info(f"[{req_id}] Extracted {len(output.evidence)} evidence chunks (streamed)")
+            if not stream_stats["deadline_hit"]:
+                # Deadline-cut outputs are partial, don't let them shadow a full run
+                await self._store_result_cache(query, context, output)
+
+        except asyncio.TimeoutError:
+            stream_stats["deadline_hit"] = True
+            logger.warning(f"[{req_id}] Deadline hit during planning.")
+        except Exception as e:
+            logger.exception(f"[{req_id}] Streaming pipeline failed")
+            output.trace["error"] = str(e)
+
+        finally:
+            for task in list(tasks):
+                task.cancel()
+            output.elapsed_ms = int((time.time() - start_time) * 1000)
+            output.trace["total_ms"] = output.elapsed_ms
+
+        yield event("done", output=output)
+
+    async def _embed_query(self, query: str) -> Optional[np.ndarray]:
+        """Refiner's query embedding, computed in a worker thread (MiniLM encode, maybe the first model load)."""
+        if not hasattr(self.refiner, "embed_query"):
+            return None
+        return await asyncio.get_running_loop().run_in_executor(None, self.refiner.embed_query, query)
+
+    async def _lookup_result_cache(
+        self,
+        query: str,
+        context: Optional[dict],
+        start_time: float
+    ) -> Tuple[Optional[PipelineOutput], dict]:
+        """
+        Exact (normalized query + config fingerprint) then near-duplicate (query embedding) lookup.
+        Returns (cached_output or None, cache telemetry).
+        """
+        try:
+            cache = QueryResultCache.get_instance(self.config.result_cache_max_entries)
+            fingerprint = QueryResultCache.fingerprint(self.config, context)
+            cache_stats = None
+
+            hit = cache.get_exact(query, fingerprint)
+            if hit:
+                cached, age = hit
+                cache_stats = {"status": "hit", "match": "exact", "age_s": round(age, 1)}
+            elif self.config.result_cache_similarity < 1.0:
+                embedding = await self._embed_query(query)
+                if embedding is not None:
+                    hit = cache.get_similar(embedding, fingerprint, self.config.result_cache_similarity)
+                    if hit:
+                        cached, similarity, age = hit
+                        cache_stats = {"status": "hit", "match": "semantic", "similarity": round(similarity, 4),
+                                       "cached_query": cached.query, "age_s": round(age, 1)}
+
+            if cache_stats is None:
+                cache.record_miss()
+                return None, {"status": "miss"}
+
+            cached.query = query
+            cached.telemetry["result_cache"] = cache_stats
+            cached.elapsed_ms = int((time.time() - start_time) * 1000)
+            cached.trace["total_ms"] = cached.elapsed_ms
+            return cached, cache_stats
+        except Exception as e:
+            logger.warning(f"Result cache lookup failed: {e}")
+            return None, {"status": "error"}
+
+    async def _store_result_cache(self, query: str, context: Optional[dict], output: PipelineOutput):
+        if not self.config.enable_result_cache or output.trace.get("error") or not output.evidence:
+            return
+        try:
+            embedding = await self._embed_query(query)
+            QueryResultCache.get_instance(self.config.result_cache_max_entries).put(
+                query,
+                QueryResultCache.fingerprint(self.config, context),
+                output,
+                ttl=self.config.result_cache_ttl,
+                embedding=embedding
+            )
+        except Exception as e:
+            logger.warning(f"Result cache store failed: {e}")
+
+    def _select_targets(self, results: List[SearchResult], seen: Set[str]) -> Tuple[List[str], List[str]]:
+        """
+        Splits allowed result URLs into (html_urls, pdf_urls), honoring reader_max_pages.
+        `seen` is updated in place so incremental callers share the page budget.
+        """
+        urls = []
+        pdf_urls = []
+        for r in results:
+            if len(seen) >= self.config.reader_max_pages:
+                break
+            if r.url in seen or not self.security.is_allowed_url(r.url):
+                continue
+            seen.add(r.url)
+            # Only a first guess: both readers sniff the body and route it by actual type
+            if looks_like_pdf_url(r.url):
+                pdf_urls.append(r.url)
+            else:
+                urls.append(r.url)
+        return urls, pdf_urls
+
+    @staticmethod
+    def _snippet_page(result: SearchResult) -> FetchedPage:
+        """Virtual page built from a search snippet (Zero-Fetch)."""
+        return FetchedPage(
+            url=result.url,
+            title=result.title,
+            text_plain=f"Source: {result.url}\nTitle: {result.title}\n\nSummary (from Search Engine):\n{result.snippet}",
+            status_code=200
+        )
+
+    def _finalize_page(self, p: FetchedPage, url_to_snippet: dict, output: PipelineOutput, req_id: str) -> Optional[FetchedPage]:
+        """
+        Sanitizes a page and applies Snippet Fallback (v0.5 Universality).
+        Returns None if the page is dead and has no usable snippet.
+        """
+        if p.text_plain:
+            p.text_plain = self.security.sanitize_text(p.text_plain)
+        if p.text_markdown:
+            p.text_markdown = self.security.sanitize_text(p.text_markdown)
+        
+        # Check for blocking/failure
+        is_failed = False
+        if not p.text_plain or len(p.text_plain) < 50:
+            is_failed = True
+        if p.error or (p.status_code and p.status_code >= 400):
+            is_failed = True
+        
+        # Cognitive Unblocking: Always track blocked/failed domains
+        if is_failed:
+             try:
+                 domain = urlparse(p.url).netloc.replace("www.", "")
+                 # Basic dedupe
+                 if domain not in output.blocked_domains:
+                     output.blocked_domains.append(domain)
+             except:
+                 pass
+
+        if is_failed and self.config.enable_snippet_fallback:
+             snippet, original_title = url_to_snippet.get(p.url, ("", ""))
+             if snippet and len(snippet) > 20:
+                 logger.warning(f"[{req_id}] Fallback to Snippet for {p.url} (Reason: {p.error or 'Blocked'})")
+                 # Construct fallback page
+                 p.text_plain = f"Source: {p.url}\nTitle: {original_title}\n\nSummary (from Search Engine):\n{snippet}"
+                 p.text_markdown = p.text_plain
+                 p.error = None # Clear error so it is processed
+                 p.status_code = 200 # Soft success
+             else:
+                 # Truly dead
+                 logger.warning(f"[{req_id}] Page dead and no snippet: {p.url}")
+                 return None
+        
+        return p
+
+    def _best_so_far(self, evidence: List[EvidenceChunk]) -> List[EvidenceChunk]:
+        """Deduplicated top evidence from per-page scoring, used when the deadline cuts the final pass."""
+        unique = {}
+        for chunk in evidence:
+            if chunk.chunk_id not in unique or chunk.relevance_score > unique[chunk.chunk_id].relevance_score:
+                unique[chunk.chunk_id] = chunk
+        ranked = sorted(unique.values(), key=lambda c: c.relevance_score, reverse=True)
+        return ranked[:self.config.max_evidence]
+
+    @staticmethod
+    def _merge_recovery_stats(telemetry: dict, stats: dict) -> None:
+        """Accumulates per-page resilience stats (streaming recovers one page at a time)."""
+        telemetry["resilience_triggered"] = telemetry.get("resilience_triggered", False) or stats.get("resilience_triggered", False)
+        telemetry["recovered_count"] = telemetry.get("recovered_count", 0) + stats.get("recovered_count", 0)
+        telemetry.setdefault("attempted_urls", []).extend(stats.get("attempted_urls", []))
+        if "error" in stats:
+            telemetry["error"] = stats["error"]
+
+    @staticmethod
+    def _new_routing_stats() -> dict:
+        return {"http": 0, "direct_browser": 0, "skipped": 0, "est_time_saved_ms": 0.0}
+
+    def _route_reads(self, urls: List[str], req_id: str, routing: Optional[dict] = None) -> Tuple[List[str], List[str], List[FetchedPage]]:
+        """
+        Splits HTML URLs into (fetch over HTTP, straight to browser, skipped pages).
+        Domain health (negative cache / open circuits) decides first, then the learned strategy table.
+        Skipped pages carry an error, so _finalize_page turns them into snippet fallbacks.
+        """
+        routing = routing if routing is not None else self._new_routing_stats()
+        fetch_urls, browser_urls, skipped = [], [], []
+        browser_ok = self.config.enable_stealth_escalation and not isinstance(self.reader, PlaywrightReader)
+        for url in urls:
+            route, reason = self.health.route(url) if self.health else ("fetch", None)
+            # A half-open probe must go over HTTP, the learned strategy doesn't get to reroute it
+            if route == "fetch" and reason != PROBE_REASON and self.strategy:
+                route, reason, saved_ms = self.strategy.choose(url)
+                if route != "fetch" and (route == "snippet" or browser_ok):
+                    routing["est_time_saved_ms"] = round(routing["est_time_saved_ms"] + saved_ms, 1)
+
+            if route == "fetch" or (route == "browser" and isinstance(self.reader, PlaywrightReader)):
+                fetch_urls.append(url)
+            elif route == "browser" and browser_ok:
+                logger.info(f"[{req_id}] {url}: {reason}, going straight to the browser")
+                browser_urls.append(url)
+            else:
+                logger.info(f"[{req_id}] {url}: {reason}, using the snippet")
+                skipped.append(self._routed_page(url, "snippet", reason))
+        routing["http"] += len(fetch_urls)
+        routing["direct_browser"] += len(browser_urls)
+        routing["skipped"] += len(skipped)
+        return fetch_urls, browser_urls, skipped
+
+    @staticmethod
+    def _routed_page(url: str, route: str, reason: Optional[str] = None) -> FetchedPage:
+        """Placeholder for a URL whose HTTP fetch was skipped (failed, so recovery/fallback kicks in)."""
+        return FetchedPage(url=url, error=f"Skipped HTTP fetch ({reason or 'domain health'}), route: {route}")
+
+    @staticmethod
+    async def _timed_read(reader, url: str) -> Tuple[List[FetchedPage], float]:
+        start = time.perf_counter()
+        pages = await reader.read_many([url])
+        return pages, (time.perf_counter() - start) * 1000
+
+    async def _read_http(self, urls: List[str]) -> List[FetchedPage]:
+        """Reads with the main reader one URL per call, so each outcome and latency can be recorded."""
+        batches = await asyncio.gather(*[self._timed_read(self.reader, url) for url in urls])
+        pages = []
+        for fetched, latency_ms in batches:
+            for p in fetched:
+                if p._fetch_origin is not None:
+                    # Cache hits and our own throttling say nothing about the host
+                    if self.health:
+                        self.health.release_probe(p.url)
+                    continue
+                doc_type = (p.metadata or {}).get("doc_type")
+                kind = (self.health.record_fetch(p.url, p.status_code, p.error, p.text_plain, doc_type) if self.health
+                        else classify_failure(p.status_code, p.error, p.text_plain, doc_type))
+                if kind == "short":
+                    p._short_fetch_ms = latency_ms # Undecided until the browser has tried (_recover_with_browser)
+                elif self.strategy:
+                    self.strategy.record(p.url, "http", kind is None, latency_ms)
+            pages.extend(fetched)
+        return pages
+
+    def _new_request_id(self) -> str:
+        self.request_id = f"req_{int(time.time()*1000)}_{next(self._run_counter)}"
+        return self.request_id
+
+    @staticmethod
+    def _needs_recovery(p: FetchedPage) -> bool:
+        # A browser reads PDFs/feeds/JSON no better than the HTTP path did
+        if (p.metadata or {}).get("doc_type") in NON_HTML_TYPES:
+            return False
+        # Heuristic: Blocked if empty, error, very short, or a challenge page (same test as DomainHealth)
+        return (
+            p.error is not None or
+            not p.text_plain or
+            len(p.text_plain) < SHORT_PAGE_CHARS or
+            looks_like_challenge(p.status_code, p.text_plain)
+        )
 
     async def _recover_with_browser(self, pages: List[FetchedPage], req_id: str) -> tuple[List[FetchedPage], dict]:
         """
@@ -278,18 +820,7 @@ class AsyncPipeline:
         """
         telemetry = {"resilience_triggered": False, "recovered_count": 0, "attempted_urls": []}
         
-        failed_urls = []
-        for p in pages:
-            # Heuristic: Blocked if empty, error, or very short content
-            is_blocked = (
-                p.error is not None or 
-                not p.text_plain or 
-                len(p.text_plain) < 300 or # Too short strictly
-                "enable javascript" in (p.text_plain or "").lower() or
-                "cloudflare" in (p.text_plain or "").lower()
-            )
-            if is_blocked:
-                failed_urls.append(p.url)
+        failed_urls = [p.url for p in pages if self._needs_recovery(p)]
         
         if not failed_urls:
             return pages, telemetry
@@ -304,7 +835,12 @@ class AsyncPipeline:
                 self._resilient_browser = PlaywrightReader(
                     concurrency=2,
                     headless=True,
-                    custom_headers=self.config.custom_headers
+                    custom_headers=self.config.custom_headers,
+                    scheduler=self.scheduler,
+                    context_max_uses=self.config.browser_context_max_uses,
+                    max_browser_rss_mb=self.config.browser_max_rss_mb,
+                    timeout=self.config.reader_timeout,
+                    readiness=self.config.browser_readiness
                 )
                 logger.info(f"[{req_id}] Initialized Resilient Browser (Singleton)")
             except Exception as e:
@@ -313,17 +849,27 @@ class AsyncPipeline:
                 return pages, telemetry
 
         try:
-            stealth_pages = await self._resilient_browser.read_many(failed_urls)
+            batches = await asyncio.gather(*[self._timed_read(self._resilient_browser, url) for url in failed_urls])
             
             # Merge results back: Replace failed pages with stealth pages
-            stealth_map = {op.url: op for op in stealth_pages}
+            stealth_map = {op.url: op for fetched, _ in batches for op in fetched}
+            browser_ms = {op.url: ms for fetched, ms in batches for op in fetched}
             new_pages = []
             recovery_count = 0
             
             for p in pages:
                 if p.url in stealth_map:
                     sp = stealth_map[p.url]
-                    if sp.text_plain and len(sp.text_plain) > 100:
+                    recovered = bool(sp.text_plain and len(sp.text_plain) > 100)
+                    after_short = p._short_fetch_ms is not None
+                    measured = sp._fetch_origin != "throttled" # Our scheduler refused the slot: no verdict on the host
+                    if self.health and measured:
+                        self.health.record_recovery(p.url, recovered, after_short=after_short)
+                    if self.strategy and measured:
+                        if after_short: # The short HTTP body was a failure only if the browser found more
+                            self.strategy.record(p.url, "http", not recovered, p._short_fetch_ms)
+                        self.strategy.record(p.url, "browser", recovered, browser_ms[p.url])
+                    if recovered:
                         logger.info(f"[{req_id}] ✅ Recovered: {p.url}")
                         new_pages.append(sp)
                         recovery_count += 1
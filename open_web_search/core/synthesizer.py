@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import os
 from openai import AsyncOpenAI
 from open_web_search.schemas.results import EvidenceChunk
@@ -17,6 +17,26 @@ class AnswerSynthesizer:
                 api_key=config.llm_api_key
             )
         
+    @staticmethod
+    def _unseen_content(chunk: EvidenceChunk, seen_spans: Dict[str, List[Tuple[int, int]]]) -> Optional[str]:
+        """
+        The chunk's text minus a prefix/suffix already covered by chunks of the same page
+        (chunk_overlap repeats text between neighbours). None if it's entirely covered.
+        """
+        start, end = chunk.start_char, chunk.end_char
+        if start is None or end is None or end - start != len(chunk.content):
+            return chunk.content
+        for seen_start, seen_end in seen_spans.get(chunk.url, ()):
+            if seen_start <= start and end <= seen_end:
+                return None
+            if seen_start <= start < seen_end:
+                start = seen_end
+            elif seen_start < end <= seen_end:
+                end = seen_start
+        if start >= end:
+            return None
+        return chunk.content[start - chunk.start_char:end - chunk.start_char]
+
     async def synthesize(self, query: str, evidence: List[EvidenceChunk]) -> str:
         """
         Generates an answer based on the provided evidence.
@@ -41,10 +61,16 @@ class AnswerSynthesizer:
         context_text = ""
         current_chars = 0
         used_count = 0
+        seen_spans = {} # url -> [(start, end)] already in the context
         
         for i, chunk in enumerate(evidence):
+            # Overlapping chunks of the same page: only send the part not already in the context
+            content = self._unseen_content(chunk, seen_spans)
+            if content is None:
+                continue
+            
             # Format: Source [N] (URL):\nCONTENT\n\n
-            chunk_fmt = f"Source [{i+1}] ({chunk.url}):\n{chunk.content}\n\n"
+            chunk_fmt = f"Source [{i+1}] ({chunk.url}):\n{content}\n\n"
             chunk_len = len(chunk_fmt)
             
             if current_chars + chunk_len > available_chars:
@@ -53,7 +79,7 @@ class AnswerSynthesizer:
                      # Must include at least partial first chunk
                      safe_len = available_chars - 100
                      if safe_len > 100:
-                         truncated_content = chunk.content[:safe_len] + "...(truncated)"
+                         truncated_content = content[:safe_len] + "...(truncated)"
                          context_text += f"Source [{i+1}] ({chunk.url}):\n{truncated_content}\n\n"
                          used_count += 1
                 break
@@ -61,6 +87,8 @@ class AnswerSynthesizer:
             context_text += chunk_fmt
             current_chars += chunk_len
             used_count += 1
+            if chunk.start_char is not None and chunk.end_char is not None:
+                seen_spans.setdefault(chunk.url, []).append((chunk.start_char, chunk.end_char))
             
             if used_count >= self.config.max_evidence:
                 break
@@ -2,9 +2,10 @@ from typing import List, Dict, Optional
 import numpy as np
 from loguru import logger
 from dataclasses import dataclass
+from open_web_search.utils.models import ModelRegistry
 
 try:
-    from sentence_transformers import SentenceTransformer
+    import sentence_transformers
     HAS_SENTENCE_TRANSFORMERS = True
 except ImportError:
     HAS_SENTENCE_TRANSFORMERS = False
@@ -22,16 +23,16 @@ class LinkAnalyzer:
     Uses semantic similarity (SentenceTransformers) if available, 
     otherwise falls back to keyword matching.
     """
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: str = "auto"):
         self.model = None
         self.model_name = model_name
+        self.device = device
         self._load_model()
 
     def _load_model(self):
         if HAS_SENTENCE_TRANSFORMERS and not self.model:
             try:
-                logger.info(f"Loading LinkAnalyzer model: {self.model_name}")
-                self.model = SentenceTransformer(self.model_name)
+                self.model = ModelRegistry.get_instance().sentence_transformer(self.model_name, self.device)
             except Exception as e:
                 logger.error(f"Failed to load embedding model: {e}")
 
@@ -6,21 +6,34 @@ from urllib.parse import urlparse
 from open_web_search.schemas.results import FetchedPage
 from open_web_search.readers.browser import PlaywrightReader
 from open_web_search.crawling.analyzer import LinkAnalyzer, LinkCandidate
+from open_web_search.refiners.chunks import Chunker
 
 class NeuralCrawler:
     """
     A persistent web walker that uses semantic similarity to decide 
     which links to follow next (Best-First Search).
+
+    Fetch pacing (per-host caps, rate limits, 429 backoff) is the reader's FetchScheduler;
+    `max_pages_per_domain` only keeps a single crawl from getting stuck on one site.
     """
 
-    def __init__(self, reader: PlaywrightReader, analyzer: LinkAnalyzer):
+    def __init__(
+        self,
+        reader: PlaywrightReader,
+        analyzer: LinkAnalyzer,
+        max_pages_per_domain: int = 4,
+        chunker: Optional[Chunker] = None
+    ):
         self.reader = reader
         self.analyzer = analyzer
-        self.visited_urls: Set[str] = set()
-        self.domain_limit: Dict[str, int] = {} # Per-domain hit counter
+        self.chunker = chunker # Chunk pages as they're crawled, refiners then reuse the artifact
+        self.max_pages_per_domain = max_pages_per_domain
 
     async def crawl(self, start_urls: List[str], query: str, max_pages: int = 5, depth: int = 2) -> List[FetchedPage]:
         logger.info(f"Starting Neural Crawl for query='{query}' with max_pages={max_pages}")
+        # Per-crawl state stays local: pooled pipelines run several crawls on this instance at once
+        visited_urls: Set[str] = set()
+        domain_limit: Dict[str, int] = {} # Per-domain hit counter
         
         # Priority Frontier: List of LinkCandidate
         frontier: List[LinkCandidate] = []
@@ -40,24 +53,26 @@ class NeuralCrawler:
             current = frontier.pop(0)
             
             # Skip if visited
-            if current.url in self.visited_urls:
+            if current.url in visited_urls:
                 continue
             
-            self.visited_urls.add(current.url)
+            visited_urls.add(current.url)
             
-            # Domain Politeness (Simple check)
+            # Domain diversity budget (request pacing itself happens in the reader's scheduler)
             domain = urlparse(current.url).netloc
-            if self.domain_limit.get(domain, 0) > 3:
+            if domain_limit.get(domain, 0) >= self.max_pages_per_domain:
                 # Skip if we hit this domain too much in one session
                 # (Prevents getting stuck on one site)
                 continue
-            self.domain_limit[domain] = self.domain_limit.get(domain, 0) + 1
+            domain_limit[domain] = domain_limit.get(domain, 0) + 1
 
             logger.info(f"Crawling [Score: {current.score:.2f}]: {current.url}")
             
             # Fetch & Extract Links
             fetched_page, raw_links = await self.reader.fetch_with_links(current.url)
             
+            if self.chunker is not None and fetched_page.text_plain and not fetched_page.error:
+                self.chunker.chunks_for(fetched_page)
             collected_pages.append(fetched_page)
             pages_crawled += 1
             
@@ -1,8 +1,30 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from typing import AsyncIterator, List, Tuple
+from loguru import logger
 from open_web_search.schemas.results import SearchResult
 
 class BaseSearchEngine(ABC):
     @abstractmethod
     async def search(self, queries: List[str]) -> List[SearchResult]:
         pass
+
+    async def search_with_telemetry(self, queries: List[str]) -> Tuple[List[SearchResult], dict]:
+        """Same as `search`, plus engine-level telemetry (overridden by CompositeSearchEngine)."""
+        return await self.search(queries), {}
+
+    async def search_stream(self, queries: List[str]) -> AsyncIterator[List[SearchResult]]:
+        """
+        Yields one result batch per query as soon as that query returns,
+        instead of waiting for the slowest query like `search` does.
+        """
+        tasks = [asyncio.ensure_future(self.search([q])) for q in queries]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    yield await next_done
+                except Exception as e:
+                    logger.error(f"{self.__class__.__name__}: streamed query failed: {e}")
+        finally:
+            for t in tasks:
+                t.cancel()
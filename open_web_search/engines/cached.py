@@ -0,0 +1,128 @@
+import asyncio
+import hashlib
+import re
+import time
+from typing import Any, List, Optional, Set
+from loguru import logger
+
+from open_web_search.engines.base import BaseSearchEngine
+from open_web_search.schemas.results import SearchResult
+from open_web_search.utils.cache import CacheManager
+
+_WHITESPACE = re.compile(r"\s+")
+
+class CachedSearchEngine(BaseSearchEngine):
+    """
+    SERP cache layer that wraps any BaseSearchEngine.
+    Results are stored per (engine, normalized query, region/language), so sub-queries the
+    Planner repeats across DeepResearchLoop rounds don't hit the network (or rate limits) again.
+
+    Time-sensitive queries get a short TTL, evergreen ones a long TTL. Within `stale_ttl`
+    after expiry, the stale SERP is served immediately and refreshed in the background.
+    """
+    NEWS_PATTERN = re.compile(
+        r"\b(news|today|tonight|yesterday|latest|breaking|live|now|current|this (week|month|year)|"
+        r"score|scores|price|prices|stock|weather|election|20[2-9]\d)\b",
+        re.IGNORECASE
+    )
+
+    def __init__(
+        self,
+        engine: BaseSearchEngine,
+        ttl: int = 3600,
+        news_ttl: int = 300,
+        stale_ttl: int = 900,
+        cache: Optional[Any] = None
+    ):
+        self.engine = engine
+        self.name = engine.__class__.__name__
+        self.ttl = ttl
+        self.news_ttl = news_ttl
+        self.stale_ttl = stale_ttl
+        self.cache = cache or CacheManager.get_instance()
+        # Region/language is part of the key, a 'kr-kr' SERP is not a 'us-en' SERP
+        self.scope = getattr(engine, "region", None) or getattr(engine, "language", None) or ""
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return _WHITESPACE.sub(" ", query.strip().lower())
+
+    def _key(self, query: str) -> str:
+        raw = f"{self.name}|{self.scope}|{self.normalize(query)}"
+        return f"serp:{hashlib.md5(raw.encode()).hexdigest()}"
+
+    def ttl_for(self, query: str) -> int:
+        return self.news_ttl if self.NEWS_PATTERN.search(query) else self.ttl
+
+    async def _fetch_and_store(self, query: str, key: str) -> List[SearchResult]:
+        results = await self.engine.search([query])
+        if results:
+            # Empty SERPs are usually soft blocks, never cache them
+            ttl = self.ttl_for(query)
+            self.cache.set(
+                key,
+                {"stored_at": time.time(), "ttl": ttl, "results": results},
+                expire=ttl + self.stale_ttl
+            )
+        return results
+
+    async def _refresh(self, query: str, key: str):
+        try:
+            await self._fetch_and_store(query, key)
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            logger.warning(f"[SERP Cache] Background refresh failed for '{query}': {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def _search_one(self, query: str) -> List[SearchResult]:
+        key = self._key(query)
+        entry = self.cache.get(key)
+        if entry:
+            age = time.time() - entry["stored_at"]
+            if age < entry["ttl"]:
+                self.stats["hits"] += 1
+                return [r.model_copy() for r in entry["results"]]
+            if age < entry["ttl"] + self.stale_ttl:
+                # Stale-while-revalidate
+                self.stats["stale_hits"] += 1
+                if key not in self._refreshing:
+                    self._refreshing.add(key)
+                    task = asyncio.ensure_future(self._refresh(query, key))
+                    self._refresh_tasks.add(task)
+                    task.add_done_callback(self._refresh_tasks.discard)
+                return [r.model_copy() for r in entry["results"]]
+
+        self.stats["misses"] += 1
+        return await self._fetch_and_store(query, key)
+
+    async def search(self, queries: List[str]) -> List[SearchResult]:
+        results_list = await asyncio.gather(*[self._search_one(q) for q in queries], return_exceptions=True)
+
+        final_results = []
+        seen_urls = set()
+        errors = []
+        for res in results_list:
+            if isinstance(res, list):
+                for item in res:
+                    if item.url not in seen_urls:
+                        final_results.append(item)
+                        seen_urls.add(item.url)
+            else:
+                errors.append(res)
+
+        # Preserve the wrapped engine's failure semantics for CompositeSearchEngine failover
+        if errors and not final_results:
+            raise errors[0]
+        for err in errors:
+            logger.error(f"[SERP Cache] {self.name} batch error: {err}")
+        return final_results
+
+    async def close(self):
+        for task in list(self._refresh_tasks):
+            task.cancel()
+        if hasattr(self.engine, "close"):
+            await self.engine.close()
@@ -1,60 +1,240 @@
 import asyncio
-from typing import List, Optional
+import time
+from typing import Dict, List, Literal, Optional, Tuple
 from loguru import logger
 from open_web_search.engines.base import BaseSearchEngine
 from open_web_search.schemas.results import SearchResult
 
+SearchStrategy = Literal["failover", "hedged", "parallel"]
+
 class CompositeSearchEngine(BaseSearchEngine):
     """
     The 'Hydra' Engine: Manages a priority list of search engines.
-    If the primary engine fails (or returns suspiciously empty results),
-    it automatically fails over to the next engine in the chain.
+
+    Strategies:
+    - failover: try engines in order, move on after an error or 0 results.
+    - hedged:   start the primary, launch the next engine if the primary hasn't produced
+                results within `hedge_delay` seconds (or failed). First good result set wins.
+    - parallel: query all engines at once and merge with Reciprocal Rank Fusion + URL dedup.
+
+    Per-engine latency and win rate are recorded for telemetry.
     """
-    def __init__(self, engines: List[BaseSearchEngine]):
+    def __init__(
+        self,
+        engines: List[BaseSearchEngine],
+        strategy: SearchStrategy = "failover",
+        hedge_delay: float = 2.0,
+        rrf_k: int = 60
+    ):
         self.engines = engines
         if not self.engines:
             raise ValueError("CompositeSearchEngine requires at least one engine.")
+        self.strategy = strategy
+        self.hedge_delay = hedge_delay
+        self.rrf_k = rrf_k
+        self.engine_stats: Dict[str, dict] = {
+            self._name(e): {"calls": 0, "wins": 0, "errors": 0, "empty": 0, "cancelled": 0, "total_latency_ms": 0.0}
+            for e in engines
+        }
+
+    @staticmethod
+    def _name(engine: BaseSearchEngine) -> str:
+        return getattr(engine, "name", engine.__class__.__name__)
 
     async def search(self, queries: List[str]) -> List[SearchResult]:
+        results, _ = await self.search_with_telemetry(queries)
+        return results
+
+    async def search_with_telemetry(self, queries: List[str]) -> Tuple[List[SearchResult], dict]:
+        telemetry = {"strategy": self.strategy, "winner": None, "engines": {}}
         if not queries:
-            return []
+            return [], telemetry
+
+        if self.strategy == "parallel" and len(self.engines) > 1:
+            results = await self._search_parallel(queries, telemetry)
+        elif self.strategy == "hedged" and len(self.engines) > 1:
+            results = await self._search_hedged(queries, telemetry)
+        else:
+            results = await self._search_failover(queries, telemetry)
+
+        if telemetry["winner"]:
+            self.engine_stats[telemetry["winner"]]["wins"] += 1
+        telemetry["engine_stats"] = self.stats_snapshot()
+        return results, telemetry
+
+    async def _timed(self, engine: BaseSearchEngine, queries: List[str]) -> Tuple[BaseSearchEngine, Optional[List[SearchResult]], Optional[Exception], float]:
+        start = time.perf_counter()
+        try:
+            results = await engine.search(queries)
+            return engine, results, None, (time.perf_counter() - start) * 1000
+        except Exception as e:
+            return engine, None, e, (time.perf_counter() - start) * 1000
+
+    def _record(self, telemetry: dict, engine: BaseSearchEngine, results: Optional[List[SearchResult]], error: Optional[Exception], latency_ms: float):
+        name = self._name(engine)
+        stats = self.engine_stats[name]
+        stats["calls"] += 1
+        stats["total_latency_ms"] += latency_ms
+        if error is not None:
+            stats["errors"] += 1
+            status = "error"
+            logger.error(f"Composite: {name} failed: {error}")
+        elif not results:
+            stats["empty"] += 1
+            status = "empty"
+            logger.warning(f"Composite: {name} returned 0 results. Warning signal.")
+        else:
+            status = "ok"
+        telemetry["engines"][name] = {"status": status, "latency_ms": round(latency_ms, 1), "count": len(results or [])}
 
+    def _record_cancelled(self, telemetry: dict, engine: BaseSearchEngine):
+        name = self._name(engine)
+        self.engine_stats[name]["cancelled"] += 1
+        telemetry["engines"][name] = {"status": "cancelled"}
+
+    async def _search_failover(self, queries: List[str], telemetry: dict) -> List[SearchResult]:
         errors = []
-        
+
         # Try each engine in priority order
         for i, engine in enumerate(self.engines):
-            engine_name = engine.__class__.__name__
+            engine_name = self._name(engine)
             logger.info(f"Composite: Attempting search with {engine_name} (Priority {i+1})")
-            
-            try:
-                results = await engine.search(queries)
-                
-                # Success criteria checks
-                if results:
-                    logger.info(f"Composite: {engine_name} succeeded with {len(results)} results.")
-                    return results
-                else:
-                    logger.warning(f"Composite: {engine_name} returned 0 results. Warning signal.")
-                    # If it's the last engine, return empty. 
-                    # If not, treat as soft failure and try next?
-                    # Strategy: If result is empty, it MIGHT be a query issue or a soft block.
-                    # Let's try the next engine just in case, unless it's a specific 'not found' confidence?
-                    # For now, let's treat 0 results as a "Try Next" signal if fallback exists.
-                    if i < len(self.engines) - 1:
-                        logger.info(f"Composite: Falling back from {engine_name} due to empty results...")
-                        continue
-                    else:
-                        return [] # All empty
-            
-            except Exception as e:
-                logger.error(f"Composite: {engine_name} failed: {e}")
-                errors.append(f"{engine_name}: {str(e)}")
-                
-                # If last engine, raise or return empty?
+
+            _, results, error, latency_ms = await self._timed(engine, queries)
+            self._record(telemetry, engine, results, error, latency_ms)
+
+            if error is not None:
+                errors.append(f"{engine_name}: {str(error)}")
                 # Best to return empty list with error logged, to prevent pipeline crash.
                 if i < len(self.engines) - 1:
                     logger.warning(f"Composite: Failing over to next engine...")
-                    continue
-        
+                continue
+
+            # Success criteria checks
+            if results:
+                logger.info(f"Composite: {engine_name} succeeded with {len(results)} results.")
+                telemetry["winner"] = engine_name
+                return results
+
+            # Strategy: If result is empty, it MIGHT be a query issue or a soft block.
+            # Treat 0 results as a "Try Next" signal if fallback exists.
+            if i < len(self.engines) - 1:
+                logger.info(f"Composite: Falling back from {engine_name} due to empty results...")
+                continue
+            return [] # All empty
+
         logger.error(f"Composite: All engines failed. Errors: {errors}")
         return []
+
+    async def _search_hedged(self, queries: List[str], telemetry: dict) -> List[SearchResult]:
+        pending = set()
+        launched = {}
+        next_idx = 0
+
+        def launch():
+            nonlocal next_idx
+            engine = self.engines[next_idx]
+            next_idx += 1
+            logger.info(f"Composite: Hedged launch of {self._name(engine)} (Priority {next_idx})")
+            task = asyncio.ensure_future(self._timed(engine, queries))
+            launched[task] = engine
+            pending.add(task)
+
+        launch()
+        try:
+            while pending:
+                # Only wait `hedge_delay` while there is still an engine left to hedge with
+                timeout = self.hedge_delay if next_idx < len(self.engines) else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    launch()
+                    continue
+
+                # Record every finished engine first; on a tie the higher-priority engine wins
+                winner = None
+                for task in sorted(done, key=lambda t: self.engines.index(launched[t])):
+                    pending.discard(task)
+                    engine, results, error, latency_ms = task.result()
+                    self._record(telemetry, engine, results, error, latency_ms)
+                    if results and winner is None:
+                        winner = (engine, results)
+                if winner is not None:
+                    engine, results = winner
+                    telemetry["winner"] = self._name(engine)
+                    logger.info(f"Composite: {self._name(engine)} won the hedge with {len(results)} results.")
+                    return results
+
+                # Everything that finished was bad, hedge immediately instead of waiting
+                if next_idx < len(self.engines):
+                    launch()
+        finally:
+            for task in pending:
+                if task.done() and not task.cancelled(): # Finished while we were returning: real outcome
+                    self._record(telemetry, *task.result())
+                    continue
+                task.cancel()
+                self._record_cancelled(telemetry, launched[task])
+
+        logger.error("Composite: All engines failed or returned 0 results (hedged).")
+        return []
+
+    async def _search_parallel(self, queries: List[str], telemetry: dict) -> List[SearchResult]:
+        outcomes = await asyncio.gather(*[self._timed(e, queries) for e in self.engines])
+
+        ranked_lists = []
+        for engine, results, error, latency_ms in outcomes:
+            self._record(telemetry, engine, results, error, latency_ms)
+            if results:
+                ranked_lists.append((self._name(engine), results))
+
+        if not ranked_lists:
+            logger.error("Composite: All engines failed or returned 0 results (parallel).")
+            return []
+
+        fused = self._rrf_merge(ranked_lists)
+        telemetry["winner"] = fused[0][1]
+        return [r for r, _ in fused]
+
+    @staticmethod
+    def _url_key(url: str) -> str:
+        key = url.split("#", 1)[0].rstrip("/")
+        for prefix in ("https://", "http://"):
+            if key.startswith(prefix):
+                key = key[len(prefix):]
+        return key[4:] if key.startswith("www.") else key
+
+    def _rrf_merge(self, ranked_lists: List[Tuple[str, List[SearchResult]]]) -> List[Tuple[SearchResult, str]]:
+        """Reciprocal Rank Fusion: score(url) = sum(1 / (k + rank)). Returns (result, top_engine) pairs."""
+        scores: Dict[str, float] = {}
+        best: Dict[str, Tuple[SearchResult, str, int]] = {}
+        for engine_name, results in ranked_lists:
+            for rank, result in enumerate(results, start=1):
+                key = self._url_key(result.url)
+                scores[key] = scores.get(key, 0.0) + 1.0 / (self.rrf_k + rank)
+                if key not in best or rank < best[key][2]:
+                    best[key] = (result, engine_name, rank)
+
+        merged = []
+        for new_rank, key in enumerate(sorted(scores, key=scores.get, reverse=True), start=1):
+            result, engine_name, _ = best[key]
+            merged.append((result.model_copy(update={"score": scores[key], "rank": new_rank}), engine_name))
+        return merged
+
+    def stats_snapshot(self) -> Dict[str, dict]:
+        snapshot = {}
+        for name, s in self.engine_stats.items():
+            calls = s["calls"]
+            snapshot[name] = {
+                **s,
+                "avg_latency_ms": round(s["total_latency_ms"] / calls, 1) if calls else None,
+                "win_rate": round(s["wins"] / calls, 3) if calls else None,
+            }
+        return snapshot
+
+    async def close(self):
+        for engine in self.engines:
+            if hasattr(engine, 'close'):
+                try:
+                    await engine.close()
+                except Exception as e:
+                    logger.warning(f"Composite: failed to close {engine.__class__.__name__}: {e}")
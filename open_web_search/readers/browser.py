@@ -1,5 +1,6 @@
 import asyncio
-from typing import List, Optional
+import random
+from typing import List, Literal, Optional
 from loguru import logger
 try:
     from playwright.async_api import async_playwright, Browser, BrowserContext
@@ -9,36 +10,197 @@ except ImportError:
 
 from open_web_search.readers.base import BaseReader
 from open_web_search.schemas.results import FetchedPage
+from open_web_search.readers.browser_pool import BrowserContextPool
+from open_web_search.readers.extraction import MAIN_CONTENT_SELECTORS
+from open_web_search.utils.scheduler import FetchScheduler, HostThrottledError, throttled_page
+
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:124.0) Gecko/20100101 Firefox/124.0"
+]
+
+# Visible navigation links with a bit of surrounding text, for the crawler
+LINKS_JS = """
+() => {
+    try {
+        const links = Array.from(document.querySelectorAll('a[href]'));
+        return links.map(a => {
+            const rect = a.getBoundingClientRect();
+            if (rect.width < 1 || rect.height < 1) return null; 
+
+            return {
+                url: a.href,
+                text: (a.innerText || "").slice(0, 100).trim(),
+                context: (a.parentElement ? (a.parentElement.innerText || "") : "").slice(0, 200).trim()
+            };
+        }).filter(l => l && l.text.length > 2 && l.url.startsWith('http'));
+    } catch (err) {
+        return [];
+    }
+}
+"""
+
+# Length of the main-content text (first content selector that matches, else <body>)
+READINESS_JS = """
+(selectors) => {
+    const body = document.body;
+    if (!body) return {len: 0, matched: false, loading: true};
+    let main = null;
+    for (const s of selectors) {
+        main = document.querySelector(s);
+        if (main) break;
+    }
+    return {
+        len: ((main || body).innerText || "").length,
+        matched: !!main,
+        loading: document.readyState === "loading"
+    };
+}
+"""
 
 class PlaywrightReader(BaseReader):
     """
     A robust, resource-optimized browser reader using Playwright.
+
+    Pages come from a BrowserContextPool: contexts are created once with resource blocking
+    routed, reset between URLs and recycled after `context_max_uses`, instead of a new
+    context + page per URL. `max_browser_rss_mb` bounds the memory of the Chromium processes.
+
+    Readiness: in "adaptive" mode navigation returns at commit and the page is polled until
+    the main-content text stops growing or a content selector has text, so static pages return
+    early and SPAs get time to hydrate. "domcontentloaded" keeps the old fixed wait.
+    Either way `timeout` is a total deadline per URL (scheduler wait + navigation + extraction).
     """
-    def __init__(self, headless: bool = True, concurrency: int = 3, custom_headers: Optional[dict] = None):
+    def __init__(
+        self,
+        headless: bool = True,
+        concurrency: int = 3,
+        custom_headers: Optional[dict] = None,
+        scheduler: Optional[FetchScheduler] = None,
+        context_max_uses: int = 50,
+        max_browser_rss_mb: Optional[int] = None,
+        timeout: float = 15.0,
+        readiness: Literal["adaptive", "domcontentloaded"] = "adaptive",
+        poll_interval: float = 0.25,
+        min_content_chars: int = 200
+    ):
         self.headless = headless
         self.concurrency = concurrency
         self.custom_headers = custom_headers or {}
-        self.semaphore = asyncio.Semaphore(concurrency)
+        self.context_max_uses = context_max_uses
+        self.max_browser_rss_mb = max_browser_rss_mb
+        self.timeout = timeout
+        self.readiness = readiness
+        self.poll_interval = poll_interval
+        self.min_content_chars = min_content_chars
+        self.readiness_stats = {"selector": 0, "stable": 0, "deadline": 0}
+        # Navigations are paced per host like every other reader (the page's subresources are not)
+        self.scheduler = scheduler or FetchScheduler(max_concurrency=concurrency)
         self.browser: Optional[Browser] = None
         self.playwright = None
+        self.pool: Optional[BrowserContextPool] = None # Bounds open pages to `concurrency`
+        self._start_lock = asyncio.Lock()
+
+    def _context_options(self) -> dict:
+        return {
+            "user_agent": random.choice(USER_AGENTS),
+            "locale": "en-US",
+            "extra_http_headers": {
+                "Accept-Language": "en-US,en;q=0.9",
+                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+                **self.custom_headers
+            },
+        }
 
     async def start(self):
         if not HAS_PLAYWRIGHT:
             logger.error("Playwright not installed. Run `pip install playwright && playwright install chromium`")
             return
         
-        if not self.browser:
-            self.playwright = await async_playwright().start()
-            self.browser = await self.playwright.chromium.launch(
-                headless=self.headless,
-                args=["--disable-gpu", "--no-sandbox"]
-            )
+        async with self._start_lock:
+            if not self.browser:
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.launch(
+                    headless=self.headless,
+                    args=["--disable-gpu", "--no-sandbox"]
+                )
+                self.pool = await BrowserContextPool(
+                    self.browser,
+                    size=self.concurrency,
+                    max_uses=self.context_max_uses,
+                    context_options=self._context_options,
+                    max_rss_bytes=self.max_browser_rss_mb * 1024 * 1024 if self.max_browser_rss_mb else None
+                ).start(prewarm=1)
 
     async def close(self):
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
         if self.browser:
             await self.browser.close()
+            self.browser = None
         if self.playwright:
             await self.playwright.stop()
+            self.playwright = None
+
+    async def _navigate(self, page, url: str, deadline: float) -> int:
+        loop = asyncio.get_running_loop()
+        wait_until = "commit" if self.readiness == "adaptive" else "domcontentloaded"
+        async with self.scheduler.slot(url, max_wait=max(0.0, deadline - loop.time())):
+            remaining_ms = max(1.0, (deadline - loop.time()) * 1000)
+            response = await page.goto(url, wait_until=wait_until, timeout=remaining_ms)
+        status = response.status if response else 0
+        self.scheduler.record_response(url, status, response.headers if response else None)
+        return status
+
+    async def _wait_until_ready(self, page, deadline: float) -> str:
+        """
+        Polls until the page looks ready. Returns why it stopped:
+        'selector' (content container with text), 'stable' (text stopped growing) or 'deadline'.
+        """
+        loop = asyncio.get_running_loop()
+        last_len, stable_polls = -1, 0
+        while True:
+            try:
+                state = await page.evaluate(READINESS_JS, MAIN_CONTENT_SELECTORS)
+            except Exception:
+                # Evaluating mid-navigation (redirects, JS location changes) throws; just retry
+                state = {"len": 0, "matched": False, "loading": True}
+
+            length = state.get("len", 0)
+            if state.get("matched") and length >= self.min_content_chars:
+                reason = "selector"
+                break
+            # Small jitter (clocks, counters) shouldn't count as growth
+            if not state.get("loading") and length > 0 and abs(length - last_len) <= max(16, last_len // 100):
+                stable_polls += 1
+                if stable_polls >= 2:
+                    reason = "stable"
+                    break
+            else:
+                stable_polls = 0
+            last_len = length
+
+            if loop.time() + self.poll_interval >= deadline:
+                reason = "deadline"
+                break
+            await asyncio.sleep(self.poll_interval)
+
+        self.readiness_stats[reason] += 1
+        return reason
+
+    async def _load(self, page, url: str) -> int:
+        """Navigates and waits for readiness within the per-URL deadline. Returns the status."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        # Keep a slice of the budget for reading the text out of the page
+        ready_deadline = deadline - min(1.0, self.timeout * 0.1)
+        status = await self._navigate(page, url, ready_deadline)
+        if status < 400 and self.readiness == "adaptive":
+            reason = await self._wait_until_ready(page, ready_deadline)
+            logger.debug(f"[Browser] {url} ready ({reason}) in {self.timeout - (deadline - loop.time()):.2f}s")
+        return status
 
     async def _fetch_one(self, url: str) -> FetchedPage:
         if not HAS_PLAYWRIGHT:
@@ -47,64 +209,34 @@ class PlaywrightReader(BaseReader):
         if not self.browser:
             await self.start()
 
-        async with self.semaphore:
-            page = None
-            context = None
-            try:
-                # Create a lightweight context
-                import random
-                user_agents = [
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-                    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:124.0) Gecko/20100101 Firefox/124.0"
-                ]
-                ua = random.choice(user_agents)
-                
-                context = await self.browser.new_context(
-                    user_agent=ua,
-                    locale="en-US",
-                    extra_http_headers={
-                        "Accept-Language": "en-US,en;q=0.9",
-                        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
-                        **self.custom_headers 
-                    }
-                )
-                
-                # Block heavy resources
-                await context.route("**/*", lambda route: route.abort() 
-                    if route.request.resource_type in ["image", "media", "font", "stylesheet"] 
-                    else route.continue_()
-                )
-                
-                page = await context.new_page()
-                
-                # Navigate with timeout
-                response = await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-                status = response.status if response else 0
-                
-                if status >= 400:
-                    return FetchedPage(url=url, status_code=status, error=f"HTTP {status}")
-
-                # Wait slightly for hydration if needed or just grab text
-                # Ideally we check for <main> or <body>
-                content = await page.evaluate("document.body.innerText")
-                title = await page.title()
-                
-                return FetchedPage(
-                    url=url,
-                    final_url=page.url,
-                    status_code=status,
-                    title=title,
-                    text_plain=content,
-                    text_markdown=content, # Simplification for now, usually we'd convert HTML to MD
-                )
-                
-            except Exception as e:
-                logger.warning(f"Browser fetch failed for {url}: {e}")
-                return FetchedPage(url=url, error=str(e))
-            finally:
-                if page: await page.close()
-                if context: await context.close()
+        try:
+            return await asyncio.wait_for(self._read_page(url), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return FetchedPage(url=url, error=f"Browser deadline exceeded ({self.timeout}s)")
+        except HostThrottledError as e:
+            return throttled_page(url, e)
+        except Exception as e:
+            logger.warning(f"Browser fetch failed for {url}: {e}")
+            return FetchedPage(url=url, error=str(e))
+
+    async def _read_page(self, url: str) -> FetchedPage:
+        async with self.pool.page() as page:
+            status = await self._load(page, url)
+            
+            if status >= 400:
+                return FetchedPage(url=url, status_code=status, error=f"HTTP {status}")
+
+            content = await page.evaluate("document.body ? document.body.innerText : ''")
+            title = await page.title()
+            
+            return FetchedPage(
+                url=url,
+                final_url=page.url,
+                status_code=status,
+                title=title,
+                text_plain=content,
+                text_markdown=content, # Simplification for now, usually we'd convert HTML to MD
+            )
 
     async def extract_links(self, url: str) -> List[dict]:
         """
@@ -131,81 +263,47 @@ class PlaywrightReader(BaseReader):
         if not self.browser:
             await self.start()
 
-        async with self.semaphore:
-            page = None
-            context = None
-            extracted_links = []
-            fetched_page = None
+        try:
+            return await asyncio.wait_for(self._crawl_page(url), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            return FetchedPage(url=url, error=f"Browser deadline exceeded ({self.timeout}s)"), []
+        except Exception as e:
+            logger.warning(f"Browser crawl failed for {url}: {e}")
+            return FetchedPage(url=url, error=str(e)), []
+
+    async def _crawl_page(self, url: str) -> tuple[FetchedPage, List[dict]]:
+        async with self.pool.page() as page:
+            status = await self._load(page, url)
             
+            # Extract Content (Robust)
             try:
-                context = await self.browser.new_context(
-                    user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-                )
-                
-                await context.route("**/*", lambda route: route.abort() 
-                    if route.request.resource_type in ["image", "media", "font", "stylesheet"] 
-                    else route.continue_()
-                )
-                
-                page = await context.new_page()
-                response = await page.goto(url, wait_until="domcontentloaded", timeout=15000)
-                status = response.status if response else 0
-                
-                # Extract Content (Robust)
-                try:
-                     # Wait for body to be present
-                     await page.wait_for_selector("body", timeout=5000)
-                     content = await page.evaluate("document.body.innerText")
-                     title = await page.title()
-                except Exception as e:
-                     logger.warning(f"Failed to extract content: {e}")
-                     content = ""
-                     title = "No Title"
-
-                fetched_page = FetchedPage(
-                    url=url,
-                    final_url=page.url,
-                    status_code=status,
-                    title=title,
-                    text_plain=content,
-                    text_markdown=content
-                )
+                if self.readiness != "adaptive":
+                    # The adaptive path has already waited for content
+                    await page.wait_for_selector("body", timeout=5000)
+                content = await page.evaluate("document.body.innerText")
+                title = await page.title()
+            except Exception as e:
+                logger.warning(f"Failed to extract content: {e}")
+                content = ""
+                title = "No Title"
 
-                # Extract Links (Robust)
-                try:
-                    links_data = await page.evaluate("""
-                        () => {
-                            try {
-                                const links = Array.from(document.querySelectorAll('a[href]'));
-                                return links.map(a => {
-                                    const rect = a.getBoundingClientRect();
-                                    if (rect.width < 1 || rect.height < 1) return null; 
-                                    
-                                    return {
-                                        url: a.href,
-                                        text: (a.innerText || "").slice(0, 100).trim(),
-                                        context: (a.parentElement ? (a.parentElement.innerText || "") : "").slice(0, 200).trim()
-                                    };
-                                }).filter(l => l && l.text.length > 2 && l.url.startsWith('http'));
-                            } catch (err) {
-                                return [];
-                            }
-                        }
-                    """)
-                    extracted_links = links_data
-                except Exception as e:
-                    logger.warning(f"Failed to extract links JS: {e}")
-                    extracted_links = []
+            fetched_page = FetchedPage(
+                url=url,
+                final_url=page.url,
+                status_code=status,
+                title=title,
+                text_plain=content,
+                text_markdown=content
+            )
 
+            # Extract Links (Robust)
+            try:
+                extracted_links = await page.evaluate(LINKS_JS)
             except Exception as e:
-                logger.warning(f"Browser crawl failed for {url}: {e}")
-                fetched_page = FetchedPage(url=url, error=str(e))
-                
-            finally:
-                if page: await page.close()
-                if context: await context.close()
-                
-            return fetched_page, extracted_links
+                logger.warning(f"Failed to extract links JS: {e}")
+                extracted_links = []
+
+        return fetched_page, extracted_links
 
     async def read_many(self, urls: List[str]) -> List[FetchedPage]:
         # Simple concurrent fetch for non-crawler use cases
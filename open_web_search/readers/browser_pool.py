@@ -0,0 +1,224 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, List, Optional
+from loguru import logger
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+
+_CLEAR_STORAGE_JS = "() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }"
+
+def browser_rss_bytes() -> Optional[int]:
+    """
+    Resident memory of every descendant process (Playwright driver + Chromium renderers).
+    psutil when available, /proc on Linux otherwise, None if neither works.
+    """
+    if HAS_PSUTIL:
+        try:
+            total = 0
+            for child in psutil.Process().children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # The command name may contain spaces; fields after ')' are fixed
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents.setdefault(int(fields[1]), []).append(int(entry))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    total, stack = 0, list(parents.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        stack.extend(parents.get(pid, []))
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+async def _block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+@dataclass
+class _Slot:
+    context: Any
+    page: Any
+    uses: int = 0
+
+class BrowserContextPool:
+    """
+    Bounded pool of pre-warmed browser contexts, one page each, with resource blocking
+    already routed. A context is reset between uses (cookies + storage cleared, page parked
+    on about:blank) and recycled after `max_uses`, or as soon as its page crashes.
+
+    `max_rss_bytes` caps memory across the browser's processes. Over the limit, released
+    contexts are closed instead of pooled, and new ones are not created while others are busy.
+    """
+    def __init__(
+        self,
+        browser: Any,
+        size: int = 3,
+        max_uses: int = 50,
+        context_options: Optional[Callable[[], dict]] = None,
+        max_rss_bytes: Optional[int] = None,
+        rss_probe: Callable[[], Optional[int]] = browser_rss_bytes,
+        rss_interval: float = 1.0
+    ):
+        self.browser = browser
+        self.size = size
+        self.max_uses = max_uses
+        self.context_options = context_options or dict
+        self.max_rss_bytes = max_rss_bytes
+        self.rss_probe = rss_probe
+        self.rss_interval = rss_interval
+
+        self._idle: List[_Slot] = []
+        self._total = 0
+        self._cond = asyncio.Condition()
+        self._closed = False
+        self._rss: Optional[int] = None
+        self._rss_at = 0.0
+        self.stats = {"created": 0, "reused": 0, "recycled": 0, "rss_evictions": 0, "waits": 0}
+
+    async def start(self, prewarm: Optional[int] = None) -> "BrowserContextPool":
+        """Creates `prewarm` (default: all) contexts up front so the first fetches skip setup."""
+        count = self.size if prewarm is None else min(prewarm, self.size)
+        slots = await asyncio.gather(*[self._create() for _ in range(count)], return_exceptions=True)
+        async with self._cond:
+            for slot in slots:
+                if isinstance(slot, _Slot):
+                    self._idle.append(slot)
+                    self._total += 1
+                else:
+                    logger.warning(f"[BrowserPool] Prewarm failed: {slot}")
+        return self
+
+    async def _create(self) -> _Slot:
+        context = await self.browser.new_context(**self.context_options())
+        await context.route("**/*", _block_heavy_resources)
+        page = await context.new_page()
+        self.stats["created"] += 1
+        return _Slot(context=context, page=page)
+
+    def _over_memory(self) -> bool:
+        if not self.max_rss_bytes:
+            return False
+        now = time.monotonic()
+        if now - self._rss_at >= self.rss_interval:
+            # /proc scans are cheap but not free; sample at most once per interval
+            self._rss = self.rss_probe()
+            self._rss_at = now
+        return self._rss is not None and self._rss > self.max_rss_bytes
+
+    async def _acquire(self) -> _Slot:
+        async with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("BrowserContextPool is closed.")
+                if self._idle:
+                    self.stats["reused"] += 1
+                    return self._idle.pop()
+                # Always allow one context, otherwise nothing could ever make progress
+                if self._total < self.size and (self._total == 0 or not self._over_memory()):
+                    self._total += 1
+                    break
+                self.stats["waits"] += 1
+                await self._cond.wait()
+        try:
+            return await self._create()
+        except BaseException:
+            async with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+    async def _release(self, slot: _Slot, broken: bool = False):
+        slot.uses += 1
+        keep = not broken and not self._closed and slot.uses < self.max_uses and not slot.page.is_closed()
+        if keep and self._over_memory():
+            keep = False
+            self.stats["rss_evictions"] += 1
+            logger.warning(f"[BrowserPool] Browser RSS {self._rss / 1e6:.0f}MB over limit, closing a context")
+        if keep:
+            try:
+                await slot.context.clear_cookies()
+                await slot.page.evaluate(_CLEAR_STORAGE_JS)
+                await slot.page.goto("about:blank")
+            except Exception as e:
+                logger.debug(f"[BrowserPool] Reset failed, recycling context: {e}")
+                keep = False
+
+        if not keep:
+            self.stats["recycled"] += 1
+            await self._dispose(slot)
+        async with self._cond:
+            if keep:
+                self._idle.append(slot)
+            else:
+                self._total -= 1
+            self._cond.notify()
+
+    @staticmethod
+    async def _dispose(slot: _Slot):
+        try:
+            await slot.context.close()
+        except Exception as e:
+            logger.debug(f"[BrowserPool] Context close failed: {e}")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Any]:
+        """Borrows a ready page. The context is reset (or recycled) when the block exits."""
+        slot = await self._acquire()
+        broken = False
+        try:
+            yield slot.page
+        except BaseException:
+            # Navigation errors/cancellation can leave the page mid-load; don't reuse it
+            broken = True
+            raise
+        finally:
+            await self._release(slot, broken=broken)
+
+    async def close(self):
+        async with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for slot in idle:
+            await self._dispose(slot)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "contexts": self._total,
+            "idle": len(self._idle),
+            "rss_bytes": self._rss,
+            "max_rss_bytes": self.max_rss_bytes,
+        }
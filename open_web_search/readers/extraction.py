@@ -0,0 +1,278 @@
+"""
+CPU-bound document extraction, kept free of pipeline state so it can run in worker processes.
+
+Selectolax is partly GIL-bound on the Python side (css loops, decompose, regex) and trafilatura
+is mostly pure Python, so a thread pool tops out around one core. ExtractionPool runs these
+functions in a process pool instead, sized independently of network concurrency.
+"""
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Literal, Optional, Tuple, Union
+from loguru import logger
+
+ExtractionMode = Literal["thread", "process"]
+
+NOISE_SELECTORS = [
+    'script', 'style', 'noscript', 'meta', 'head', 'link',
+    'nav', 'footer', 'header', 'aside', 'iframe', 'svg',
+    '[aria-hidden="true"]', '.ad', '.advertisement', '.social-share',
+    '#sidebar', '.sidebar', '.menu', '.widget', '.cookie-banner'
+]
+
+MAIN_CONTENT_SELECTORS = [
+    'article', 'main', '[role="main"]',
+    '.post-content', '.article-content', '.entry-content', '#content'
+]
+
+_EXCESS_NEWLINES = re.compile(r'\\n{3,}')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+def extract_text_selectolax(html_content: Union[str, bytes]) -> str:
+    """
+    Ultra-fast heuristic extraction using selectolax.
+    Attempts to locate the primary content node before extracting text.
+    """
+    return extract_html_selectolax(html_content)["text"]
+
+def extract_html_selectolax(html_content: Union[str, bytes]) -> dict:
+    """Returns {"text", "title"} for an HTML document (str or raw bytes)."""
+    from selectolax.parser import HTMLParser
+
+    tree = HTMLParser(html_content)
+
+    title_node = tree.css_first("title")
+    title = title_node.text(strip=True) if title_node else None
+
+    # 1. Strip noise (Scripts, Styles, Nav, Footers, Ads)
+    for tag in NOISE_SELECTORS:
+        for node in tree.css(tag):
+            node.decompose()
+
+    # 2. Try to find the main article container (Heuristic)
+    target_node = tree.body
+    for selector in MAIN_CONTENT_SELECTORS:
+        found = tree.css_first(selector)
+        if found:
+            target_node = found
+            break
+
+    # 3. Extract visible text with basic formatting
+    # We replace block elements with newlines for readable markdown-ish output
+    if not target_node:
+        return {"text": "", "title": title}
+
+    clean_text = target_node.text(separator='\n\n', strip=True)
+
+    # Cleanup excess newlines
+    clean_text = _EXCESS_NEWLINES.sub('\\n\\n', clean_text)
+
+    return {"text": clean_text, "title": title}
+
+def extract_html_trafilatura(html_content: Union[str, bytes]) -> dict:
+    """Returns {"text", "title"} using trafilatura (markdown output)."""
+    import trafilatura
+
+    text = trafilatura.extract(
+        html_content,
+        include_links=False,
+        include_images=False,
+        include_tables=False,
+        no_fallback=False,
+        output_format='markdown'
+    )
+    title = None
+    try:
+        metadata = trafilatura.extract_metadata(html_content)
+        title = metadata.title if metadata else None
+    except Exception:
+        pass
+    return {"text": text or "", "title": title}
+
+def _decode(content: Union[str, bytes]) -> str:
+    if isinstance(content, str):
+        return content
+    # BOM-aware for utf-8; anything else undecodable is replaced rather than failing the page
+    return content.decode("utf-8-sig", errors="replace")
+
+def extract_plain_text(content: Union[str, bytes]) -> dict:
+    """Returns {"text", "title"} for text/plain (and markdown, csv...) bodies."""
+    text = _BLANK_LINES.sub('\n\n', _decode(content).strip())
+    first_line = text.split("\n", 1)[0].strip().lstrip("# ")
+    return {"text": text, "title": first_line[:200] or None}
+
+def extract_json(content: Union[str, bytes], max_lines: int = 5000) -> dict:
+    """Flattens a JSON document into "path: value" lines, which chunk and rank like prose."""
+    try:
+        data = json.loads(_decode(content))
+    except ValueError:
+        return extract_plain_text(content)
+
+    lines = []
+    def walk(value, path):
+        if len(lines) >= max_lines:
+            return
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(item, f"{path}.{key}" if path else str(key))
+        elif isinstance(value, list):
+            for item in value:
+                walk(item, path) # Indices are noise for retrieval
+        elif isinstance(value, str):
+            if value.strip():
+                lines.append(f"{path}: {value.strip()}" if path else value.strip())
+        elif value is not None:
+            lines.append(f"{path}: {value}" if path else str(value))
+    walk(data, "")
+
+    title = None
+    if isinstance(data, dict):
+        candidate = data.get("title") or data.get("name")
+        title = candidate if isinstance(candidate, str) else None
+    return {"text": "\n".join(lines), "title": title}
+
+def _local(tag) -> str:
+    return tag.rsplit("}", 1)[-1].lower() if isinstance(tag, str) else ""
+
+def extract_xml(content: Union[str, bytes]) -> dict:
+    """
+    RSS/Atom feeds become one block per item (title + description, HTML stripped);
+    other XML is reduced to its text nodes.
+    """
+    import xml.etree.ElementTree as ET
+    from selectolax.parser import HTMLParser
+
+    try:
+        # expat ignores external entities and (2.4+) caps entity expansion
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return extract_html_selectolax(content)
+
+    def child_text(node, *names) -> str:
+        for child in node:
+            if _local(child.tag) in names:
+                return "".join(child.itertext()).strip()
+        return ""
+
+    channel = next((n for n in root.iter() if _local(n.tag) in ("channel", "feed")), root)
+    title = child_text(channel, "title") or None
+    items = [n for n in root.iter() if _local(n.tag) in ("item", "entry")]
+    if not items:
+        text = "\n".join(t.strip() for t in root.itertext() if t.strip())
+        return {"text": text, "title": title}
+
+    blocks = []
+    for item in items:
+        body = child_text(item, "description", "summary", "content", "encoded")
+        if "<" in body:
+            body = HTMLParser(body).text(separator=" ", strip=True)
+        block = "\n".join(part for part in (child_text(item, "title"), body) if part)
+        if block:
+            blocks.append(block)
+    return {"text": "\n\n".join(blocks), "title": title}
+
+EXTRACTORS = {
+    "selectolax": extract_html_selectolax,
+    "trafilatura": extract_html_trafilatura,
+    "text": extract_plain_text,
+    "json": extract_json,
+    "xml": extract_xml,
+}
+
+# Bump when an extractor's output changes; cached pages from older versions are
+# re-extracted from their stored raw HTML instead of being refetched.
+EXTRACTOR_VERSIONS = {
+    "selectolax": 1,
+    "trafilatura": 1,
+    "text": 1,
+    "json": 1,
+    "xml": 1,
+    "pdf": 1,
+}
+
+def extractor_id(method: str) -> str:
+    return f"{method}@{EXTRACTOR_VERSIONS[method]}"
+
+def extract_document(method: str, content: Union[str, bytes]) -> dict:
+    """Worker entry point (must stay a picklable module-level function)."""
+    return EXTRACTORS[method](content)
+
+def _default_workers(mode: ExtractionMode) -> int:
+    cpus = os.cpu_count() or 1
+    return min(cpus, 8) if mode == "process" else min(cpus, 4)
+
+def _process_context():
+    # forkserver children fork from a clean server process (no inherited threads or
+    # sessions); spawn is the portable fallback (Windows).
+    methods = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    if "forkserver" in methods:
+        ctx.set_forkserver_preload([__name__])
+    return ctx
+
+class ExtractionPool:
+    """
+    Shared extraction workers. One pool per (mode, workers) per process, so every reader
+    and pipeline in the process shares the same cores instead of oversubscribing them.
+    """
+    _instances: Dict[Tuple[str, int], 'ExtractionPool'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, mode: ExtractionMode = "process", workers: Optional[int] = None):
+        self.mode = mode
+        self.workers = workers or _default_workers(mode)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_instance(cls, mode: ExtractionMode = "process", workers: Optional[int] = None) -> 'ExtractionPool':
+        key = (mode, workers or _default_workers(mode))
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = ExtractionPool(mode, key[1])
+            return cls._instances[key]
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.mode == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_process_context())
+                    else:
+                        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+                    logger.debug(f"[ExtractionPool] Started {self.workers} {self.mode} workers")
+        return self._executor
+
+    async def extract(self, method: str, content: Union[str, bytes]) -> dict:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, extract_document, method, content)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Runs any picklable module-level function on the pool (e.g. PDF parsing)."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, fn, *args)
+
+    def extract_sync(self, method: str, content: Union[str, bytes]) -> dict:
+        """For callers already running inside a worker thread."""
+        return self.executor.submit(extract_document, method, content).result()
+
+    def run_sync(self, fn: Callable[..., Any], *args: Any) -> Any:
+        return self.executor.submit(fn, *args).result()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+    @classmethod
+    def shutdown_all(cls):
+        with cls._instances_lock:
+            for pool in cls._instances.values():
+                pool.shutdown()
+            cls._instances.clear()
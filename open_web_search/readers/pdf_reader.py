@@ -1,10 +1,17 @@
 import io
+import os
+import re
 import asyncio
-from typing import List, Optional
+import tempfile
+from dataclasses import dataclass
+from typing import List, Optional, Tuple, Union
 import httpx
 from loguru import logger
 from open_web_search.readers.base import BaseReader
+from open_web_search.readers.extraction import ExtractionMode, ExtractionPool
+from open_web_search.readers.router import extractor_for, sniff_document_type
 from open_web_search.schemas.results import FetchedPage
+from open_web_search.utils.scheduler import FetchScheduler, HostThrottledError, throttled_page
 
 try:
     import pypdf
@@ -12,14 +19,143 @@ try:
 except ImportError:
     HAS_PYPDF = False
 
+_WORD = re.compile(r"\w+")
+
+class PdfTooLargeError(Exception):
+    pass
+
+def select_pages(
+    total_pages: int,
+    sections: List[Tuple[str, int]],
+    query: Optional[str] = None,
+    lead_pages: int = 2
+) -> List[int]:
+    """
+    Page indices in reading-priority order: the first `lead_pages` (title, abstract, summary),
+    then the pages of outline sections whose titles share words with the query (best first),
+    then everything else in document order. Callers stop once their page/char budget is spent.
+    """
+    order = list(range(min(lead_pages, total_pages)))
+    terms = {w for w in _WORD.findall((query or "").lower()) if len(w) > 2}
+    if terms and sections:
+        starts = sorted((max(0, min(page, total_pages - 1)), title) for title, page in sections)
+        scored = []
+        for i, (start, title) in enumerate(starts):
+            end = starts[i + 1][0] if i + 1 < len(starts) else total_pages
+            score = len(terms & set(_WORD.findall(title.lower())))
+            if score:
+                scored.append((-score, start, max(end, start + 1)))
+        for _, start, end in sorted(scored):
+            order.extend(range(start, end))
+    order.extend(range(total_pages))
+    return list(dict.fromkeys(order)) # Dedup, keep priority
+
+def _outline_sections(reader) -> List[Tuple[str, int]]:
+    sections = []
+    def walk(items):
+        for item in items:
+            if isinstance(item, list):
+                walk(item)
+                continue
+            try:
+                sections.append((str(item.title), reader.get_destination_page_number(item)))
+            except Exception:
+                continue
+    try:
+        walk(reader.outline)
+    except Exception as e:
+        logger.debug(f"[PdfReader] Unreadable outline: {e}")
+    return sections
+
+def extract_pdf(source: Union[bytes, str], max_pages: int, max_chars: int, query: Optional[str] = None) -> dict:
+    """
+    Worker entry point (picklable). `source` is the PDF bytes, or the path of a spilled
+    download (pypdf then reads the file lazily instead of holding it in memory).
+    """
+    stream = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else open(source, "rb")
+    try:
+        reader = pypdf.PdfReader(stream)
+        total = len(reader.pages)
+        sections = _outline_sections(reader) if query else []
+
+        texts, chars = {}, 0
+        for index in select_pages(total, sections, query):
+            if len(texts) >= max_pages or chars >= max_chars:
+                break
+            try:
+                text = reader.pages[index].extract_text() or ""
+            except Exception as e: # One broken page shouldn't lose the document
+                logger.debug(f"[PdfReader] Page {index} failed: {e}")
+                text = ""
+            texts[index] = text
+            chars += len(text)
+
+        info = reader.metadata
+        return {
+            "text": "\n".join(texts[i] for i in sorted(texts))[:max_chars],
+            "title": str(info.title) if info and info.title else None,
+            "metadata": {str(k): str(v) for k, v in info.items()} if info else {},
+            "pages_total": total,
+            "pages_read": sorted(texts),
+        }
+    finally:
+        stream.close()
+
+@dataclass
+class _Download:
+    status_code: int
+    final_url: str
+    content_type: str
+    source: Union[bytes, str, None] = None # Bytes in memory, or a temp file path once spilled
+
+    def head(self, size: int = 1024) -> bytes:
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                return f.read(size)
+        return (self.source or b"")[:size]
+
+    def read(self) -> bytes:
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                return f.read()
+        return self.source or b""
+
+    def cleanup(self):
+        if isinstance(self.source, str):
+            try:
+                os.unlink(self.source)
+            except OSError:
+                pass
+
 class PdfReader(BaseReader):
     """
-    Specialized reader for PDF documents.
-    Downloads the PDF binary and extracts text using pypdf.
+    Specialized reader for PDF documents (URLs that look like PDFs; the body is sniffed,
+    so one that turns out to be HTML/text/JSON/XML is still extracted properly).
+
+    Downloads are streamed: capped at `max_bytes`, kept in memory up to `spill_bytes` and
+    spilled to a temp file beyond that. Parsing runs in the shared ExtractionPool (off the
+    event loop) and stops after `max_pages` pages or `max_chars` characters. With a query,
+    the PDF outline is used to read the matching sections first.
     """
-    def __init__(self, concurrency: int = 3):
+    def __init__(
+        self,
+        concurrency: int = 3,
+        scheduler: Optional[FetchScheduler] = None,
+        max_bytes: int = 25 * 1024 * 1024,
+        spill_bytes: int = 4 * 1024 * 1024,
+        max_pages: int = 50,
+        max_chars: int = 200_000,
+        extraction_mode: ExtractionMode = "process",
+        extraction_workers: Optional[int] = None
+    ):
         self.concurrency = concurrency
-        self.semaphore = asyncio.Semaphore(concurrency)
+        self.semaphore = asyncio.Semaphore(concurrency) # Bounds PDFs held in memory / on disk
+        self.scheduler = scheduler or FetchScheduler(max_concurrency=concurrency)
+        self.max_bytes = max_bytes
+        self.spill_bytes = spill_bytes
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.extraction_pool = ExtractionPool.get_instance(extraction_mode, extraction_workers)
         self.client = httpx.AsyncClient(
             timeout=30.0,
             follow_redirects=True,
@@ -28,53 +164,133 @@ class PdfReader(BaseReader):
             }
         )
 
-    async def _fetch_one(self, url: str) -> FetchedPage:
+    async def _download(self, url: str) -> _Download:
+        spill = None
+        try:
+            async with self.scheduler.slot(url, max_wait=30.0):
+                async with self.client.stream("GET", url) as resp:
+                    self.scheduler.record_response(url, resp.status_code, resp.headers)
+                    download = _Download(resp.status_code, str(resp.url), resp.headers.get("content-type", "").lower())
+                    if resp.status_code >= 400:
+                        return download
+
+                    declared = int(resp.headers.get("content-length") or 0)
+                    if declared > self.max_bytes:
+                        raise PdfTooLargeError(f"PDF is {declared} bytes (limit {self.max_bytes})")
+
+                    buffer, size = bytearray(), 0
+                    async for chunk in resp.aiter_bytes():
+                        size += len(chunk)
+                        if size > self.max_bytes:
+                            raise PdfTooLargeError(f"PDF exceeds {self.max_bytes} bytes")
+                        if spill is None and size > self.spill_bytes:
+                            spill = tempfile.NamedTemporaryFile(prefix="ows-pdf-", suffix=".pdf", delete=False)
+                            spill.write(buffer)
+                            buffer = None
+                        if spill is not None:
+                            spill.write(chunk)
+                        else:
+                            buffer.extend(chunk)
+
+            if spill is not None:
+                spill.close()
+                download.source = spill.name
+            else:
+                download.source = bytes(buffer)
+            return download
+        except BaseException:
+            if spill is not None:
+                spill.close()
+                os.unlink(spill.name)
+            raise
+
+    def _page_from_parsed(self, url: str, parsed: dict, final_url: Optional[str], status_code: int) -> FetchedPage:
+        full_text = parsed["text"]
+        if len(parsed["pages_read"]) < parsed["pages_total"]:
+            logger.debug(f"[PdfReader] Read {len(parsed['pages_read'])}/{parsed['pages_total']} pages of {url}")
+        return FetchedPage(
+            url=url,
+            final_url=final_url,
+            status_code=status_code,
+            title=parsed["title"] or url.split("/")[-1],
+            text_plain=full_text,
+            text_markdown=full_text, # PDF text is plain usually
+            metadata={
+                **parsed["metadata"],
+                "doc_type": "pdf",
+                "pages_total": parsed["pages_total"],
+                "pages_read": parsed["pages_read"],
+            }
+        )
+
+    async def parse(
+        self,
+        url: str,
+        source: Union[bytes, str],
+        query: Optional[str] = None,
+        final_url: Optional[str] = None,
+        status_code: int = 200
+    ) -> FetchedPage:
+        """
+        Parses an already-downloaded PDF (bytes or spilled file path). Also the hand-off
+        point for other readers whose fetch turned out to be a PDF, so it isn't refetched.
+        """
+        if not HAS_PYPDF:
+            return FetchedPage(url=url, status_code=status_code, error="pypdf not installed", metadata={"doc_type": "pdf"})
+        # Parse PDF (CPU-bound, seconds on big reports)
+        parsed = await self.extraction_pool.run(extract_pdf, source, self.max_pages, self.max_chars, query)
+        return self._page_from_parsed(url, parsed, final_url, status_code)
+
+    def parse_sync(self, url: str, source: Union[bytes, str], final_url: Optional[str] = None) -> FetchedPage:
+        """For callers already running inside a worker thread."""
         if not HAS_PYPDF:
-            return FetchedPage(url=url, error="pypdf not installed")
+            return FetchedPage(url=url, status_code=200, error="pypdf not installed", metadata={"doc_type": "pdf"})
+        parsed = self.extraction_pool.run_sync(extract_pdf, source, self.max_pages, self.max_chars)
+        return self._page_from_parsed(url, parsed, final_url, 200)
 
+    async def _fetch_one(self, url: str, query: Optional[str] = None) -> FetchedPage:
         async with self.semaphore:
+            download = None
             try:
                 logger.debug(f"Downloading PDF: {url}")
-                resp = await self.client.get(url)
-                
-                if resp.status_code >= 400:
-                    return FetchedPage(url=url, status_code=resp.status_code, error=f"HTTP {resp.status_code}")
-                
-                # Check Content-Type just in case
-                content_type = resp.headers.get("content-type", "").lower()
-                if "pdf" not in content_type and not url.lower().endswith(".pdf"):
-                     logger.warning(f"URL {url} might not be a PDF (Content-Type: {content_type})")
-
-                # Parse PDF
-                pdf_file = io.BytesIO(resp.content)
-                reader = pypdf.PdfReader(pdf_file)
-                
-                text = []
-                for page in reader.pages:
-                    text.append(page.extract_text())
-                
-                full_text = "\n".join(text)
-                
-                # Metadata
-                info = reader.metadata
-                title = info.title if info and info.title else url.split("/")[-1]
-                
+                download = await self._download(url)
+
+                if download.status_code >= 400:
+                    return FetchedPage(url=url, status_code=download.status_code, error=f"HTTP {download.status_code}")
+
+                # The URL only suggested a PDF; trust the bytes (e.g. /pdf/ landing pages are HTML)
+                doc_type = sniff_document_type(download.content_type, download.head(), download.final_url)
+                if doc_type == "pdf":
+                    return await self.parse(url, download.source, query, download.final_url, download.status_code)
+
+                logger.debug(f"[PdfReader] {url} is {doc_type}, not a PDF")
+                extracted = await self.extraction_pool.extract(extractor_for(doc_type, "selectolax"), download.read())
+                if not extracted["text"]:
+                    return FetchedPage(url=url, status_code=download.status_code, error=f"Empty {doc_type} document")
                 return FetchedPage(
                     url=url,
-                    final_url=str(resp.url),
-                    status_code=resp.status_code,
-                    title=title,
-                    text_plain=full_text,
-                    text_markdown=full_text, # PDF text is plain usually
-                    metadata=dict(info) if info else {}
+                    final_url=download.final_url,
+                    status_code=download.status_code,
+                    title=extracted["title"],
+                    text_plain=extracted["text"],
+                    text_markdown=extracted["text"],
+                    metadata={"doc_type": doc_type}
                 )
-                
+
+            except HostThrottledError as e:
+                return throttled_page(url, e)
+            except PdfTooLargeError as e:
+                logger.warning(f"[PdfReader] Skipping {url}: {e}")
+                return FetchedPage(url=url, error=str(e))
             except Exception as e:
                 logger.error(f"PDF fetch failed for {url}: {e}")
                 return FetchedPage(url=url, error=str(e))
+            finally:
+                if download is not None:
+                    download.cleanup()
 
-    async def read_many(self, urls: List[str]) -> List[FetchedPage]:
-        tasks = [self._fetch_one(url) for url in urls]
+    async def read_many(self, urls: List[str], query: Optional[str] = None) -> List[FetchedPage]:
+        tasks = [self._fetch_one(url, query) for url in urls]
         return await asyncio.gather(*tasks)
 
     async def close(self):
@@ -0,0 +1,74 @@
+"""
+Document-type routing from what the server actually sent (Content-Type + first bytes),
+so a PDF behind a redirect or query string isn't fed to the HTML extractor, and a body
+is extracted by the right extractor from the bytes already downloaded.
+"""
+from typing import Literal, Optional
+from urllib.parse import urlparse
+
+from open_web_search.readers.extraction import extractor_id
+
+DocumentType = Literal["html", "pdf", "text", "json", "xml"]
+
+# Types a headless browser can't read any better than the HTTP path (no escalation)
+NON_HTML_TYPES = ("pdf", "text", "json", "xml")
+
+_CONTENT_TYPES = [
+    ("application/pdf", "pdf"),
+    ("application/x-pdf", "pdf"),
+    ("text/html", "html"),
+    ("application/xhtml", "html"),
+    ("json", "json"), # application/json, application/ld+json, ...
+    ("rss", "xml"),
+    ("atom", "xml"),
+    ("xml", "xml"),
+    ("text/", "text"), # text/plain, text/markdown, text/csv (after text/html and text/xml)
+]
+
+_SUFFIXES = {".pdf": "pdf", ".json": "json", ".xml": "xml", ".rss": "xml", ".atom": "xml", ".txt": "text", ".md": "text"}
+
+def looks_like_pdf_url(url: str) -> bool:
+    """URL-only guess, used to pick the starting reader before anything is fetched."""
+    lower_url = url.lower()
+    return urlparse(lower_url).path.endswith(".pdf") or "/pdf/" in lower_url
+
+def sniff_document_type(content_type: Optional[str], body: bytes, url: str = "") -> DocumentType:
+    """
+    Magic bytes first (servers label PDFs as octet-stream or even text/html), then the
+    declared Content-Type, then the shape of the body, then the URL suffix. Defaults to HTML.
+    """
+    head = bytes(body[:1024])
+    if b"%PDF-" in head:
+        return "pdf"
+
+    declared = (content_type or "").split(";", 1)[0].strip().lower()
+    for marker, doc_type in _CONTENT_TYPES:
+        if marker in declared:
+            return doc_type
+
+    start = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if start.startswith((b"<!doctype html", b"<html")) or b"<html" in start[:256]:
+        return "html"
+    if start.startswith(b"<?xml") or start.startswith((b"<rss", b"<feed")):
+        return "xml"
+    if start.startswith((b"{", b"[")):
+        return "json"
+
+    path = urlparse(url).path.lower()
+    for suffix, doc_type in _SUFFIXES.items():
+        if path.endswith(suffix):
+            return doc_type
+    return "html"
+
+def extractor_for(doc_type: DocumentType, html_method: str) -> str:
+    """Extraction method for a (non-PDF) document type; HTML uses the reader's own extractor."""
+    return doc_type if doc_type in ("text", "json", "xml") else html_method
+
+def current_extractor(stored: Optional[str], html_extractor: str) -> str:
+    """
+    The extractor id a cached entry should carry today, given the one it was stored with
+    (`html_extractor` is the reader's own id, e.g. "selectolax@1"). Lets the page cache tell
+    "extractor upgraded" apart from "different document type".
+    """
+    name = (stored or "").split("@", 1)[0]
+    return extractor_id(name) if name in NON_HTML_TYPES else html_extractor
@@ -0,0 +1,127 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+from open_web_search.utils.health import domain_of
+
+FETCHERS = ("http", "browser")
+# Prior latency estimates (ms) until a host has its own measurements
+DEFAULT_LATENCY_MS = {"http": 1500.0, "browser": 4000.0}
+
+class FetchStrategyTable:
+    """
+    Learned per-host fetcher choice: plain HTTP (curl_cffi), Playwright, or snippet-only.
+
+    Every fetch outcome updates the host's success rate and latency (EWMA) per fetcher.
+    When HTTP keeps failing on a host but the browser works, later URLs go straight to the
+    browser instead of paying a failed HTTP attempt first. If both fail, the snippet is used.
+    Non-HTTP routes are re-probed over HTTP every `reprobe_every` decisions or after
+    `reprobe_seconds`, so a host that fixes itself is picked up again.
+    """
+    _instance: Optional['FetchStrategyTable'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(
+        self,
+        cache: Any,
+        min_samples: int = 3,
+        fail_rate: float = 0.7,
+        reprobe_every: int = 10,
+        reprobe_seconds: float = 1800,
+        alpha: float = 0.3
+    ):
+        self.cache = cache
+        self.min_samples = min_samples
+        self.fail_rate = fail_rate # Success rate below (1 - fail_rate) counts as "doesn't work here"
+        self.reprobe_every = reprobe_every
+        self.reprobe_seconds = reprobe_seconds
+        self.alpha = alpha
+        self._hosts: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self.stats = {"http": 0, "browser": 0, "snippet": 0, "probes": 0, "est_time_saved_ms": 0.0}
+
+    @classmethod
+    def get_instance(cls, cache: Any, **kwargs) -> 'FetchStrategyTable':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = FetchStrategyTable(cache, **kwargs)
+        return cls._instance
+
+    def _host(self, host: str) -> dict:
+        entry = self._hosts.get(host)
+        if entry is None:
+            stored = self.cache.get(f"strategy:{host}")
+            entry = stored if isinstance(stored, dict) else {
+                "fetchers": {f: {"n": 0, "ok": 0, "ewma_ms": None} for f in FETCHERS},
+                "decisions": 0,
+                "last_http": 0.0,
+            }
+            self._hosts[host] = entry
+        return entry
+
+    def _success_rate(self, stats: dict) -> float:
+        return (stats["ok"] + 1) / (stats["n"] + 2) # Laplace prior: unknown fetchers look 50/50
+
+    def _works(self, stats: dict) -> Optional[bool]:
+        """True/False once there are enough samples, None while still learning."""
+        if stats["n"] < self.min_samples:
+            return None
+        return self._success_rate(stats) >= 1 - self.fail_rate
+
+    def latency_ms(self, host_entry: dict, fetcher: str) -> float:
+        ewma = host_entry["fetchers"][fetcher]["ewma_ms"]
+        return ewma if ewma is not None else DEFAULT_LATENCY_MS[fetcher]
+
+    def choose(self, url: str) -> Tuple[str, Optional[str], float]:
+        """
+        Returns (route, reason, estimated_ms_saved) with route in 'fetch' | 'browser' | 'snippet'
+        ('fetch' = the HTTP reader). Savings are versus the default HTTP-then-browser path.
+        """
+        host = domain_of(url)
+        with self._lock:
+            entry = self._host(host)
+            http, browser = entry["fetchers"]["http"], entry["fetchers"]["browser"]
+            http_works = self._works(http)
+            if http_works is None or http_works:
+                self.stats["http"] += 1
+                return "fetch", None, 0.0
+
+            entry["decisions"] += 1
+            if (entry["decisions"] % self.reprobe_every == 0
+                    or time.time() - entry["last_http"] > self.reprobe_seconds):
+                self.stats["probes"] += 1
+                logger.debug(f"[FetchStrategy] Re-probing HTTP for {host}")
+                return "fetch", "re-probe", 0.0
+
+            http_ms = self.latency_ms(entry, "http")
+            if self._works(browser) is False:
+                saved = http_ms + self.latency_ms(entry, "browser")
+                self.stats["snippet"] += 1
+                self.stats["est_time_saved_ms"] += saved
+                return "snippet", "learned: http and browser fail", saved
+
+            self.stats["browser"] += 1
+            self.stats["est_time_saved_ms"] += http_ms
+            return "browser", "learned: http fails, browser works", http_ms
+
+    def record(self, url: str, fetcher: str, ok: bool, latency_ms: float):
+        host = domain_of(url)
+        with self._lock:
+            entry = self._host(host)
+            stats = entry["fetchers"][fetcher]
+            stats["n"] += 1
+            stats["ok"] += int(ok)
+            stats["ewma_ms"] = latency_ms if stats["ewma_ms"] is None else (
+                self.alpha * latency_ms + (1 - self.alpha) * stats["ewma_ms"]
+            )
+            if fetcher == "http":
+                entry["last_http"] = time.time()
+                if ok and stats["n"] > self.min_samples and not self._works(stats):
+                    # A successful re-probe resets the verdict, otherwise old failures dominate for ages
+                    stats["n"], stats["ok"] = 1, 1
+            self.cache.set(f"strategy:{host}", entry, expire=30 * 86400)
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "est_time_saved_ms": round(self.stats["est_time_saved_ms"], 1), "hosts": len(self._hosts)}
@@ -1,22 +1,41 @@
 import asyncio
 import functools
 from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import trafilatura
 from loguru import logger
 from datetime import datetime
 
 from open_web_search.readers.base import BaseReader
+from open_web_search.readers.extraction import ExtractionMode, ExtractionPool, extractor_id
+from open_web_search.readers.router import current_extractor, extractor_for, sniff_document_type
 from open_web_search.schemas.results import FetchedPage
-from open_web_search.utils.cache import CacheManager
+from open_web_search.utils.cache import CacheManager, PageCache, PageCacheEntry, TieredPageStore
 
 import random
 import hashlib
 
+if TYPE_CHECKING:
+    from open_web_search.readers.pdf_reader import PdfReader
+
 class TrafilaturaReader(BaseReader):
-    def __init__(self, max_warnings: int = 5, concurrency: int = 5, cache_dir: str = ".linker_cache", custom_headers: Optional[dict] = None):
+    def __init__(
+        self,
+        max_warnings: int = 5,
+        concurrency: int = 5,
+        cache_dir: str = ".linker_cache",
+        custom_headers: Optional[dict] = None,
+        extraction_mode: ExtractionMode = "process",
+        extraction_workers: Optional[int] = None,
+        pdf_reader: Optional["PdfReader"] = None
+    ):
+        # Network threads; trafilatura itself runs in the shared extraction pool (multi-core)
         self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.extraction_pool = ExtractionPool.get_instance(extraction_mode, extraction_workers)
         self.cache = CacheManager.get_instance(cache_dir=cache_dir)
+        self.page_cache = PageCache(self.cache, namespace="page", store=TieredPageStore.get_instance(self.cache))
+        self.extractor = extractor_id("trafilatura")
+        self.pdf_reader = pdf_reader # Takes over bodies that sniff as PDF (no refetch)
         self.custom_headers = custom_headers or {}
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -35,56 +54,84 @@ class TrafilaturaReader(BaseReader):
              base_headers.update(self.custom_headers)
         return base_headers
 
+    def _extract(self, url: str, downloaded: bytes, content_type: Optional[str] = None) -> Tuple[FetchedPage, str]:
+        doc_type = sniff_document_type(content_type, downloaded, url)
+        if doc_type == "pdf":
+            if self.pdf_reader is None:
+                return FetchedPage(url=url, status_code=200, error="PDF body and no PDF reader", metadata={"doc_type": "pdf"}), extractor_id("pdf")
+            return self.pdf_reader.parse_sync(url, downloaded), extractor_id("pdf")
+
+        method = extractor_for(doc_type, "trafilatura")
+        page = FetchedPage(url=url, status_code=200)
+        extracted = self.extraction_pool.extract_sync(method, downloaded)
+        result = extracted["text"]
+        if result:
+            page.title = extracted["title"]
+            page.text_markdown = result
+            page.text_plain = result 
+        else:
+            page.error = "Extraction returned empty"
+        if doc_type != "html":
+            page.metadata = {"doc_type": doc_type}
+        return page, self.extractor if doc_type == "html" else extractor_id(method)
+
+    def _from_cache(self, url: str, entry: PageCacheEntry) -> Optional[FetchedPage]:
+        page = self.page_cache.load(url, entry, current_extractor(entry.extractor, self.extractor))
+        if page is not None:
+            return page
+        # Extractor changed: re-extract the stored raw body instead of refetching
+        raw = self.page_cache.raw(entry)
+        if raw is None:
+            return None
+        page, extractor = self._extract(url, raw)
+        if page.error:
+            return None
+        self.page_cache.update_text(url, entry, page, extractor)
+        return page
+
     def _fetch_one_sync(self, url: str) -> FetchedPage:
-        # Check cache first
-        cache_key = f"page:{hashlib.md5(url.encode()).hexdigest()}"
-        cached_page = self.cache.get(cache_key)
-        if cached_page:
-            # Check if it was an error? Maybe we retry errors? For now, return cached.
-            # But we stored a FetchedPage object? Yes, pickle works with diskcache.
-            if not cached_page.error:
-                return cached_page
+        # Check cache first; expired entries are revalidated instead of re-read
+        entry = self.page_cache.get(url)
+        if entry and entry.is_fresh():
+            cached = self._from_cache(url, entry)
+            if cached is not None:
+                cached._fetch_origin = "cache"
+                return cached
         
         page = FetchedPage(url=url)
         try:
-            # Trafilatura's fetch_url is simple, but we can pass a config or just hope it works.
-            # However, for better control, we might want to use httpx or requests and then pass to trafilatura.
-            # But trafilatura.fetch_url does handle some things well. Let's try to pass 'headers' if possible, 
-            # unfortunately fetch_url doesn't take headers dict directly in all versions, it takes a config object.
-            # So simpler: use trafilatura's built-in download with no_ssl=True if needed.
-            # Better approach: Use requests/httpx to get HTML, then trafilatura to extract.
-            downloaded = trafilatura.fetch_url(url)
-            
-            # If default fetch fails, try custom logic could handle it, 
-            # but for now let's just make sure we are not being blocked easily. 
-            # Actually, trafilatura.fetch_url has internal UA. 
-            # Let's switch to our own download to control headers.
+            # Our own download (not trafilatura.fetch_url) to control headers and send validators.
             import httpx
+            headers = self._get_headers()
+            if entry:
+                headers.update(entry.conditional_headers())
             with httpx.Client(verify=False, follow_redirects=True, timeout=10.0) as client:
-                resp = client.get(url, headers=self._get_headers())
+                resp = client.get(url, headers=headers)
+                if resp.status_code == 304 and entry:
+                    self.page_cache.refresh(url, entry, resp.headers)
+                    cached = self._from_cache(url, entry)
+                    if cached is not None:
+                        cached._fetch_origin = "cache" # Only validators went over the wire
+                        return cached
+                    resp = client.get(url, headers=self._get_headers())
                 if resp.status_code == 200:
-                    downloaded = resp.text
+                    downloaded = resp.content
                     page.status_code = 200
                 else:
                     page.status_code = resp.status_code
                     downloaded = None
             
+            if downloaded and entry and entry.content_hash == self.page_cache.content_hash(downloaded):
+                self.page_cache.refresh(url, entry, resp.headers, not_modified=False)
+                cached = self._from_cache(url, entry)
+                if cached is not None:
+                    return cached
+
             if downloaded:
-                result = trafilatura.extract(
-                    downloaded, 
-                    include_links=False, 
-                    include_images=False, 
-                    include_tables=False,
-                    no_fallback=False,
-                    output_format='markdown' 
-                )
-                if result:
-                    page.text_markdown = result
-                    page.text_plain = result 
-                    # Cache successful result
-                    self.cache.set(cache_key, page)
-                else:
-                    page.error = "Extraction returned empty"
+                page, extractor = self._extract(url, downloaded, resp.headers.get("content-type"))
+                if not page.error:
+                    # Cache successful result (raw body + text + validators)
+                    self.page_cache.put(url, page, resp.headers, downloaded, extractor)
             else:
                 page.error = f"Failed to download: Status {page.status_code}"
                 
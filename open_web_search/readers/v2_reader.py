@@ -1,118 +1,188 @@
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional, Tuple
 from loguru import logger
-import hashlib
 
 from open_web_search.readers.base import BaseReader
+from open_web_search.readers.extraction import ExtractionMode, ExtractionPool, extract_text_selectolax, extractor_id
+from open_web_search.readers.router import current_extractor, extractor_for, sniff_document_type
 from open_web_search.schemas.results import FetchedPage
-from open_web_search.utils.cache import CacheManager
+from open_web_search.utils.cache import CacheManager, PageCache, PageCacheEntry, TieredPageStore
+from open_web_search.utils.scheduler import FetchScheduler, HostThrottledError, throttled_page
 
 try:
     from curl_cffi import requests as curl_requests
-    from selectolax.parser import HTMLParser
+    from curl_cffi import CurlHttpVersion
+    import selectolax.parser  # noqa: F401 (used by the extraction workers)
     DEPENDENCIES_LOADED = True
 except ImportError:
     DEPENDENCIES_LOADED = False
     logger.warning("V2Reader dependencies missing. Run: pip install curl_cffi selectolax")
 
+if TYPE_CHECKING:
+    from open_web_search.readers.pdf_reader import PdfReader
+
 class V2Reader(BaseReader):
     """
     Next-Generation Stealth Reader (2026 Architecture).
     Uses curl_cffi to spoof TLS/JA3 fingerprints (bypassing Cloudflare/Datadome).
     Uses selectolax for C-level, ultra-fast DOM parsing (replacing slow heuristic extraction).
+
+    Network I/O is async-native: every fetch goes through one shared curl_cffi AsyncSession
+    (keep-alive reuse, HTTP/2 multiplexing where the server supports it), paced by the
+    shared FetchScheduler (global + per-host caps, rate limits, Retry-After backoff). HTML extraction runs in the shared ExtractionPool (worker
+    processes by default), so it never blocks the event loop and scales past one core.
+
+    Bodies are routed by sniffed type (Content-Type + first bytes): HTML, plain text, JSON and
+    XML/RSS go to their extractor, PDFs are handed to `pdf_reader` as-is (no second download).
     """
-    def __init__(self, concurrency: int = 5, cache_dir: str = ".linker_cache", custom_headers: Optional[dict] = None):
+    def __init__(
+        self,
+        concurrency: int = 5,
+        cache_dir: str = ".linker_cache",
+        custom_headers: Optional[dict] = None,
+        max_per_host: int = 2,
+        timeout: float = 10,
+        extraction_mode: ExtractionMode = "process",
+        extraction_workers: Optional[int] = None,
+        scheduler: Optional[FetchScheduler] = None,
+        max_retry_wait: float = 5.0,
+        page_cache: Optional[PageCache] = None,
+        pdf_reader: Optional["PdfReader"] = None
+    ):
         if not DEPENDENCIES_LOADED:
             raise ImportError("V2Reader requires 'curl_cffi' and 'selectolax'.")
             
-        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.concurrency = concurrency
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.scheduler = scheduler or FetchScheduler(max_concurrency=concurrency, per_host_concurrency=max_per_host)
+        self.max_retry_wait = max_retry_wait # Retry a 429/503 once if the host asks us to wait at most this long
+        # CPU pool for extraction only, sized independently of network concurrency (shared process-wide)
+        self.extraction_pool = ExtractionPool.get_instance(extraction_mode, extraction_workers)
         self.cache = CacheManager.get_instance(cache_dir=cache_dir)
+        # Keeps ETag/Last-Modified/content hash so expired pages are revalidated, not re-read
+        self.page_cache = page_cache or PageCache(self.cache, namespace="v2page", store=TieredPageStore.get_instance(self.cache))
+        self.extractor = extractor_id("selectolax")
+        self.pdf_reader = pdf_reader
         self.custom_headers = custom_headers or {}
         
         # curl_cffi supports impersonate targets. We will use a modern Chrome signature.
         self.impersonate_target = "chrome120" 
 
+        # Created lazily on the running loop (AsyncSession is loop-bound)
+        self._session: Optional["curl_requests.AsyncSession"] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> "curl_requests.AsyncSession":
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._loop is not loop:
+            # One pooled session per loop: connections are kept alive and reused across pages
+            self._session = curl_requests.AsyncSession(
+                impersonate=self.impersonate_target,
+                timeout=self.timeout,
+                headers=self.custom_headers,
+                max_clients=self.concurrency,
+                http_version=CurlHttpVersion.V2TLS
+            )
+            self._loop = loop
+        return self._session
+
+    async def _get(self, url: str, headers: Optional[dict] = None):
+        session = self._get_session()
+        for attempt in range(2):
+            async with self.scheduler.slot(url, max_wait=self.timeout):
+                response = await session.get(url, headers=headers)
+            backoff = self.scheduler.record_response(url, response.status_code, response.headers)
+            if backoff is None or attempt or backoff > self.max_retry_wait:
+                return response
+            # The retry waits in the scheduler until the host's backoff is over
+        return response
+
     def _extract_text_selectolax(self, html_content: str) -> str:
+        return extract_text_selectolax(html_content)
+
+    async def _extract(self, url: str, body: bytes, content_type: Optional[str] = None) -> Tuple[FetchedPage, str]:
         """
-        Ultra-fast heuristic extraction using selectolax.
-        Attempts to locate the primary content node before extracting text.
+        2. PARSE (The Speed Move), in a worker on the raw bytes (decoding happens there too).
+        Returns the page and the id of the extractor that produced it.
         """
-        tree = HTMLParser(html_content)
-        
-        # 1. Strip noise (Scripts, Styles, Nav, Footers, Ads)
-        tags_to_remove = [
-            'script', 'style', 'noscript', 'meta', 'head', 'link', 
-            'nav', 'footer', 'header', 'aside', 'iframe', 'svg',
-            '[aria-hidden="true"]', '.ad', '.advertisement', '.social-share',
-            '#sidebar', '.sidebar', '.menu', '.widget', '.cookie-banner'
-        ]
-        
-        for tag in tags_to_remove:
-            for node in tree.css(tag):
-                node.decompose()
-                
-        # 2. Try to find the main article container (Heuristic)
-        main_content_selectors = [
-            'article', 'main', '[role="main"]', 
-            '.post-content', '.article-content', '.entry-content', '#content'
-        ]
-        
-        target_node = tree.body
-        for selector in main_content_selectors:
-            found = tree.css_first(selector)
-            if found:
-                target_node = found
-                break
-                
-        if not target_node:
-            target_node = tree.body
-            
-        # 3. Extract visible text with basic formatting
-        # We replace block elements with newlines for readable markdown-ish output
-        if not target_node:
-            return ""
-            
-        clean_text = target_node.text(separator='\n\n', strip=True)
-        
-        # Cleanup excess newlines
-        import re
-        clean_text = re.sub(r'\\n{3,}', '\\n\\n', clean_text)
-        
-        return clean_text
+        doc_type = sniff_document_type(content_type, body, url)
+        if doc_type == "pdf":
+            if self.pdf_reader is None:
+                return FetchedPage(url=url, status_code=200, error="PDF body and no PDF reader", metadata={"doc_type": "pdf"}), extractor_id("pdf")
+            return await self.pdf_reader.parse(url, body), extractor_id("pdf")
+
+        method = extractor_for(doc_type, "selectolax")
+        page = FetchedPage(url=url, status_code=200)
+        extracted = await self.extraction_pool.extract(method, body)
+        clean_text = extracted["text"]
+        # Short text is fine for a JSON/text document, on an HTML page it means a shell or a block page
+        if clean_text and (len(clean_text) > 50 or doc_type != "html"):
+            page.title = extracted["title"]
+            page.text_plain = clean_text
+            page.text_markdown = clean_text # V2 primarily focuses on raw text extraction speed
+        else:
+            page.error = "Selectolax extraction empty or too short."
+        if doc_type != "html":
+            page.metadata = {"doc_type": doc_type}
+        return page, self.extractor if doc_type == "html" else extractor_id(method)
 
-    def _fetch_one_sync(self, url: str) -> FetchedPage:
-        cache_key = f"v2page:{hashlib.md5(url.encode()).hexdigest()}"
-        cached_page = self.cache.get(cache_key)
-        if cached_page and not cached_page.error:
-            return cached_page
+    async def _from_cache(self, url: str, entry: PageCacheEntry) -> Optional[FetchedPage]:
+        page = self.page_cache.load(url, entry, current_extractor(entry.extractor, self.extractor))
+        if page is not None:
+            return page
+        # Extractor changed (or text evicted): re-extract the stored raw body, no refetch
+        raw = self.page_cache.raw(entry)
+        if raw is None:
+            return None
+        page, extractor = await self._extract(url, raw)
+        if page.error:
+            return None
+        self.page_cache.update_text(url, entry, page, extractor)
+        return page
+
+    async def _fetch_one(self, url: str) -> FetchedPage:
+        entry = self.page_cache.get(url)
+        if entry and entry.is_fresh():
+            page = await self._from_cache(url, entry)
+            if page is not None:
+                page._fetch_origin = "cache"
+                return page
 
         page = FetchedPage(url=url)
         try:
             # 1. FETCH (The Stealth Move)
-            # curl_cffi handles the TLS/JA3 spoofing perfectly.
-            response = curl_requests.get(
-                url, 
-                impersonate=self.impersonate_target,
-                timeout=10,
-                headers=self.custom_headers
-            )
+            # curl_cffi handles the TLS/JA3 spoofing perfectly, over a shared keep-alive pool.
+            # Expired entries are revalidated with a conditional GET.
+            response = await self._get(url, headers=entry.conditional_headers() if entry else None)
+
+            if response.status_code == 304 and entry:
+                self.page_cache.refresh(url, entry, response.headers)
+                cached = await self._from_cache(url, entry)
+                if cached is not None:
+                    cached._fetch_origin = "cache" # Only validators went over the wire
+                    return cached
+                response = await self._get(url) # Validators outlived the content, fetch in full
             
             page.status_code = response.status_code
             
             if response.status_code == 200:
-                # 2. PARSE (The Speed Move)
-                clean_text = self._extract_text_selectolax(response.text)
-                
-                if clean_text and len(clean_text) > 50:
-                    page.text_plain = clean_text
-                    page.text_markdown = clean_text # V2 primarily focuses on raw text extraction speed
-                    self.cache.set(cache_key, page)
-                else:
-                    page.error = "Selectolax extraction empty or too short."
+                body = response.content
+                if entry and entry.content_hash == self.page_cache.content_hash(body):
+                    # Server ignored the validators but nothing changed: skip extraction
+                    self.page_cache.refresh(url, entry, response.headers, not_modified=False)
+                    cached = await self._from_cache(url, entry)
+                    if cached is not None:
+                        return cached
+
+                page, extractor = await self._extract(url, body, response.headers.get("content-type"))
+                if not page.error:
+                    self.page_cache.put(url, page, response.headers, body, extractor)
             else:
                 page.error = f"Blocked or failed. Status: {response.status_code}"
                 
+        except HostThrottledError as e:
+            page = throttled_page(url, e)
         except Exception as e:
             page.error = str(e)
             logger.warning(f"[V2Reader] Failed to read {url}: {e}")
@@ -121,14 +191,15 @@ class V2Reader(BaseReader):
 
     async def read_many(self, urls: List[str]) -> List[FetchedPage]:
         """
-        Runs the highly optimized synchronous curl_cffi fetches concurrently.
+        Fetches all URLs concurrently on the shared AsyncSession.
         """
-        loop = asyncio.get_event_loop()
-        tasks = [
-            loop.run_in_executor(self.executor, self._fetch_one_sync, url)
-            for url in urls
-        ]
-        return await asyncio.gather(*tasks)
+        return await asyncio.gather(*[self._fetch_one(url) for url in urls])
 
     async def close(self):
-        self.executor.shutdown(wait=False)
+        if self._session is not None:
+            try:
+                await self._session.close()
+            except Exception as e:
+                logger.debug(f"[V2Reader] Session close failed: {e}")
+            self._session = None
+        # The extraction pool is shared by every reader in the process, so it stays up
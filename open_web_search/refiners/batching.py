@@ -0,0 +1,105 @@
+"""
+Length-bucketed, token-budgeted cross-encoder inference.
+
+A cross-encoder pads every pair in a batch to the longest one. With chunk_size=2000 and one
+default-sized batch, a handful of long chunks makes every short one pay for their length.
+Here pairs are truncated to the model's max length up front, sorted by token length, and cut
+into batches whose padded size (pairs x longest pair) stays within a token budget, so short
+pairs run in wide batches and long pairs in narrow ones.
+"""
+import time
+from typing import Any, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+
+CHARS_PER_TOKEN = 4 # Fallback estimate when the model exposes no (fast) tokenizer
+DEFAULT_MAX_LENGTH = 512
+
+def model_max_length(model: Any, max_length: Optional[int] = None) -> int:
+    if max_length:
+        return max_length
+    # CrossEncoder.max_length, else the tokenizer's own limit (HF uses a huge sentinel when unknown)
+    for value in (getattr(model, "max_length", None), getattr(getattr(model, "tokenizer", None), "model_max_length", None)):
+        if isinstance(value, int) and 0 < value < 100_000:
+            return value
+    return DEFAULT_MAX_LENGTH
+
+def truncate_pairs(model: Any, query: str, texts: Sequence[str], max_length: int) -> Tuple[List[str], List[int]]:
+    """
+    (texts cut to what fits in `max_length` tokens next to the query, token length of each pair).
+    Uses the model's fast tokenizer (offset mapping) when there is one, else a chars/token estimate.
+    """
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is not None and getattr(tokenizer, "is_fast", False) and texts:
+        try:
+            encoded = tokenizer(
+                [query] * len(texts), list(texts),
+                truncation="only_second", max_length=max_length, return_offsets_mapping=True
+            )
+            truncated, lengths = [], []
+            for i, text in enumerate(texts):
+                # Last character of the text still covered by a kept token
+                end = 0
+                for seq_id, (_, char_end) in zip(encoded.sequence_ids(i), encoded["offset_mapping"][i]):
+                    if seq_id == 1:
+                        end = max(end, char_end)
+                truncated.append(text[:end] if end else text)
+                lengths.append(len(encoded["input_ids"][i]))
+            return truncated, lengths
+        except Exception as e:
+            logger.debug(f"[CrossEncoderBatcher] Tokenizer truncation failed, estimating: {e}")
+
+    query_tokens = len(query) // CHARS_PER_TOKEN + 1
+    text_budget = max(1, max_length - query_tokens - 3) * CHARS_PER_TOKEN # [CLS] q [SEP] text [SEP]
+    truncated = [text[:text_budget] for text in texts]
+    lengths = [min(max_length, query_tokens + len(text) // CHARS_PER_TOKEN + 4) for text in truncated]
+    return truncated, lengths
+
+def plan_batches(lengths: Sequence[int], token_budget: int, max_batch: int = 64) -> List[List[int]]:
+    """
+    Indices grouped into batches, shortest pairs first. A batch grows while
+    (pairs + 1) x longest pair fits in `token_budget` (always at least one pair).
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in order:
+        # Sorted ascending, so the pair being added is the longest in the batch
+        if current and ((len(current) + 1) * lengths[i] > token_budget or len(current) >= max_batch):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+def predict_bucketed(
+    model: Any,
+    query: str,
+    texts: Sequence[str],
+    token_budget: int = 8192,
+    max_length: Optional[int] = None,
+    max_batch: int = 64,
+    deadline: Optional[float] = None
+) -> np.ndarray:
+    """
+    Cross-encoder scores for (query, text) pairs, in input order. Blocking: run it in a worker thread.
+    With a `deadline` (time.monotonic()), no new batch starts after it; unscored pairs are NaN.
+    """
+    if not texts:
+        return np.zeros(0, dtype=np.float32)
+    truncated, lengths = truncate_pairs(model, query, texts, model_max_length(model, max_length))
+    scores = np.full(len(texts), np.nan, dtype=np.float32)
+    batches = plan_batches(lengths, token_budget, max_batch)
+    for n, batch in enumerate(batches):
+        if deadline is not None and n and time.monotonic() >= deadline:
+            logger.debug(f"[CrossEncoderBatcher] Deadline hit, {len(batches) - n} batches unscored")
+            break
+        pairs = [[query, truncated[i]] for i in batch]
+        batch_scores = model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        scores[batch] = np.asarray(batch_scores, dtype=np.float32).reshape(-1)
+    logger.debug(
+        f"[CrossEncoderBatcher] {len(texts)} pairs in {len(batches)} batches "
+        f"(padded tokens {sum(len(b) * lengths[b[-1]] for b in batches)}, unpadded {sum(lengths)})"
+    )
+    return scores
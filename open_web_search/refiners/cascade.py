@@ -0,0 +1,194 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+import numpy as np
+from loguru import logger
+from open_web_search.config import LinkerConfig
+from open_web_search.refiners.base import BaseRefiner
+from open_web_search.refiners.batching import predict_bucketed
+from open_web_search.refiners.flash import FlashRefiner
+from open_web_search.refiners.hybrid import HybridRefiner
+from open_web_search.refiners.keyword import KeywordRefiner
+from open_web_search.refiners.mmr import normalize_rows
+from open_web_search.schemas.results import FetchedPage, EvidenceChunk
+
+class CascadeRefiner(BaseRefiner):
+    """
+    Cascade reranking: BM25 top-N -> MiniLM bi-encoder top-M -> cross-encoder top-K.
+
+    Each stage only sees what the cheaper stage before it kept, so the cross-encoder scores
+    `cascade_bi_encoder_top_m` chunks instead of every chunk of every page. The two model
+    stages have latency budgets (over budget, the previous stage's order stands), and the
+    cascade stops early when the bi-encoder's top chunk clearly beats the runner-up.
+    Per-stage counts and timings go into the `trace` dict passed to refine(), along with the
+    process-wide bi-encoder timeout / busy-skip counters.
+    """
+    # A timed-out encode can't be interrupted and keeps running against the shared MiniLM and
+    # EmbeddingCache. Encodes run concurrently, but while MAX_ABANDONED_ENCODES of them are still
+    # running past their budget, new queries skip stage 2 instead of piling more threads on.
+    MAX_ABANDONED_ENCODES = 1
+    _bi_encoder_executor = ThreadPoolExecutor(thread_name_prefix="cascade-bi-encoder")
+    _abandoned = 0
+    _abandoned_lock = threading.Lock()
+    bi_encoder_stats = {"timeouts": 0, "busy_skips": 0} # Process-wide, like the model itself
+
+    def __init__(self, config: LinkerConfig, embedding_cache_dir: Optional[str] = None):
+        self.config = config
+        self.keyword = KeywordRefiner(
+            chunk_size=config.chunk_size,
+            min_relevance=0.0,
+            top_k=config.cascade_bm25_top_n,
+            chunk_overlap=config.chunk_overlap
+        )
+        # Stage 2 reuses HybridRefiner's shared MiniLM, query memo and embedding cache,
+        # stage 3 FlashRefiner's lazily loaded cross-encoder
+        self.bi_encoder = HybridRefiner(
+            chunk_size=config.chunk_size,
+            device=config.device,
+            embedding_cache_dir=embedding_cache_dir,
+            embedding_cache_size=config.embedding_cache_size,
+            chunk_overlap=config.chunk_overlap
+        )
+        self.cross_encoder = FlashRefiner(config)
+        self._cross_encoder_error: Optional[str] = None
+
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        return self.bi_encoder.embed_query(query)
+
+    def _lazy_load(self):
+        self.cross_encoder._lazy_load()
+
+    def close(self):
+        self.bi_encoder.close()
+
+    @staticmethod
+    def _stage(name: str, n_in: int, n_out: int, started: float, **extra) -> dict:
+        return {"stage": name, "in": n_in, "out": n_out, "ms": round((time.perf_counter() - started) * 1000, 1), **extra}
+
+    @staticmethod
+    def _budget(ms: Optional[int]) -> Optional[float]:
+        return ms / 1000 if ms else None
+
+    @classmethod
+    def _abandon(cls, job: Future):
+        """Tracks a timed-out encode that is still running until it finishes."""
+        with cls._abandoned_lock:
+            cls._abandoned += 1
+        job.add_done_callback(lambda _: cls._release_abandoned())
+
+    @classmethod
+    def _release_abandoned(cls):
+        with cls._abandoned_lock:
+            cls._abandoned -= 1
+
+    def _bi_encoder_scores(self, query: str, texts: List[str]) -> np.ndarray:
+        query_embedding = self.bi_encoder.embed_query(query)
+        unit = normalize_rows(self.bi_encoder.embed_chunks(texts))
+        return unit @ (query_embedding / np.linalg.norm(query_embedding))
+
+    async def refine(self, pages: List[FetchedPage], query: str, trace: Optional[dict] = None) -> List[EvidenceChunk]:
+        trace = trace if trace is not None else {}
+        trace["refiner"] = "cascade"
+        stages = trace.setdefault("stages", [])
+        top_k = self.config.max_evidence
+        loop = asyncio.get_running_loop()
+
+        # 1. BM25 (chunks come from the per-page artifacts, scoring walks the query's postings)
+        started = time.perf_counter()
+        candidates = await self.keyword.refine(pages, query)
+        n_chunks = sum(len(self.keyword.chunker.chunks_for(p)) for p in pages if p.text_plain) # Cached artifacts
+        stages.append(self._stage("bm25", n_chunks, len(candidates), started))
+        if len(candidates) <= 1:
+            return candidates[:top_k]
+
+        # 2. Bi-encoder (MiniLM cosine)
+        started = time.perf_counter()
+        top_m = self.config.cascade_bi_encoder_top_m
+        if self.bi_encoder.model is None:
+            stages.append(self._stage("bi_encoder", len(candidates), min(top_m, len(candidates)), started, skipped="model unavailable"))
+            candidates = candidates[:top_m]
+        elif self._abandoned >= self.MAX_ABANDONED_ENCODES:
+            self.bi_encoder_stats["busy_skips"] += 1
+            stages.append(self._stage(
+                "bi_encoder", len(candidates), min(top_m, len(candidates)), started,
+                skipped="timed-out encode still running"
+            ))
+            candidates = candidates[:top_m]
+        else:
+            n_in = len(candidates)
+            job = self._bi_encoder_executor.submit(self._bi_encoder_scores, query, [c.content for c in candidates])
+            try:
+                sims = await asyncio.wait_for(
+                    asyncio.wrap_future(job),
+                    timeout=self._budget(self.config.cascade_bi_encoder_budget_ms)
+                )
+                order = np.argsort(-sims, kind="stable")[:top_m]
+                candidates = [candidates[i] for i in order]
+                for chunk, sim in zip(candidates, sims[order]):
+                    chunk.relevance_score = float(min(max(sim, 0.0), 1.0))
+                stages.append(self._stage("bi_encoder", n_in, len(candidates), started))
+
+                margin = self.config.cascade_early_exit_margin
+                if margin is not None and len(order) > 1 and sims[order[0]] - sims[order[1]] >= margin:
+                    trace["early_exit"] = "bi_encoder"
+                    logger.debug(f"[Cascade] Early exit: top-1 leads by {sims[order[0]] - sims[order[1]]:.3f}")
+                    trace["bi_encoder_stats"] = dict(self.bi_encoder_stats)
+                    return candidates[:top_k]
+            except asyncio.TimeoutError:
+                # Over budget: BM25 order stands. A started encode can't be stopped, so it is tracked
+                self.bi_encoder_stats["timeouts"] += 1
+                if not job.done():
+                    self._abandon(job)
+                candidates = candidates[:top_m]
+                stages.append(self._stage("bi_encoder", n_in, len(candidates), started, timed_out=True))
+            except Exception as e:
+                logger.error(f"[Cascade] Bi-encoder stage failed: {e}")
+                candidates = candidates[:top_m]
+                stages.append(self._stage("bi_encoder", n_in, len(candidates), started, error=str(e)))
+
+        trace["bi_encoder_stats"] = dict(self.bi_encoder_stats)
+
+        # 3. Cross-encoder (length-bucketed batches, no new batch once the budget is spent)
+        started = time.perf_counter()
+        if self._cross_encoder_error is None and not self.cross_encoder._is_loaded:
+            try:
+                await loop.run_in_executor(None, self.cross_encoder._lazy_load)
+            except Exception as e:
+                self._cross_encoder_error = str(e) or type(e).__name__ # Don't retry the load on every query
+        if self._cross_encoder_error is not None:
+            stages.append(self._stage(
+                "cross_encoder", len(candidates), min(top_k, len(candidates)), started, skipped=self._cross_encoder_error
+            ))
+            return candidates[:top_k]
+
+        started = time.perf_counter() # Budget covers scoring, not the one-off model load
+        budget = self._budget(self.config.cascade_cross_encoder_budget_ms)
+        deadline = time.monotonic() + budget if budget else None
+        scores = await loop.run_in_executor(
+            None,
+            lambda: predict_bucketed(
+                self.cross_encoder.model,
+                query,
+                [c.content for c in candidates],
+                token_budget=self.config.reranker_token_budget,
+                max_length=self.config.reranker_max_length,
+                deadline=deadline
+            )
+        )
+        scored = ~np.isnan(scores)
+        # Scored chunks by cross-encoder score, then the unscored ones in bi-encoder order
+        ranked = sorted(np.flatnonzero(scored), key=lambda i: -scores[i]) + list(np.flatnonzero(~scored))
+        results = []
+        for i in ranked[:top_k]:
+            chunk = candidates[i]
+            if scored[i]:
+                chunk.relevance_score = float(scores[i])
+                chunk.is_answer = chunk.relevance_score > 0.85 # Same confidence bar as FlashRanker
+            results.append(chunk)
+        stages.append(self._stage(
+            "cross_encoder", len(candidates), len(results), started,
+            scored=int(scored.sum()), timed_out=not bool(scored.all())
+        ))
+        return results
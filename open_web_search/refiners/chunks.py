@@ -0,0 +1,166 @@
+"""
+Page chunking: offset-based chunker, compiled tokenizer, and the per-page chunk artifact.
+
+A page is chunked and tokenized once (when it is fetched, loaded from the page cache, or at the
+latest on its first refine) and the result rides along on the FetchedPage. Every refiner, the
+crawler and the page cache's hot tier reuse it instead of re-running the chunker.
+"""
+import hashlib
+import re
+from sys import intern
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Tuple
+
+CHUNKER_VERSION = 1 # Bump when chunk boundaries or tokens change
+
+# Compiled once; \w\w+ is the old \b\w+\b plus the len(w) > 1 filter in a single scan
+_TOKEN_RE = re.compile(r"\w\w+")
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t\r\f\v]*\n\s*")
+_LINE_BREAK = re.compile(r"\n\s*")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+")
+_WHITESPACE = re.compile(r"\s+")
+
+STOP_WORDS = frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'current', 'latest', 'recent', 'it', 'this', 'that'})
+
+def tokenize(text: str, start: int = 0, end: Optional[int] = None, lowered: bool = False) -> List[str]:
+    """
+    Word tokens of `text[start:end]` without slicing it. Pass `lowered=True` when `text` is
+    already lowercase (refine() lowers each page once instead of once per chunk).
+    """
+    words = _TOKEN_RE.findall(text, start, len(text) if end is None else end)
+    if lowered:
+        return [w for w in words if w not in STOP_WORDS]
+    return [w for w in (w.lower() for w in words) if w not in STOP_WORDS]
+
+def _strip(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def _spans_between(pattern: re.Pattern, text: str, start: int, end: int) -> Iterator[Tuple[int, int]]:
+    """Stripped, non-empty spans of text[start:end] separated by `pattern`."""
+    for match in pattern.finditer(text, start, end):
+        span = _strip(text, start, match.start())
+        if span[0] < span[1]:
+            yield span
+        start = match.end()
+    span = _strip(text, start, end)
+    if span[0] < span[1]:
+        yield span
+
+def _units(text: str, chunk_size: int, chop: int) -> Iterator[Tuple[int, int]]:
+    """Paragraphs, or the sentences of paragraphs longer than a chunk, or hard chops of huge sentences."""
+    separator = _PARAGRAPH_BREAK if _PARAGRAPH_BREAK.search(text) else _LINE_BREAK
+    for p_start, p_end in _spans_between(separator, text, 0, len(text)):
+        if p_end - p_start <= chunk_size:
+            yield p_start, p_end
+            continue
+        for s_start, s_end in _spans_between(_SENTENCE_BREAK, text, p_start, p_end):
+            if s_end - s_start <= chunk_size:
+                yield s_start, s_end
+                continue
+            for i in range(s_start, s_end, chop):
+                yield i, min(i + chop, s_end)
+
+def _overlap_start(text: str, start: int, end: int, overlap: int) -> Optional[int]:
+    """Where the next chunk starts to repeat ~`overlap` chars of [start, end), snapped to a word start."""
+    if overlap <= 0:
+        return None
+    candidate = max(start + 1, end - overlap)
+    gap = _WHITESPACE.search(text, candidate, end)
+    if gap is not None:
+        candidate = gap.end()
+    return candidate if candidate < end else None
+
+def chunk_spans(text: str, chunk_size: int, overlap: int = 0) -> List[Tuple[int, int]]:
+    """
+    (start, end) offsets of the chunks of `text`, in one pass and without copying it.
+
+    Paragraphs are packed greedily up to `chunk_size` characters. Paragraphs that don't fit
+    in a chunk are split by sentence, and sentences that still don't fit are hard-chopped.
+    Consecutive chunks share about `overlap` trailing characters (capped at half a chunk).
+    """
+    overlap = max(0, min(overlap, chunk_size // 2))
+    spans = []
+    start = end = None
+    has_content = False # The current chunk holds more than the overlap carried over
+    for u_start, u_end in _units(text, chunk_size, chop=max(1, chunk_size - overlap)):
+        if start is not None and u_end - start > chunk_size:
+            if has_content:
+                spans.append((start, end))
+                start = _overlap_start(text, start, end, overlap)
+                has_content = False
+            if start is not None and u_end - start > chunk_size:
+                start = None # Overlap + unit don't fit together, the unit wins
+        if start is None:
+            start = u_start
+        end = u_end
+        has_content = True
+    if has_content:
+        spans.append((start, end))
+    return spans
+
+@dataclass(frozen=True)
+class PageChunks:
+    """
+    Chunks of one page's text_plain: offsets, tokens and stable ids.
+    Immutable and shared: copying a page (model_copy(deep=True)) keeps the same artifact.
+    """
+    key: str # Chunker settings it was built with
+    text: str # The text it was built from (a reference, so validity is mostly an identity check)
+    spans: Tuple[Tuple[int, int], ...]
+    tokens: Tuple[List[str], ...]
+    chunk_ids: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return len(self.spans)
+
+    def __deepcopy__(self, memo) -> "PageChunks":
+        return self
+
+    def approx_bytes(self) -> int:
+        # Token lists hold pointers to interned strings; ids are 32-char hex
+        return sum(len(t) for t in self.tokens) * 8 + len(self.spans) * 160
+
+    def content(self, i: int) -> str:
+        start, end = self.spans[i]
+        return self.text[start:end]
+
+class Chunker:
+    """Builds PageChunks and caches them on the page, keyed by its settings."""
+    def __init__(self, chunk_size: int = 500, chunk_overlap: int = 0):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.key = f"v{CHUNKER_VERSION}:{chunk_size}:{chunk_overlap}"
+
+    @staticmethod
+    def chunk_id(url: str, start: int, end: int) -> str:
+        return hashlib.md5(f"{url}_{start}_{end}".encode()).hexdigest()
+
+    def build(self, url: str, text: str) -> PageChunks:
+        spans = chunk_spans(text, self.chunk_size, self.chunk_overlap)
+        # Lowercase once per page, unless it changes lengths (a few Unicode chars do) and breaks offsets
+        lowered = text.lower()
+        source, is_lowered = (lowered, True) if len(lowered) == len(text) else (text, False)
+        # Interned: artifacts stay cached with their page, and repeated words then cost a pointer, not a str
+        tokens = tuple([intern(w) for w in tokenize(source, start, end, lowered=is_lowered)] for start, end in spans)
+        return PageChunks(
+            key=self.key,
+            text=text,
+            spans=tuple(spans),
+            tokens=tokens,
+            chunk_ids=tuple(self.chunk_id(url, start, end) for start, end in spans),
+        )
+
+    def is_current(self, page: Any) -> bool:
+        chunks = getattr(page, "_chunks", None)
+        text = page.text_plain or ""
+        return chunks is not None and chunks.key == self.key and (chunks.text is text or chunks.text == text)
+
+    def chunks_for(self, page: Any) -> PageChunks:
+        """The page's chunks, built and attached on first use (or if the text/settings changed)."""
+        if not self.is_current(page):
+            page._chunks = self.build(page.url, page.text_plain or "")
+        return page._chunks
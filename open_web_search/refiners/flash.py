@@ -1,10 +1,12 @@
-import torch
+import asyncio
 from typing import List
 from loguru import logger
 from open_web_search.schemas.results import FetchedPage, EvidenceChunk
 from open_web_search.refiners.base import BaseRefiner
+from open_web_search.refiners.batching import predict_bucketed
 from open_web_search.refiners.keyword import KeywordRefiner
 from open_web_search.config import LinkerConfig
+from open_web_search.utils.models import ModelRegistry, resolve_device
 
 class FlashRefiner(BaseRefiner):
     """
@@ -17,7 +19,7 @@ class FlashRefiner(BaseRefiner):
         self.model = None
         self._is_loaded = False
         # Use KeywordRefiner for efficient chunking (min_relevance=0 to keep all chunks)
-        self.chunker = KeywordRefiner(chunk_size=config.chunk_size, min_relevance=0.0)
+        self.chunker = KeywordRefiner(chunk_size=config.chunk_size, min_relevance=0.0, chunk_overlap=config.chunk_overlap)
 
     def _lazy_load(self):
         """
@@ -30,24 +32,16 @@ class FlashRefiner(BaseRefiner):
         logger.info(f"⚡ [FlashRanker] Lazy loading Cross-Encoder: {model_name}...")
         
         try:
-            from sentence_transformers import CrossEncoder
+            import sentence_transformers
             
             # Determine Device based on Config
-            device = self.config.device
-            
-            if device == "auto":
-                if torch.cuda.is_available():
-                    device = "cuda"
-                elif torch.backends.mps.is_available():
-                    device = "mps"
-                else:
-                    device = "cpu"
-            
+            device = resolve_device(self.config.device)
             logger.info(f"⚡ [FlashRanker] Device Selected: {device} (Config: {self.config.device})")
 
-            self.model = CrossEncoder(model_name, device=device, trust_remote_code=True)
+            # Weights are shared process-wide, only the first FlashRefiner pays the load
+            self.model = ModelRegistry.get_instance().cross_encoder(model_name, device)
             self._is_loaded = True
-            logger.info("⚡ [FlashRanker] Model loaded successfully.")
+            logger.info(f"⚡ [FlashRanker] Cross-Encoder ready: {model_name}")
             
         except ImportError as e:
             logger.error("❌ [FlashRanker] sentence-transformers not installed.")
@@ -69,29 +63,36 @@ class FlashRefiner(BaseRefiner):
             logger.warning("No chunks available for FlashRanker.")
             return []
 
-        # 2. Lazy Load Model
-        self._lazy_load()
+        # 2. Lazy Load Model (blocking, keep it off the event loop)
+        loop = asyncio.get_running_loop()
+        if not self._is_loaded:
+            await loop.run_in_executor(None, self._lazy_load)
 
-        # 3. Prepare Pairs for Cross-Encoder [Query, Text]
-        # CrossEncoder expects a list of tuples/lists: [[query, doc1], [query, doc2], ...]
-        pairs = [[query, chunk.content] for chunk in all_chunks]
-        
-        # 4. Predict
-        logger.info(f"⚡ [FlashRanker] Scoring {len(pairs)} chunks...")
-        # Use batch_size to avoid OOM on large sets if needed, but default is usually fine for <100 chunks
-        scores = self.model.predict(pairs)
+        # 3. Predict in a worker thread: pairs truncated to the model's max length, sorted by
+        # token length and batched by a token budget, so short chunks don't pay for long ones' padding
+        logger.info(f"⚡ [FlashRanker] Scoring {len(all_chunks)} chunks...")
+        scores = await loop.run_in_executor(
+            None,
+            lambda: predict_bucketed(
+                self.model,
+                query,
+                [chunk.content for chunk in all_chunks],
+                token_budget=self.config.reranker_token_budget,
+                max_length=self.config.reranker_max_length
+            )
+        )
 
-        # 5. Assign Scores & Sort
+        # 4. Assign Scores & Sort
         for chunk, score in zip(all_chunks, scores):
             chunk.relevance_score = float(score)
 
         # Sort descending
         ranked_chunks = sorted(all_chunks, key=lambda x: x.relevance_score, reverse=True)
         
-        # 6. Filter Top K
+        # 5. Filter Top K
         top_k = ranked_chunks[:self.config.max_evidence]
         
-        # 7. Identify Smart Snippets (Context)
+        # 6. Identify Smart Snippets (Context)
         # If score > 0.85 (Cross-Encoder is very confident), mark as answer
         for chunk in top_k:
             if chunk.relevance_score > 0.85:
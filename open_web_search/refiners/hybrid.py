@@ -1,34 +1,78 @@
-from typing import List
+import threading
+from collections import OrderedDict
+from typing import List, Optional
 import numpy as np
 from loguru import logger
 from open_web_search.refiners.base import BaseRefiner
 from open_web_search.refiners.keyword import KeywordRefiner
+from open_web_search.refiners.mmr import mmr_select, normalize_rows
 from open_web_search.schemas.results import FetchedPage, EvidenceChunk
 from open_web_search.security.authority import SourceAuthority
+from open_web_search.utils.embedding_cache import EmbeddingCache
+from open_web_search.utils.models import ModelRegistry
 
 # Try importing sentence_transformers, graceful fallback if not installed
 try:
-    from sentence_transformers import SentenceTransformer
+    import sentence_transformers
     HAS_SENTENCE_TRANSFORMERS = True
 except ImportError:
     HAS_SENTENCE_TRANSFORMERS = False
 
 class HybridRefiner(BaseRefiner):
-    def __init__(self, chunk_size: int = 500, min_relevance: float = 0.1, model_name: str = "all-MiniLM-L6-v2"):
-        self.keyword_refiner = KeywordRefiner(chunk_size=chunk_size, min_relevance=0.0) # Keyword used for chunking only mostly
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        min_relevance: float = 0.1,
+        model_name: str = "all-MiniLM-L6-v2",
+        device: str = "auto",
+        embedding_cache_dir: Optional[str] = None,
+        embedding_cache_size: int = 50_000,
+        chunk_overlap: int = 0
+    ):
+        self.keyword_refiner = KeywordRefiner(chunk_size=chunk_size, min_relevance=0.0, chunk_overlap=chunk_overlap) # Keyword used for chunking only mostly
         self.min_relevance = min_relevance
         self.authority = SourceAuthority()
         self.model = None
+        self._query_embeddings = OrderedDict() # Small memo, the result cache and refine() share it
+        self._query_lock = threading.Lock() # embed_query runs in executor threads
+        # Chunk embeddings by content hash: a paragraph is embedded once, then reused by every query/round
+        self.embedding_cache = (
+            EmbeddingCache.get_instance(embedding_cache_dir, model_name, embedding_cache_size)
+            if embedding_cache_dir else None
+        )
         
         if HAS_SENTENCE_TRANSFORMERS:
             try:
-                logger.info(f"Loading semantic model: {model_name}")
-                self.model = SentenceTransformer(model_name)
+                # Shared process-wide (LinkAnalyzer uses the same MiniLM instance)
+                self.model = ModelRegistry.get_instance().sentence_transformer(model_name, device)
             except Exception as e:
                 logger.error(f"Failed to load sentence-transformers: {e}")
         else:
             logger.warning("sentence-transformers not installed. HybridRefiner will degrade to KeywordRefiner.")
 
+    def embed_query(self, query: str) -> Optional[np.ndarray]:
+        """MiniLM query embedding, memoized so it's computed once per query. Blocking: call it off the loop."""
+        if not self.model:
+            return None
+        with self._query_lock:
+            embedding = self._query_embeddings.get(query)
+        if embedding is None:
+            embedding = self.model.encode(query) # Outside the lock: a rare duplicate encode beats serializing them
+            with self._query_lock:
+                self._query_embeddings[query] = embedding
+                if len(self._query_embeddings) > 128:
+                    self._query_embeddings.popitem(last=False)
+        return embedding
+
+    def embed_chunks(self, texts: List[str]) -> np.ndarray:
+        if self.embedding_cache is None:
+            return self.model.encode(texts)
+        return self.embedding_cache.encode(self.model, texts)
+
+    def close(self):
+        if self.embedding_cache is not None:
+            self.embedding_cache.flush()
+
     async def refine(self, pages: List[FetchedPage], query: str) -> List[EvidenceChunk]:
         # 1. First use KeywordRefiner to chunk the text (reuse logic)
         # We set min_relevance=0 to get all chunks, then we re-score.
@@ -77,14 +121,13 @@ class HybridRefiner(BaseRefiner):
         
         try:
             # Encode query and chunks
-            query_embedding = self.model.encode(query)
-            chunk_embeddings = self.model.encode(chunk_texts)
+            query_embedding = self.embed_query(query)
+            chunk_embeddings = self.embed_chunks(chunk_texts)
             
-            # Cosine similarity
-            # (1, D) . (N, D).T = (1, N)
-            scores = np.dot(chunk_embeddings, query_embedding) / (
-                np.linalg.norm(chunk_embeddings, axis=1) * np.linalg.norm(query_embedding)
-            )
+            # Cosine similarity on unit vectors (normalized once, MMR reuses them)
+            # (N, D) . (D,) = (N,)
+            unit_embeddings = normalize_rows(chunk_embeddings)
+            scores = unit_embeddings @ (query_embedding / np.linalg.norm(query_embedding))
             
             # 3. Combine Scores (Hybrid)
             # Simple average: 0.3 * keyword_score + 0.7 * semantic_score
@@ -106,68 +149,21 @@ class HybridRefiner(BaseRefiner):
 
             # 4. MMR Selection (Diversity Enforcement)
             # We want to select chunks that are high relevance but low similarity to already selected chunks.
-            
-            selected_indices = []
-            candidate_indices = list(range(len(target_chunks)))
-            
-            source_counts = {} # limit max chunks per URL
-            MAX_PER_SOURCE = 3
+            MAX_PER_SOURCE = 3 # limit max chunks per URL
             TARGET_COUNT = 15 # select top 15 diverse chunks
             
             # MMR Hyperparameter (0.7 = prefer relevance, 0.3 = prefer diversity)
             LAMBDA = 0.7 
             
-            while len(selected_indices) < TARGET_COUNT and candidate_indices:
-                best_mmr = -1.0
-                best_idx = -1
-                
-                for idx in candidate_indices:
-                    # Check source cap
-                    url = target_chunks[idx].url
-                    if source_counts.get(url, 0) >= MAX_PER_SOURCE:
-                        continue
-
-                    # Relevance part
-                    relevance = combined_scores[idx]
-                    
-                    # Diversity part
-                    if not selected_indices:
-                        diversity = 0.0
-                    else:
-                        # Similarity to already selected
-                        # We need the embedding for current chunk (idx) and selected chunks
-                        # cosine sim is (A . B) / (|A|*|B|)
-                        # Pre-calculated in chunk_embeddings
-                        
-                        # Get embedding for current candidate
-                        cand_emb = chunk_embeddings[idx]
-                        
-                        # Get embeddings for selected
-                        sel_embs = chunk_embeddings[selected_indices]
-                        
-                        # Compute max similarity to any selected chunk
-                        sims = np.dot(sel_embs, cand_emb) / (
-                            np.linalg.norm(sel_embs, axis=1) * np.linalg.norm(cand_emb)
-                        )
-                        diversity = np.max(sims)
-                    
-                    # MMR Score
-                    mmr = (LAMBDA * relevance) - ((1 - LAMBDA) * diversity)
-                    
-                    if mmr > best_mmr:
-                        best_mmr = mmr
-                        best_idx = idx
-                
-                # If we found a valid candidate
-                if best_idx != -1:
-                    selected_indices.append(best_idx)
-                    candidate_indices.remove(best_idx)
-                    
-                    url = target_chunks[best_idx].url
-                    source_counts[url] = source_counts.get(url, 0) + 1
-                else:
-                    # No more valid candidates (e.g. all hit source caps)
-                    break 
+            selected_indices = mmr_select(
+                unit_embeddings,
+                combined_scores,
+                k=TARGET_COUNT,
+                lambda_=LAMBDA,
+                groups=[c.url for c in target_chunks],
+                max_per_group=MAX_PER_SOURCE,
+                normalized=True
+            )
             
             return [target_chunks[i] for i in selected_indices]
             
@@ -1,121 +1,119 @@
-import hashlib
-from typing import List
+import heapq
+import math
+from bisect import bisect_left
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
 from open_web_search.refiners.base import BaseRefiner
+from open_web_search.refiners.chunks import STOP_WORDS, Chunker, chunk_spans, tokenize
 from open_web_search.schemas.results import FetchedPage, EvidenceChunk
 
 class BM25:
-    """Lightweight, offline BM25 implementation for Python."""
-    def __init__(self, corpus_tokens: List[List[str]]):
-        import math
-        from collections import Counter
-        
+    """
+    Lightweight, offline BM25 over an inverted index.
+
+    Each term maps to a postings list (doc ids ascending, term frequencies), so a query only
+    touches the documents that contain at least one of its terms. Pass `vocabulary` (usually
+    the query tokens) to index just those terms: a refine call scores a single query, so
+    postings for the rest of the corpus vocabulary would never be read.
+    """
+    def __init__(
+        self,
+        corpus_tokens: List[List[str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+        vocabulary: Optional[Iterable[str]] = None
+    ):
         self.corpus_size = len(corpus_tokens)
-        self.avgdl = sum(len(doc) for doc in corpus_tokens) / self.corpus_size if self.corpus_size else 0
-        self.doc_freqs = []
-        self.idf = {}
-        self.doc_len = []
+        self.doc_len = [len(doc) for doc in corpus_tokens]
+        self.avgdl = sum(self.doc_len) / self.corpus_size if self.corpus_size else 0
         
         # BM25 Hyperparameters (Standard defaults)
-        self.k1 = 1.5
-        self.b = 0.75
+        self.k1 = k1
+        self.b = b
         
-        # Build index
-        nd = {}  # word -> number of documents containing it
-        for doc in corpus_tokens:
-            self.doc_len.append(len(doc))
-            frequencies = Counter(doc)
-            self.doc_freqs.append(frequencies)
-            for word in frequencies:
-                nd[word] = nd.get(word, 0) + 1
+        # Build index: term -> (doc ids, term frequencies)
+        self.postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        vocabulary = set(vocabulary) if vocabulary is not None else None
+        for doc_id, doc in enumerate(corpus_tokens):
+            if vocabulary is not None:
+                doc = [w for w in doc if w in vocabulary]
+            for word, tf in Counter(doc).items():
+                posting = self.postings.get(word)
+                if posting is None:
+                    posting = self.postings[word] = ([], [])
+                posting[0].append(doc_id)
+                posting[1].append(tf)
                 
         # Calculate IDF
-        for word, freq in nd.items():
-            idf_score = math.log(((self.corpus_size - freq + 0.5) / (freq + 0.5)) + 1.0)
-            self.idf[word] = idf_score
+        self.idf = {
+            word: math.log(((self.corpus_size - len(docs) + 0.5) / (len(docs) + 0.5)) + 1.0)
+            for word, (docs, _) in self.postings.items()
+        }
+        
+        # Length normalization only depends on the document, so it's computed once
+        avgdl = self.avgdl or 1.0
+        self._norm = [self.k1 * (1 - self.b + self.b * (dl / avgdl)) for dl in self.doc_len]
+
+    def get_scores(self, query_tokens: List[str]) -> Dict[int, float]:
+        """Scores for every document matching at least one query token (others score 0)."""
+        scores: Dict[int, float] = {}
+        norm = self._norm
+        k1_plus = self.k1 + 1
+        # Repeated query tokens count once per occurrence, like summing over the token list
+        for word, count in Counter(query_tokens).items():
+            posting = self.postings.get(word)
+            if posting is None:
+                continue
+            weight = self.idf[word] * count
+            for doc_id, tf in zip(*posting):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight * (tf * k1_plus / (tf + norm[doc_id]))
+        return scores
 
     def get_score(self, query_tokens: List[str], doc_index: int) -> float:
         score = 0.0
-        doc_len = self.doc_len[doc_index]
-        frequencies = self.doc_freqs[doc_index]
-        
         for word in query_tokens:
-            if word not in frequencies:
+            posting = self.postings.get(word)
+            if posting is None:
                 continue
-            tf = frequencies[word]
-            idf = self.idf.get(word, 0)
-            
-            # TF scaling
-            numerator = tf * (self.k1 + 1)
-            denominator = tf + self.k1 * (1 - self.b + self.b * (doc_len / self.avgdl))
-            score += idf * (numerator / denominator)
-            
+            docs, tfs = posting
+            pos = bisect_left(docs, doc_index)
+            if pos == len(docs) or docs[pos] != doc_index:
+                continue
+            tf = tfs[pos]
+            score += self.idf[word] * (tf * (self.k1 + 1) / (tf + self._norm[doc_index]))
         return score
 
+    def top_k(self, query_tokens: List[str], k: int) -> List[Tuple[int, float]]:
+        """(doc id, score) for the k best matching documents, best first (ties in document order)."""
+        scores = self.get_scores(query_tokens)
+        # nlargest is stable, and dicts iterate in insertion order, so sort doc ids first for determinism
+        return heapq.nlargest(k, sorted(scores.items()), key=lambda item: item[1])
+
 class KeywordRefiner(BaseRefiner):
-    def __init__(self, chunk_size: int = 500, min_relevance: float = 0.1):
+    def __init__(
+        self,
+        chunk_size: int = 500,
+        min_relevance: float = 0.1,
+        top_k: Optional[int] = None,
+        chunk_overlap: int = 0
+    ):
         self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
         self.min_relevance = min_relevance
+        self.top_k = top_k # Keep only the k best chunks (None = all that pass min_relevance)
+        # Same settings -> same key, so chunks built by the page cache or another refiner are reused
+        self.chunker = Chunker(chunk_size, chunk_overlap)
         # Stop words to ignore during tokenization
-        self.stop_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were', 'be', 'been', 'current', 'latest', 'recent', 'it', 'this', 'that'}
+        self.stop_words = STOP_WORDS
 
     def _tokenize(self, text: str) -> List[str]:
-        # Simple fast tokenization
-        import re
-        words = re.findall(r'\b\w+\b', text.lower())
-        return [w for w in words if w not in self.stop_words and len(w) > 1]
+        return tokenize(text)
+
+    def chunk_spans(self, text: str) -> List[Tuple[int, int]]:
+        return chunk_spans(text, self.chunk_size, self.chunk_overlap)
 
     def _simple_chunk(self, text: str) -> List[str]:
-        # Improved chunking: split by paragraphs, then sentences if too large
-        paragraphs = text.split('\n\n')
-        if len(paragraphs) == 1:
-            paragraphs = text.split('\n')
-            
-        chunks = []
-        current_chunk = []
-        current_len = 0
-        
-        for p in paragraphs:
-            p = p.strip()
-            if not p:
-                continue
-                
-            # If a single paragraph is huge, split it by sentence
-            if len(p) > self.chunk_size:
-                # Flush current
-                if current_chunk:
-                    chunks.append("\n".join(current_chunk))
-                    current_chunk = []
-                    current_len = 0
-                
-                # Split huge para
-                sentences = p.replace(". ", ".\n").split('\n')
-                for s in sentences:
-                    if len(s) > self.chunk_size:
-                        # Hard chop if sentence is still huge
-                        for i in range(0, len(s), self.chunk_size):
-                             chunks.append(s[i:i+self.chunk_size])
-                    else:
-                        if current_len + len(s) > self.chunk_size:
-                             chunks.append("\n".join(current_chunk))
-                             current_chunk = [s]
-                             current_len = len(s)
-                        else:
-                             current_chunk.append(s)
-                             current_len += len(s)
-            
-            # Normal paragraph handling
-            elif current_len + len(p) > self.chunk_size:
-                chunks.append("\n".join(current_chunk))
-                current_chunk = [p]
-                current_len = len(p)
-            else:
-                current_chunk.append(p)
-                current_len += len(p)
-        
-        if current_chunk:
-            chunks.append("\n".join(current_chunk))
-            
-        return chunks
+        return [text[start:end] for start, end in self.chunk_spans(text)]
 
     async def refine(self, pages: List[FetchedPage], query: str) -> List[EvidenceChunk]:
         evidence = []
@@ -125,54 +123,55 @@ class KeywordRefiner(BaseRefiner):
             return evidence # Edge case: query was just stop words
             
         # 1. Gather all chunks across all pages to build Corpus
-        all_chunks_info = [] # (page_url, page_title, chunk_text)
+        # Per-page chunk artifacts (offsets, tokens, ids) are built once and reused across requests
+        all_chunks_info = [] # (page, page_chunks, i)
         corpus_tokens = []
         
         for page in pages:
             if not page.text_plain:
                 continue
             
-            chunks = self._simple_chunk(page.text_plain)
-            for chunk_text in chunks:
-                all_chunks_info.append((page.url, page.title, chunk_text))
-                corpus_tokens.append(self._tokenize(chunk_text))
+            chunks = self.chunker.chunks_for(page)
+            all_chunks_info.extend((page, chunks, i) for i in range(len(chunks)))
+            corpus_tokens.extend(chunks.tokens)
                 
         if not corpus_tokens:
             return evidence
             
         # 2. Build BM25 Index
-        bm25 = BM25(corpus_tokens)
+        bm25 = BM25(corpus_tokens, vocabulary=query_tokens)
         
-        # 3. Score against query
-        max_score = 0.0
-        raw_results = []
+        # 3. Score against query (only chunks in the query terms' postings get a score)
+        scores = bm25.get_scores(query_tokens)
+        max_score = max(scores.values(), default=0.0)
         
-        for idx, (url, title, chunk_text) in enumerate(all_chunks_info):
-            score = bm25.get_score(query_tokens, idx)
-            if score > max_score: max_score = score
-            
-            raw_results.append({
-                "url": url,
-                "title": title,
-                "content": chunk_text,
-                "score": score,
-                "idx": idx
-            })
-            
         # 4. Normalize scores to [0, 1] range to match BaseRefiner expectations
         # (HybridRefiner expects min_relevance scaling)
-        for r in raw_results:
-            normalized = (r["score"] / max_score) if max_score > 0 else 0.0
-            if normalized >= self.min_relevance:
-                 chunk_id = hashlib.md5(f'{r["url"]}_{r["idx"]}'.encode()).hexdigest()
-                 evidence.append(EvidenceChunk(
-                     url=r["url"],
-                     chunk_id=chunk_id,
-                     content=r["content"],
-                     relevance_score=normalized,
-                     title=r["title"]
-                 ))
-                 
-        # Sort by score desc
-        evidence.sort(key=lambda x: x.relevance_score, reverse=True)
+        if self.min_relevance > 0:
+            # Chunks outside the postings score 0 and can't pass, drop them before sorting
+            cutoff = self.min_relevance * max_score
+            survivors = [(idx, score) for idx, score in sorted(scores.items()) if score >= cutoff]
+        else:
+            # Everything passes (chunker mode for Hybrid/Flash): matches first, then the rest in page order
+            survivors = [(idx, scores.get(idx, 0.0)) for idx in range(len(all_chunks_info))]
+            
+        # Sort by score desc (heap when only the top k are wanted), stable so ties keep page order
+        if self.top_k is not None and self.top_k < len(survivors):
+            ranked = heapq.nlargest(self.top_k, survivors, key=lambda item: item[1])
+        else:
+            ranked = sorted(survivors, key=lambda item: item[1], reverse=True)
+            
+        # 5. Only the chunks that made it get an EvidenceChunk
+        for idx, score in ranked:
+            page, chunks, i = all_chunks_info[idx]
+            start, end = chunks.spans[i]
+            evidence.append(EvidenceChunk(
+                url=page.url,
+                chunk_id=chunks.chunk_ids[i],
+                content=chunks.content(i),
+                start_char=start,
+                end_char=end,
+                relevance_score=(score / max_score) if max_score > 0 else 0.0,
+                title=page.title
+            ))
         return evidence
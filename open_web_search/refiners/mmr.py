@@ -0,0 +1,67 @@
+"""
+Maximal Marginal Relevance selection, vectorized.
+
+Embeddings are normalized once; a running max-similarity vector is updated with one
+matrix-vector product per pick, so selecting k of n candidates costs O(k * n * d) in numpy
+instead of O(k * n * selected) Python-level iterations. Per-source caps are applied as a mask.
+"""
+from typing import Hashable, List, Optional, Sequence
+import numpy as np
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Unit-length rows (all-zero rows stay zero instead of turning into NaN)."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1.0, norms)
+
+def mmr_select(
+    embeddings: np.ndarray,
+    relevance: Sequence[float],
+    k: int,
+    lambda_: float = 0.7,
+    groups: Optional[Sequence[Hashable]] = None,
+    max_per_group: Optional[int] = None,
+    min_score: float = -1.0,
+    normalized: bool = False
+) -> List[int]:
+    """
+    Picks up to `k` indices maximizing `lambda_ * relevance - (1 - lambda_) * max_sim_to_selected`.
+
+    `groups` (e.g. chunk URLs) with `max_per_group` caps picks per group. Selection stops
+    early when no candidate scores above `min_score`. Ties go to the lowest index, like the
+    original loop in HybridRefiner.
+    """
+    scores_rel = lambda_ * np.asarray(relevance, dtype=np.float64)
+    n = len(scores_rel)
+    if n == 0 or k <= 0:
+        return []
+    unit = np.asarray(embeddings, dtype=np.float32) if normalized else normalize_rows(embeddings)
+
+    available = np.ones(n, dtype=bool)
+    max_sim = np.zeros(n, dtype=np.float64) # Diversity term is 0 until the first pick
+
+    group_ids = None
+    if groups is not None and max_per_group is not None:
+        index = {}
+        group_ids = np.fromiter((index.setdefault(g, len(index)) for g in groups), dtype=np.int64, count=n)
+        group_counts = np.zeros(len(index), dtype=np.int64)
+
+    selected: List[int] = []
+    while len(selected) < k:
+        scores = scores_rel - (1 - lambda_) * max_sim
+        scores[~available | np.isnan(scores)] = -np.inf
+        best = int(np.argmax(scores))
+        if not scores[best] > min_score:
+            break
+        selected.append(best)
+        available[best] = False
+
+        if group_ids is not None:
+            group = group_ids[best]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available[group_ids == group] = False
+
+        sims = unit @ unit[best]
+        max_sim = sims if len(selected) == 1 else np.maximum(max_sim, sims)
+    return selected
@@ -1,6 +1,6 @@
 from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any, Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 class SearchResult(BaseModel):
     title: str
@@ -23,6 +23,9 @@ class FetchedPage(BaseModel):
     language: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    _chunks: Optional[Any] = PrivateAttr(default=None) # refiners.chunks.PageChunks, built once per page text
+    _short_fetch_ms: Optional[float] = PrivateAttr(default=None) # HTTP latency of a short body, settled by browser recovery
+    _fetch_origin: Optional[str] = PrivateAttr(default=None) # 'cache' | 'throttled' when no live response was read (None = network)
 
 class EvidenceChunk(BaseModel):
     url: str
@@ -46,3 +49,16 @@ class PipelineOutput(BaseModel):
     telemetry: Dict[str, Any] = Field(default_factory=dict) # New in v0.9.5: Resilience tracking
     blocked_domains: List[str] = Field(default_factory=list)
     answer: Optional[str] = None
+
+class PipelineEvent(BaseModel):
+    """
+    Incremental update emitted by AsyncPipeline.run_stream.
+    'done' is always the last event and carries the final PipelineOutput.
+    """
+    type: Literal["plan", "results", "page", "evidence", "done"]
+    elapsed_ms: int = 0
+    rewritten_queries: List[str] = Field(default_factory=list)
+    results: List[SearchResult] = Field(default_factory=list)
+    page: Optional[FetchedPage] = None
+    evidence: List[EvidenceChunk] = Field(default_factory=list)
+    output: Optional[PipelineOutput] = None
@@ -1,17 +1,75 @@
 import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from loguru import logger
 import os
 
 from open_web_search.config import LinkerConfig
 from open_web_search.core.loop import DeepResearchLoop # Kept for backward compat if needed, but not used in new flow
+from open_web_search.server.pool import PipelinePool
 from open_web_search.server.schemas import TavilyRequest, TavilyResponse, TavilySearchResult
 
-app = FastAPI(title="Linker-Search Universal API", version="0.3.0")
+# Pipelines are expensive (engines, reader pools, models), so they are built once per
+# config key and shared for the lifetime of the app.
+_pool: PipelinePool = None
 
-# Global Agent Cache (Mocking reusable context if needed, but for now mostly stateless)
-# Ideally we init the agent per request or re-use a shared one if it's stateless.
-# DeepResearchLoop is cheap to init.
+def get_pool() -> PipelinePool:
+    global _pool
+    if _pool is None:
+        _pool = PipelinePool(max_pipelines=int(os.getenv("OWS_MAX_PIPELINES", "16")))
+    return _pool
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    pool = get_pool()
+    if os.getenv("OWS_PREWARM", "1") == "1":
+        # Build the default pipeline before the first request arrives
+        key, config_factory = _pipeline_spec(TavilyRequest(query=""), mode="fast")
+        try:
+            await pool.get(key, config_factory)
+        except Exception as e:
+            logger.error(f"Prewarm failed: {e}")
+    yield
+    await pool.aclose()
+
+app = FastAPI(title="Linker-Search Universal API", version="0.3.0", lifespan=lifespan)
+
+def _pipeline_spec(request: TavilyRequest, mode: str):
+    """
+    Returns (pool_key, config_factory) for a request.
+    Everything that changes pipeline behavior must be part of the key.
+    """
+    key = (
+        mode,
+        request.reranker,
+        request.reader,
+        request.max_evidence,
+        tuple(sorted(request.include_domains)),
+        tuple(sorted(request.exclude_domains)),
+    )
+
+    def config_factory() -> LinkerConfig:
+        config = LinkerConfig(
+            mode=mode,
+            engine_provider="searxng",
+            engine_base_url=os.getenv("SEARXNG_BASE_URL", "http://127.0.0.1:8787"),
+            search_language="auto",
+        )
+        
+        # Override V1.0.0 Optional Parameters safely
+        if request.reranker:
+            config.reranker_type = request.reranker
+        if request.reader:
+            config.reader_type = request.reader
+        if request.max_evidence:
+            config.max_evidence = request.max_evidence
+            
+        # Security Policy Mapping
+        config.security.allowed_domains = list(request.include_domains)
+        config.security.blocked_domains = list(request.exclude_domains)
+        return config
+
+    return key, config_factory
 
 @app.post("/search", response_model=TavilyResponse)
 @app.post("/v1/search", response_model=TavilyResponse) # Mock official endpoint
@@ -31,34 +89,17 @@ async def search(request: TavilyRequest):
     
     # Handle mode overrides properly
     try:
-        config = LinkerConfig(
-            mode=mode,
-            engine_provider="searxng",
-            engine_base_url=os.getenv("SEARXNG_BASE_URL", "http://127.0.0.1:8787"),
-            search_language="auto",
-        )
-        
-        # Override V1.0.0 Optional Parameters safely
-        if request.reranker:
-            config.reranker_type = request.reranker
-        if request.reader:
-            config.reader_type = request.reader
-        if request.max_evidence:
-            config.max_evidence = request.max_evidence
-            
-        # Security Policy Mapping
-        config.security.allowed_domains = request.include_domains
-        config.security.blocked_domains = request.exclude_domains
-        
+        key, config_factory = _pipeline_spec(request, mode)
+        # Validate early so bad parameters are a 400, not a 500
+        if key not in get_pool():
+            config_factory()
     except Exception as e:
         logger.error(f"Config Error: {e}")
         raise HTTPException(status_code=400, detail=f"Invalid configuration parameters: {e}")
     
-    # 2. Run Pipeline (AsyncPipeline is the new standard)
-    from open_web_search import AsyncPipeline
+    # 2. Run Pipeline on a pooled, warm AsyncPipeline (identical concurrent queries are coalesced)
     try:
-        pipeline = AsyncPipeline(config)
-        output = await pipeline.run(request.query)
+        output = await get_pool().run(key, config_factory, request.query)
     except Exception as e:
         logger.exception("Search failed")
         raise HTTPException(status_code=500, detail=str(e))
@@ -105,4 +146,14 @@ async def search(request: TavilyRequest):
 
 @app.get("/health")
 def health():
-    return {"status": "ok", "service": "linker-search"}
+    from open_web_search.utils.models import ModelRegistry
+    from open_web_search.utils.cache import TieredPageStore
+    from open_web_search.utils.embedding_cache import EmbeddingCache
+    return {
+        "status": "ok",
+        "service": "linker-search",
+        "models": ModelRegistry.get_instance().stats(),
+        "pool": get_pool().snapshot(),
+        "page_store": TieredPageStore.stats_all(),
+        "embedding_cache": EmbeddingCache.snapshot_all(),
+    }
@@ -0,0 +1,147 @@
+import asyncio
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+from loguru import logger
+
+from open_web_search.config import LinkerConfig
+from open_web_search.core.pipeline import AsyncPipeline
+from open_web_search.schemas.results import PipelineOutput
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_query(query: str) -> str:
+    return _WHITESPACE.sub(" ", query.strip().lower())
+
+class PipelinePool:
+    """
+    Pre-built, long-lived pipelines for the API server, keyed by the config knobs a
+    request can change (mode, reranker, reader, ...), plus in-flight coalescing:
+    identical concurrent queries on the same pipeline share a single execution.
+
+    Cold pipelines are built under a per-key future, so a slow build (model loads, browser
+    launch) only holds up requests for that key. The pool is LRU-bounded. An evicted
+    pipeline is closed once its in-flight runs finish.
+    """
+    def __init__(
+        self,
+        factory: Callable[[LinkerConfig], Any] = AsyncPipeline,
+        max_pipelines: int = 16
+    ):
+        self.factory = factory
+        self.max_pipelines = max_pipelines
+        self._pipelines: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._active: Dict[int, int] = {} # id(pipeline) -> running queries
+        self._retired: List[Any] = []
+        self._inflight: Dict[Tuple[Hashable, str], asyncio.Future] = {}
+        self._building: Dict[Hashable, asyncio.Future] = {}
+        self._lock = asyncio.Lock()
+        self.stats = {"pipelines_built": 0, "pipeline_hits": 0, "coalesced": 0, "evicted": 0, "runs": 0}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pipelines
+
+    async def get(self, key: Hashable, config_factory: Callable[[], LinkerConfig]) -> Any:
+        """Returns the warm pipeline for `key`, building (and starting) it on first use."""
+        async with self._lock:
+            pipeline = self._pipelines.get(key)
+            if pipeline is not None:
+                self._pipelines.move_to_end(key)
+                self.stats["pipeline_hits"] += 1
+                return pipeline
+            # One build per key; the pool lock is not held while it starts, so warm keys never wait on it
+            build = self._building.get(key)
+            if build is None:
+                build = asyncio.ensure_future(self._build(key, config_factory))
+                self._building[key] = build
+        # Shield: a disconnecting client must not abort a build other callers are waiting on
+        return await asyncio.shield(build)
+
+    async def _build(self, key: Hashable, config_factory: Callable[[], LinkerConfig]) -> Any:
+        try:
+            pipeline = self.factory(config_factory())
+            if hasattr(pipeline, "start"):
+                await pipeline.start()
+        except BaseException:
+            async with self._lock:
+                self._building.pop(key, None)
+            raise
+
+        async with self._lock:
+            self._building.pop(key, None)
+            self._pipelines[key] = pipeline
+            self.stats["pipelines_built"] += 1
+            logger.info(f"[PipelinePool] Built pipeline for {key} ({len(self._pipelines)}/{self.max_pipelines})")
+
+            while len(self._pipelines) > self.max_pipelines:
+                _, evicted = self._pipelines.popitem(last=False)
+                self.stats["evicted"] += 1
+                self._retired.append(evicted)
+        await self._close_idle_retired()
+        return pipeline
+
+    async def run(
+        self,
+        key: Hashable,
+        config_factory: Callable[[], LinkerConfig],
+        query: str
+    ) -> PipelineOutput:
+        """Runs `query` on the pooled pipeline, joining an identical in-flight run if one exists."""
+        flight_key = (key, normalize_query(query))
+        existing = self._inflight.get(flight_key)
+        if existing is not None:
+            self.stats["coalesced"] += 1
+            # Shield: a disconnecting client must not cancel the run other callers are waiting on
+            return await asyncio.shield(existing)
+
+        # Registered before the (possibly cold) pipeline build, so a burst on a cold key still coalesces
+        task = asyncio.ensure_future(self._run_tracked(key, config_factory, query))
+        self._inflight[flight_key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(flight_key, None))
+        return await asyncio.shield(task)
+
+    async def _run_tracked(self, key: Hashable, config_factory: Callable[[], LinkerConfig], query: str) -> PipelineOutput:
+        pipeline = await self.get(key, config_factory)
+        # Mark active before yielding to the loop so a concurrent eviction can't close it under us
+        self._active[id(pipeline)] = self._active.get(id(pipeline), 0) + 1
+        self.stats["runs"] += 1
+        try:
+            return await pipeline.run(query)
+        finally:
+            self._active[id(pipeline)] -= 1
+            if not self._active[id(pipeline)]:
+                del self._active[id(pipeline)]
+            await self._close_idle_retired()
+
+    async def _close_idle_retired(self):
+        idle = [p for p in self._retired if id(p) not in self._active]
+        self._retired = [p for p in self._retired if id(p) in self._active]
+        for pipeline in idle:
+            await self._close(pipeline)
+
+    @staticmethod
+    async def _close(pipeline: Any):
+        if hasattr(pipeline, "aclose"):
+            try:
+                await pipeline.aclose()
+            except Exception as e:
+                logger.warning(f"[PipelinePool] Failed to close pipeline: {e}")
+
+    async def aclose(self):
+        """Waits for in-flight runs, then closes every pipeline (app shutdown)."""
+        pending = list(self._inflight.values()) + list(self._building.values())
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        async with self._lock:
+            pipelines = list(self._pipelines.values()) + self._retired
+            self._pipelines.clear()
+            self._retired = []
+        for pipeline in pipelines:
+            await self._close(pipeline)
+
+    def snapshot(self) -> dict:
+        return {
+            **self.stats,
+            "pipelines": len(self._pipelines),
+            "inflight": len(self._inflight),
+        }
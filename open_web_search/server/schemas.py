@@ -17,7 +17,7 @@ class TavilyRequest(BaseModel):
     
     # v0.9.0 API Extensions
     mode: Optional[str] = None      # fast, balanced, deep
-    reranker: Optional[str] = None  # fast, flash
+    reranker: Optional[str] = None  # fast, flash, cascade
     reader: Optional[str] = None    # trafilatura, browser
     max_evidence: Optional[int] = None
 
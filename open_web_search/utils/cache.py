@@ -1,27 +1,355 @@
+import hashlib
 import os
-from typing import Optional, Any
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
 from diskcache import Cache
 from loguru import logger
 
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
 class CacheManager:
-    _instance: Optional['CacheManager'] = None
+    _instances: Dict[str, 'CacheManager'] = {} # One per cache_dir (pooled pipelines may use several)
+    _instances_lock = threading.Lock()
     
     def __init__(self, cache_dir: str = ".linker_cache", ttl: int = 3600):
+        self.cache_dir = os.path.abspath(cache_dir)
         self.cache = Cache(cache_dir)
         self.ttl = ttl
         logger.debug(f"Cache initialized at {cache_dir} with TTL {ttl}s")
 
     @classmethod
     def get_instance(cls, cache_dir: str = ".linker_cache", ttl: int = 3600) -> 'CacheManager':
-        if cls._instance is None:
-            cls._instance = CacheManager(cache_dir, ttl)
-        return cls._instance
+        key = os.path.abspath(cache_dir)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = CacheManager(cache_dir, ttl)
+            return cls._instances[key]
 
     def get(self, key: str) -> Optional[Any]:
         return self.cache.get(key)
 
-    def set(self, key: str, value: Any):
-        self.cache.set(key, value, expire=self.ttl)
+    def set(self, key: str, value: Any, expire: Optional[int] = None):
+        self.cache.set(key, value, expire=expire if expire is not None else self.ttl)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.cache
 
     def close(self):
         self.cache.close()
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+class TieredPageStore:
+    """
+    Two-tier blob store for page content.
+
+    - Hot tier: in-memory LRU of materialized pages, bounded by `memory_limit_bytes`.
+    - Disk tier: compressed blobs (zstd if installed, else zlib) keyed by content hash,
+      so identical bodies/texts are stored once no matter how many URLs point at them.
+    """
+    _instances: Dict[Any, 'TieredPageStore'] = {} # Keyed by the backing cache's directory
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache: Any, memory_limit_bytes: int = 64 * 1024 * 1024, retain: int = 7 * 86400, level: int = 3):
+        self.cache = cache
+        self.memory_limit_bytes = memory_limit_bytes
+        self.retain = retain
+        self.level = level
+        self._hot: "OrderedDict[str, tuple]" = OrderedDict() # key -> (page, size)
+        self._hot_bytes = 0
+        self._lock = threading.Lock()
+        self._zstd_c = zstandard.ZstdCompressor(level=level) if HAS_ZSTD else None
+        self._zstd_d = zstandard.ZstdDecompressor() if HAS_ZSTD else None
+        self.counters = {
+            "hits_memory": 0, "hits_disk": 0, "misses": 0,
+            "bytes_in": 0, "bytes_stored": 0, "bytes_deduped": 0,
+        }
+
+    @classmethod
+    def get_instance(cls, cache: Any, memory_limit_bytes: int = 64 * 1024 * 1024) -> 'TieredPageStore':
+        key = getattr(cache, "cache_dir", None) or id(cache)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = TieredPageStore(cache, memory_limit_bytes)
+            return cls._instances[key]
+
+    @classmethod
+    def stats_all(cls) -> Dict[str, dict]:
+        """stats() of every store in the process, by cache directory."""
+        with cls._instances_lock:
+            stores = list(cls._instances.items())
+        return {str(key): store.stats() for key, store in stores}
+
+    # --- Disk tier ---
+    def _compress(self, data: bytes) -> bytes:
+        # One tag byte so blobs stay readable if zstandard is (un)installed later
+        if self._zstd_c is not None:
+            return b"Z" + self._zstd_c.compress(data)
+        return b"z" + zlib.compress(data, min(self.level + 3, 9))
+
+    def _decompress(self, blob: bytes) -> bytes:
+        tag, body = blob[:1], blob[1:]
+        if tag == b"Z":
+            if self._zstd_d is None:
+                raise RuntimeError("Blob was written with zstandard, which is not installed.")
+            return self._zstd_d.decompress(body)
+        return zlib.decompress(body)
+
+    def put_blob(self, kind: str, data: bytes) -> str:
+        """Stores `data` once per content hash and returns the hash."""
+        digest = content_hash(data)
+        key = f"blob:{kind}:{digest}"
+        self.counters["bytes_in"] += len(data)
+        if key in self.cache:
+            self.counters["bytes_deduped"] += len(data)
+            return digest
+        blob = self._compress(data)
+        self.cache.set(key, blob, expire=self.retain)
+        self.counters["bytes_stored"] += len(blob)
+        return digest
+
+    def get_blob(self, kind: str, digest: Optional[str]) -> Optional[bytes]:
+        if not digest:
+            return None
+        blob = self.cache.get(f"blob:{kind}:{digest}")
+        if blob is None:
+            return None
+        try:
+            return self._decompress(blob)
+        except Exception as e:
+            logger.warning(f"[PageStore] Unreadable blob {kind}:{digest}: {e}")
+            return None
+
+    # --- Hot tier ---
+    def hot_get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._hot.get(key)
+            if item is None:
+                return None
+            self._hot.move_to_end(key)
+            self.counters["hits_memory"] += 1
+            return item[0]
+
+    def hot_put(self, key: str, page: Any, size: int):
+        if size > self.memory_limit_bytes:
+            return
+        with self._lock:
+            old = self._hot.pop(key, None)
+            if old is not None:
+                self._hot_bytes -= old[1]
+            self._hot[key] = (page, size)
+            self._hot_bytes += size
+            while self._hot_bytes > self.memory_limit_bytes:
+                _, (_, evicted_size) = self._hot.popitem(last=False)
+                self._hot_bytes -= evicted_size
+
+    def hot_drop(self, key: str):
+        with self._lock:
+            old = self._hot.pop(key, None)
+            if old is not None:
+                self._hot_bytes -= old[1]
+
+    def stats(self) -> dict:
+        c = self.counters
+        lookups = c["hits_memory"] + c["hits_disk"] + c["misses"]
+        return {
+            **c,
+            "hit_ratio": round((c["hits_memory"] + c["hits_disk"]) / lookups, 3) if lookups else None,
+            "bytes_saved": c["bytes_in"] - c["bytes_stored"],
+            "memory_bytes": self._hot_bytes,
+            "memory_limit_bytes": self.memory_limit_bytes,
+            "memory_entries": len(self._hot),
+            "codec": "zstd" if HAS_ZSTD else "zlib",
+        }
+
+@dataclass
+class PageCacheEntry:
+    """
+    Small per-URL record: response validators plus content-hash pointers into the page store.
+    The page itself is not pickled here; it is rebuilt from the store (see PageCache.load).
+    """
+    fresh_until: float
+    stored_at: float
+    page_fields: Dict[str, Any] = field(default_factory=dict) # FetchedPage minus the text fields
+    extractor: Optional[str] = None
+    text_digest: Optional[str] = None
+    markdown_digest: Optional[str] = None # None when identical to the plain text
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_length: Optional[int] = None
+    content_hash: Optional[str] = None # Of the raw body; also the key of the stored raw HTML
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.fresh_until
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+class PageCache:
+    """
+    Page-level cache with HTTP revalidation, on top of CacheManager and the TieredPageStore.
+
+    Entries are fresh for `ttl` seconds and kept for `retain` seconds. In between, readers
+    send a conditional GET (If-None-Match / If-Modified-Since). A 304, or a 200 whose body hashes
+    to the stored content, only refreshes the entry. Nothing is re-extracted.
+
+    Raw HTML and extracted text are stored separately. When the extractor version changes,
+    `load` misses and the reader re-extracts from `raw` without refetching.
+
+    With a `chunker`, pages are chunked once on their way in (put, or load from disk) and the
+    chunks are kept with the hot-tier copy, so cached pages reach the refiners pre-chunked.
+    """
+    def __init__(
+        self,
+        cache: Any,
+        namespace: str = "page",
+        ttl: Optional[int] = None,
+        retain: int = 7 * 86400,
+        store: Optional[TieredPageStore] = None,
+        chunker: Optional[Any] = None
+    ):
+        self.cache = cache
+        self.chunker = chunker # refiners.chunks.Chunker: chunk pages as they enter the cache, keep chunks in the hot tier
+        self.namespace = namespace
+        self.ttl = ttl if ttl is not None else getattr(cache, "ttl", 3600)
+        self.retain = max(retain, self.ttl)
+        self.store = store or TieredPageStore(cache, retain=self.retain)
+        self.counters = {"fresh_hits": 0, "revalidated": 0, "unchanged_body": 0, "misses": 0, "stored": 0, "reextracted": 0}
+
+    @property
+    def stats(self) -> dict:
+        return {**self.counters, "store": self.store.stats()}
+
+    def key(self, url: str) -> str:
+        return f"{self.namespace}:{hashlib.md5(url.encode()).hexdigest()}"
+
+    content_hash = staticmethod(content_hash)
+
+    def get(self, url: str) -> Optional[PageCacheEntry]:
+        entry = self.cache.get(self.key(url))
+        if not isinstance(entry, PageCacheEntry):
+            self.counters["misses"] += 1
+            self.store.counters["misses"] += 1
+            return None
+        if entry.is_fresh():
+            self.counters["fresh_hits"] += 1
+        return entry
+
+    def load(self, url: str, entry: PageCacheEntry, extractor: Optional[str] = None) -> Optional[Any]:
+        """Rebuilds the cached page (hot tier first). None if missing or extracted by another extractor version."""
+        if extractor is not None and entry.extractor != extractor:
+            return None
+        from open_web_search.schemas.results import FetchedPage
+
+        key = self.key(url)
+        page = self.store.hot_get(key)
+        if page is None:
+            text = self.store.get_blob("text", entry.text_digest)
+            if text is None:
+                self.store.counters["misses"] += 1
+                return None
+            plain = text.decode("utf-8")
+            markdown = plain
+            if entry.markdown_digest:
+                md = self.store.get_blob("text", entry.markdown_digest)
+                markdown = md.decode("utf-8") if md is not None else None
+            page = FetchedPage(**entry.page_fields, text_plain=plain, text_markdown=markdown)
+            self._chunk(page)
+            self.store.counters["hits_disk"] += 1
+            self.store.hot_put(key, page, self._page_size(page))
+        elif self.chunker is not None and not self.chunker.is_current(page):
+            # Hot page chunked with other settings (another pipeline's chunk_size); rechunk it in place
+            self._chunk(page)
+        # Callers mutate pages downstream; never hand out the cached instance
+        return page.model_copy(deep=True)
+
+    def raw(self, entry: PageCacheEntry) -> Optional[bytes]:
+        return self.store.get_blob("raw", entry.content_hash)
+
+    def put(
+        self,
+        url: str,
+        page: Any,
+        headers: Optional[Any] = None,
+        body: Optional[bytes] = None,
+        extractor: Optional[str] = None
+    ) -> PageCacheEntry:
+        now = time.time()
+        headers = headers if headers is not None else {}
+        length = headers.get("content-length")
+        entry = PageCacheEntry(
+            fresh_until=now + self.ttl,
+            stored_at=now,
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_length=int(length) if length and str(length).isdigit() else (len(body) if body is not None else None),
+            content_hash=self.store.put_blob("raw", body) if body is not None else None,
+        )
+        self._set_text(entry, page, extractor)
+        self._save(url, entry)
+        self._chunk(page)
+        self.store.hot_put(self.key(url), page.model_copy(deep=True), self._page_size(page))
+        self.counters["stored"] += 1
+        return entry
+
+    def update_text(self, url: str, entry: PageCacheEntry, page: Any, extractor: Optional[str] = None):
+        """Stores a re-extraction of the same raw body (extractor upgrade)."""
+        self._set_text(entry, page, extractor)
+        self._save(url, entry)
+        self._chunk(page)
+        self.store.hot_put(self.key(url), page.model_copy(deep=True), self._page_size(page))
+        self.counters["reextracted"] += 1
+
+    def refresh(self, url: str, entry: PageCacheEntry, headers: Optional[Any] = None, not_modified: bool = True) -> PageCacheEntry:
+        """Marks a revalidated entry fresh again (304, or 200 with an unchanged body)."""
+        headers = headers if headers is not None else {}
+        entry.fresh_until = time.time() + self.ttl
+        entry.etag = headers.get("etag") or entry.etag
+        entry.last_modified = headers.get("last-modified") or entry.last_modified
+        self._save(url, entry)
+        self.counters["revalidated" if not_modified else "unchanged_body"] += 1
+        return entry
+
+    def _set_text(self, entry: PageCacheEntry, page: Any, extractor: Optional[str]):
+        plain = page.text_plain or ""
+        entry.extractor = extractor
+        entry.page_fields = page.model_dump(exclude={"text_plain", "text_markdown"})
+        entry.text_digest = self.store.put_blob("text", plain.encode("utf-8"))
+        # Most readers set markdown == plain; store it once
+        if page.text_markdown is not None and page.text_markdown != plain:
+            entry.markdown_digest = self.store.put_blob("text", page.text_markdown.encode("utf-8"))
+        else:
+            entry.markdown_digest = None
+
+    def _chunk(self, page: Any):
+        # The artifact rides along on the page (and its copies), so refiners don't rechunk it
+        if self.chunker is not None and page.text_plain and not page.error:
+            self.chunker.chunks_for(page)
+
+    def _save(self, url: str, entry: PageCacheEntry):
+        self.cache.set(self.key(url), replace(entry), expire=self.retain)
+
+    @staticmethod
+    def _page_size(page: Any) -> int:
+        size = len(page.text_plain or "")
+        if page.text_markdown is not page.text_plain and page.text_markdown != page.text_plain:
+            size += len(page.text_markdown or "")
+        chunks = getattr(page, "_chunks", None)
+        if chunks is not None:
+            size += chunks.approx_bytes()
+        return size + 512 # Object and field overhead
@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError: # Windows: no cross-process lock, one worker per cache_dir
+    fcntl = None
+
+_KEY_BYTES = 40 # sha1 hex (numpy's S dtype strips trailing NULs, so raw digests don't round-trip)
+
+@contextmanager
+def _file_lock(path: str):
+    """Exclusive lock shared by every process using the same store (uvicorn workers on one cache_dir)."""
+    with open(path, "a+") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+class EmbeddingCache:
+    """
+    Chunk embeddings keyed by (model, content hash), stored as float16 rows in a memory-mapped
+    file so they survive restarts and are shared across queries and research rounds.
+
+    One file pair per model: `<model>.f16` (capacity x dim float16) and `<model>.keys`
+    (the content hash owning each row). The index is rebuilt from the keys file on open, so
+    there is nothing else to keep in sync. When full, the least recently used row is reused.
+    Files are created and resized under a file lock and swapped in with os.replace, so a
+    process starting up never truncates a store another process is using.
+    """
+    _instances: Dict[Tuple[str, str], 'EmbeddingCache'] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, directory: str, model_name: str, capacity: int = 50_000):
+        self.directory = directory
+        self.model_name = model_name
+        self.capacity = capacity
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+        self._base = os.path.join(directory, slug)
+        self.dim: Optional[int] = None
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._index: "OrderedDict[bytes, int]" = OrderedDict() # LRU order, oldest first
+        self._free: List[int] = []
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._open_existing()
+
+    @classmethod
+    def get_instance(cls, directory: str, model_name: str, capacity: int = 50_000) -> 'EmbeddingCache':
+        key = (os.path.abspath(directory), model_name)
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = EmbeddingCache(directory, model_name, capacity)
+            return cls._instances[key]
+
+    @classmethod
+    def snapshot_all(cls) -> Dict[str, Dict[str, dict]]:
+        """snapshot() of every open store, as {directory: {model: snapshot}}."""
+        with cls._instances_lock:
+            caches = list(cls._instances.items())
+        out: Dict[str, Dict[str, dict]] = {}
+        for (directory, model), cache in caches:
+            out.setdefault(directory, {})[model] = cache.snapshot()
+        return out
+
+    @staticmethod
+    def key(text: str) -> bytes:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest().encode("ascii")
+
+    # --- Storage ---
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            with open(self._base + ".json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def _open_existing(self):
+        if not os.path.exists(self._base + ".json"):
+            return
+        try:
+            with _file_lock(self._base + ".lock"):
+                meta = self._read_meta()
+                if meta is not None:
+                    self._load(meta)
+        except Exception as e:
+            logger.warning(f"[EmbeddingCache] Discarding unreadable store for {self.model_name}: {e}")
+            self._vectors = self._keys = None
+            self.dim = None
+            self._index.clear()
+            self._free = []
+
+    def _load(self, meta: dict):
+        """Maps the store described by `meta` (file lock held), resizing it to the configured capacity."""
+        if meta["capacity"] != self.capacity:
+            logger.warning(
+                f"[EmbeddingCache] {self.model_name} store has {meta['capacity']} rows, "
+                f"configured {self.capacity}: resizing"
+            )
+            self._resize(meta["dim"], meta["capacity"])
+        self._map(meta["dim"], self.capacity, mode="r+")
+        # Rebuild the index from the row owners (empty key = free row)
+        self._index.clear()
+        self._free = []
+        for slot, owner in enumerate(self._keys):
+            if owner:
+                self._index[bytes(owner)] = slot
+            else:
+                self._free.append(slot)
+        self._free.reverse() # pop() hands out low slots first
+        logger.debug(f"[EmbeddingCache] Opened {self.model_name}: {len(self._index)}/{self.capacity} rows")
+
+    def _map(self, dim: int, capacity: int, mode: str):
+        self.dim, self.capacity = dim, capacity
+        self._vectors = np.memmap(self._base + ".f16", dtype=np.float16, mode=mode, shape=(capacity, dim))
+        self._keys = np.memmap(self._base + ".keys", dtype=f"S{_KEY_BYTES}", mode=mode, shape=(capacity,))
+
+    def _write_store(self, dim: int, vectors: Optional[np.ndarray] = None, keys: Optional[np.ndarray] = None):
+        """Writes a fresh store of `self.capacity` rows to temp files and swaps it in (file lock held)."""
+        suffix = f".tmp{os.getpid()}"
+        new_vectors = np.memmap(self._base + ".f16" + suffix, dtype=np.float16, mode="w+", shape=(self.capacity, dim))
+        new_keys = np.memmap(self._base + ".keys" + suffix, dtype=f"S{_KEY_BYTES}", mode="w+", shape=(self.capacity,))
+        if vectors is not None:
+            new_vectors[:len(vectors)] = vectors
+            new_keys[:len(keys)] = keys
+        new_vectors.flush()
+        new_keys.flush()
+        del new_vectors, new_keys
+        os.replace(self._base + ".f16" + suffix, self._base + ".f16")
+        os.replace(self._base + ".keys" + suffix, self._base + ".keys")
+        # Metadata last: it is what makes the new files visible to other processes
+        with open(self._base + ".json" + suffix, "w") as f:
+            json.dump({"model": self.model_name, "dim": dim, "capacity": self.capacity}, f)
+        os.replace(self._base + ".json" + suffix, self._base + ".json")
+
+    def _resize(self, dim: int, stored_capacity: int):
+        old_vectors = np.memmap(self._base + ".f16", dtype=np.float16, mode="r", shape=(stored_capacity, dim))
+        old_keys = np.memmap(self._base + ".keys", dtype=f"S{_KEY_BYTES}", mode="r", shape=(stored_capacity,))
+        kept = np.flatnonzero(old_keys != b"")[:self.capacity] # Occupied rows, as many as still fit
+        vectors, keys = np.array(old_vectors[kept]), np.array(old_keys[kept])
+        del old_vectors, old_keys
+        self._write_store(dim, vectors, keys)
+
+    def _create(self, dim: int):
+        os.makedirs(self.directory, exist_ok=True)
+        with _file_lock(self._base + ".lock"):
+            meta = self._read_meta()
+            if meta is not None and meta["dim"] == dim:
+                self._load(meta) # Another process created it since we looked
+                return
+            self._write_store(dim)
+            self._map(dim, self.capacity, mode="r+")
+        self._index.clear()
+        self._free = list(range(self.capacity - 1, -1, -1))
+
+    def _slot_for_new(self) -> int:
+        if self._free:
+            return self._free.pop()
+        # Full: reuse the least recently used row
+        _, slot = self._index.popitem(last=False)
+        self.stats["evictions"] += 1
+        return slot
+
+    # --- API ---
+    def get_many(self, keys: Sequence[bytes]) -> List[Optional[np.ndarray]]:
+        with self._lock:
+            out = []
+            for key in keys:
+                slot = self._index.get(key)
+                if slot is None or self._keys[slot] != key:
+                    out.append(None)
+                    continue
+                self._index.move_to_end(key)
+                out.append(np.asarray(self._vectors[slot], dtype=np.float32))
+            return out
+
+    def put_many(self, keys: Sequence[bytes], embeddings: np.ndarray):
+        embeddings = np.asarray(embeddings)
+        if embeddings.ndim != 2 or not len(keys):
+            return
+        with self._lock:
+            if self._vectors is None:
+                self._create(embeddings.shape[1])
+            elif embeddings.shape[1] != self.dim:
+                logger.warning(f"[EmbeddingCache] Dimension mismatch for {self.model_name} ({embeddings.shape[1]} != {self.dim})")
+                return
+            for key, vector in zip(keys, embeddings):
+                slot = self._index.get(key)
+                if slot is None:
+                    slot = self._slot_for_new()
+                self._vectors[slot] = vector
+                self._keys[slot] = key
+                self._index[key] = slot
+                self._index.move_to_end(key)
+
+    def encode(self, model: Any, texts: Sequence[str], batch_size: int = 64) -> np.ndarray:
+        """
+        Embeddings for `texts` (float32, one row per text). Only texts not seen before are
+        sent to `model.encode`, deduplicated and in a single batched call.
+        """
+        keys = [self.key(t) for t in texts]
+        cached = self.get_many(keys)
+
+        missing: Dict[bytes, str] = {}
+        for key, text, vector in zip(keys, texts, cached):
+            if vector is None:
+                missing.setdefault(key, text)
+        self.stats["hits"] += len(texts) - sum(v is None for v in cached)
+        self.stats["misses"] += len(missing)
+
+        if missing:
+            fresh = np.asarray(model.encode(list(missing.values()), batch_size=batch_size), dtype=np.float32)
+            self.put_many(list(missing), fresh)
+            # Hand out what later hits will see (float16-rounded), so results don't shift on reuse
+            computed = dict(zip(missing, fresh.astype(np.float16).astype(np.float32)))
+            cached = [v if v is not None else computed[k] for k, v in zip(keys, cached)]
+        return np.stack(cached) if cached else np.zeros((0, self.dim or 0), dtype=np.float32)
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._keys.flush()
+
+    def snapshot(self) -> dict:
+        return {**self.stats, "rows": len(self._index), "capacity": self.capacity, "dim": self.dim}
@@ -0,0 +1,243 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Literal, Optional, Tuple
+from urllib.parse import urlparse
+from loguru import logger
+
+from open_web_search.readers.router import NON_HTML_TYPES
+
+Route = Literal["fetch", "browser", "snippet"]
+CircuitState = Literal["closed", "open", "half_open"]
+
+BLOCK_STATUSES = {401, 403, 429, 503}
+GONE_STATUSES = {404, 410}
+CHALLENGE_STATUSES = {403, 503}
+CHALLENGE_MARKERS = ("enable javascript", "cloudflare", "checking your browser", "captcha")
+CHALLENGE_MAX_CHARS = 1500 # Interstitials are short; a long article that mentions "captcha" is content
+SHORT_PAGE_CHARS = 300
+PROBE_REASON = "half-open probe"
+
+@dataclass
+class _Breaker:
+    state: str = "closed"
+    failures: int = 0 # Consecutive HTTP failures
+    trips: int = 0 # Consecutive openings (open time doubles each trip)
+    open_until: float = 0.0
+    last_recovery: Optional[str] = None # What worked last time HTTP didn't: "browser" | "snippet"
+    probing: bool = False # Half-open probe in flight (process-local)
+    probe_started: float = 0.0
+    probe_url: Optional[str] = None
+
+def domain_of(url: str) -> str:
+    netloc = urlparse(url).netloc.lower()
+    return netloc[4:] if netloc.startswith("www.") else netloc
+
+def looks_like_challenge(status_code: Optional[int], text: Optional[str]) -> bool:
+    """Bot wall / JS interstitial: a 403/503, or a short page carrying a challenge marker."""
+    if status_code in CHALLENGE_STATUSES:
+        return True
+    if not text or len(text) >= CHALLENGE_MAX_CHARS:
+        return False
+    lowered = text.lower()
+    return any(m in lowered for m in CHALLENGE_MARKERS)
+
+def classify_failure(
+    status_code: Optional[int],
+    error: Optional[str],
+    text: Optional[str],
+    doc_type: Optional[str] = None
+) -> Optional[str]:
+    """
+    'gone' | 'blocked' | 'error' | 'short' for a failed fetch, None for a usable page.
+    'short' is undecided (a terse page or a JS shell) until a browser read settles it.
+    """
+    if status_code in GONE_STATUSES:
+        return "gone"
+    if status_code in BLOCK_STATUSES:
+        return "blocked"
+    if error or (status_code and status_code >= 400):
+        return "error"
+    if doc_type in NON_HTML_TYPES: # A small JSON/text/XML body is the document, not a failed render
+        return None
+    if looks_like_challenge(status_code, text):
+        return "blocked"
+    if not text or len(text) < SHORT_PAGE_CHARS:
+        return "short"
+    return None
+
+class DomainHealth:
+    """
+    Negative cache (per URL) and circuit breakers (per domain), shared by every pipeline
+    in the process and persisted in the disk cache so restarts don't relearn them.
+
+    Circuit: closed -> open after `failure_threshold` consecutive failures. While open,
+    URLs on the domain skip the HTTP fetch and go to whatever recovered them last time
+    (browser or snippet). After `open_seconds` (doubling per trip) one half-open probe is
+    let through; success closes the circuit, failure re-opens it.
+    """
+    _instance: Optional['DomainHealth'] = None
+    _instance_lock = threading.Lock()
+
+    NEGATIVE_TTLS = {"gone": 3600, "blocked": 900, "error": 300}
+
+    def __init__(
+        self,
+        cache: Any,
+        failure_threshold: int = 3,
+        open_seconds: float = 300,
+        max_open_seconds: float = 3600,
+        negative_ttl: Optional[int] = None
+    ):
+        self.cache = cache
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.negative_ttls = dict(self.NEGATIVE_TTLS)
+        if negative_ttl is not None:
+            self.negative_ttls = {k: min(v, negative_ttl) if k != "gone" else v for k, v in self.negative_ttls.items()}
+        self._breakers: Dict[str, _Breaker] = {}
+        self._lock = threading.Lock()
+        self.stats = {"negative_hits": 0, "routed_browser": 0, "routed_snippet": 0, "trips": 0, "probes": 0}
+
+    @classmethod
+    def get_instance(cls, cache: Any, **kwargs) -> 'DomainHealth':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = DomainHealth(cache, **kwargs)
+        return cls._instance
+
+    # --- Negative cache ---
+    def _negative_key(self, url: str) -> str:
+        return f"health:neg:{url}"
+
+    def negative(self, url: str) -> Optional[dict]:
+        """The remembered failure for `url`, if it is still within its TTL."""
+        return self.cache.get(self._negative_key(url))
+
+    # --- Breakers ---
+    def _breaker(self, domain: str) -> _Breaker:
+        breaker = self._breakers.get(domain)
+        if breaker is None:
+            stored = self.cache.get(f"health:cb:{domain}")
+            breaker = _Breaker(**stored) if isinstance(stored, dict) else _Breaker()
+            breaker.probing = False
+            self._breakers[domain] = breaker
+        return breaker
+
+    def _persist(self, domain: str, breaker: _Breaker):
+        self.cache.set(f"health:cb:{domain}", asdict(breaker), expire=7 * 86400)
+
+    def state(self, url: str) -> str:
+        with self._lock:
+            return self._breaker(domain_of(url)).state
+
+    def route(self, url: str) -> Tuple[Route, Optional[str]]:
+        """
+        Decides how to read `url`: ('fetch' | 'browser' | 'snippet', reason).
+        Consumes the half-open probe slot when it hands one out (reason PROBE_REASON):
+        that URL must then really go over HTTP, or the circuit waits for the probe timeout.
+        """
+        negative = self.negative(url)
+        if negative:
+            self.stats["negative_hits"] += 1
+            return self._recovery_route(negative.get("recovery")), f"negative cache ({negative['kind']})"
+
+        domain = domain_of(url)
+        with self._lock:
+            breaker = self._breaker(domain)
+            if breaker.state == "closed":
+                return "fetch", None
+            now = time.time()
+            if breaker.state == "open" and now >= breaker.open_until:
+                breaker.state = "half_open"
+            # A probe that never reported back (cancelled run) must not wedge the circuit
+            if breaker.state == "half_open" and (not breaker.probing or now - breaker.probe_started > 60):
+                breaker.probing = True
+                breaker.probe_started = now
+                breaker.probe_url = url
+                self.stats["probes"] += 1
+                logger.info(f"[DomainHealth] Half-open probe for {domain}")
+                return "fetch", PROBE_REASON
+            route = self._recovery_route(breaker.last_recovery)
+        return route, f"circuit {breaker.state}"
+
+    def _recovery_route(self, recovery: Optional[str]) -> Route:
+        route: Route = "browser" if recovery == "browser" else "snippet"
+        self.stats["routed_browser" if route == "browser" else "routed_snippet"] += 1
+        return route
+
+    def record_fetch(
+        self,
+        url: str,
+        status_code: Optional[int],
+        error: Optional[str],
+        text: Optional[str],
+        doc_type: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Feeds an HTTP fetch outcome in. Returns the failure kind (None on success).
+        A 'short' body leaves the breaker alone; record_recovery counts it if the browser finds more.
+        """
+        kind = classify_failure(status_code, error, text, doc_type)
+        domain = domain_of(url)
+        with self._lock:
+            breaker = self._breaker(domain)
+            breaker.probing = False
+            if kind is None:
+                if breaker.state != "closed" or breaker.failures:
+                    logger.info(f"[DomainHealth] {domain} healthy again, closing circuit")
+                    breaker.state, breaker.failures, breaker.trips = "closed", 0, 0
+                    self._persist(domain, breaker)
+            elif kind not in ("gone", "short"): # A 404 says nothing about the domain
+                self._count_failure(domain, breaker)
+
+        if kind in self.negative_ttls:
+            ttl = self.negative_ttls[kind]
+            record = {"kind": kind, "status": status_code, "expires_at": time.time() + ttl}
+            self.cache.set(self._negative_key(url), record, expire=ttl)
+        return kind
+
+    def release_probe(self, url: str):
+        """The probe for `url` never reached the host (served from cache, throttled locally): hand the slot back."""
+        with self._lock:
+            breaker = self._breaker(domain_of(url))
+            if breaker.probing and breaker.probe_url == url:
+                breaker.probing = False
+
+    def record_recovery(self, url: str, recovered: bool, after_short: bool = False):
+        """
+        Browser-escalation outcome for a URL whose HTTP fetch failed (or was skipped).
+        `after_short`: HTTP returned a short body; it only counts as a failure if the browser got more.
+        """
+        domain = domain_of(url)
+        with self._lock:
+            breaker = self._breaker(domain)
+            breaker.last_recovery = "browser" if recovered else "snippet"
+            if after_short and recovered:
+                self._count_failure(domain, breaker)
+            self._persist(domain, breaker)
+        negative = self.negative(url)
+        if negative:
+            negative["recovery"] = breaker.last_recovery
+            self.cache.set(self._negative_key(url), negative, expire=max(1, int(negative["expires_at"] - time.time())))
+
+    def _count_failure(self, domain: str, breaker: _Breaker):
+        breaker.failures += 1
+        if breaker.state == "half_open" or breaker.failures >= self.failure_threshold:
+            self._trip(domain, breaker)
+        self._persist(domain, breaker)
+
+    def _trip(self, domain: str, breaker: _Breaker):
+        breaker.trips += 1
+        duration = min(self.open_seconds * 2 ** (breaker.trips - 1), self.max_open_seconds)
+        breaker.state = "open"
+        breaker.open_until = time.time() + duration
+        self.stats["trips"] += 1
+        logger.warning(f"[DomainHealth] Circuit open for {domain} ({breaker.failures} failures), {duration:.0f}s")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            open_domains = {d: b.state for d, b in self._breakers.items() if b.state != "closed"}
+        return {**self.stats, "circuits": open_domains}
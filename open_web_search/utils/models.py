@@ -0,0 +1,177 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from loguru import logger
+
+try:
+    import psutil
+    HAS_PSUTIL = True
+except ImportError:
+    HAS_PSUTIL = False
+
+ModelKey = Tuple[str, str, str] # (kind, model_name, device)
+
+def resolve_device(device: str = "auto") -> str:
+    """Maps 'auto' to the best available torch device."""
+    if device != "auto":
+        return device
+    try:
+        import torch
+        if torch.cuda.is_available():
+            return "cuda"
+        if torch.backends.mps.is_available():
+            return "mps"
+    except (ImportError, AttributeError):
+        pass
+    return "cpu"
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident memory of this process (psutil), or peak RSS as a fallback."""
+    if HAS_PSUTIL:
+        return psutil.Process().memory_info().rss
+    try:
+        import resource
+        import sys
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS reports bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        return None
+
+def _load_sentence_transformer(model_name: str, device: str) -> Any:
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name, device=device)
+
+def _load_cross_encoder(model_name: str, device: str) -> Any:
+    from sentence_transformers import CrossEncoder
+    return CrossEncoder(model_name, device=device, trust_remote_code=True)
+
+def _warmup_sentence_transformer(model: Any):
+    model.encode(["warmup"])
+
+def _warmup_cross_encoder(model: Any):
+    model.predict([["warmup", "warmup"]])
+
+class ModelRegistry:
+    """
+    Process-wide, thread-safe model cache keyed by (kind, model name, device).
+    Weights are loaded once per process and shared by every pipeline, refiner and
+    crawler that asks for the same model.
+    """
+    _instance: Optional['ModelRegistry'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self._models: Dict[ModelKey, Any] = {}
+        self._stats: Dict[ModelKey, dict] = {}
+        self._lock = threading.Lock()
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._loaders: Dict[str, Callable[[str, str], Any]] = {
+            "sentence_transformer": _load_sentence_transformer,
+            "cross_encoder": _load_cross_encoder,
+        }
+        self._warmups: Dict[str, Callable[[Any], None]] = {
+            "sentence_transformer": _warmup_sentence_transformer,
+            "cross_encoder": _warmup_cross_encoder,
+        }
+
+    @classmethod
+    def get_instance(cls) -> 'ModelRegistry':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = ModelRegistry()
+        return cls._instance
+
+    def register_loader(self, kind: str, loader: Callable[[str, str], Any], warmup: Optional[Callable[[Any], None]] = None):
+        """Adds a model kind (loader receives model_name and resolved device)."""
+        self._loaders[kind] = loader
+        if warmup:
+            self._warmups[kind] = warmup
+
+    def get(self, kind: str, model_name: str, device: str = "auto") -> Any:
+        """Returns the shared model, loading it on first use."""
+        key = (kind, model_name, resolve_device(device))
+        model = self._models.get(key)
+        if model is not None:
+            return model
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Per-key lock: concurrent callers wait for one load instead of loading twice,
+        # while different models can still load in parallel.
+        with key_lock:
+            model = self._models.get(key)
+            if model is not None:
+                return model
+
+            if kind not in self._loaders:
+                raise ValueError(f"Unknown model kind: {kind}")
+
+            rss_before = current_rss_bytes()
+            start = time.perf_counter()
+            model = self._loaders[kind](model_name, key[2])
+            load_ms = (time.perf_counter() - start) * 1000
+            rss_after = current_rss_bytes()
+
+            self._stats[key] = {
+                "kind": kind,
+                "model": model_name,
+                "device": key[2],
+                "load_ms": round(load_ms, 1),
+                "rss_delta_bytes": (rss_after - rss_before) if rss_before is not None and rss_after is not None else None,
+                "warm": False,
+            }
+            self._models[key] = model
+            logger.info(f"[ModelRegistry] Loaded {kind}:{model_name} on {key[2]} in {load_ms:.0f}ms")
+            return model
+
+    def sentence_transformer(self, model_name: str, device: str = "auto") -> Any:
+        return self.get("sentence_transformer", model_name, device)
+
+    def cross_encoder(self, model_name: str, device: str = "auto") -> Any:
+        return self.get("cross_encoder", model_name, device)
+
+    def preload(self, specs: Iterable[Tuple[str, str, str]], warmup: bool = True):
+        """Loads (kind, model_name, device) specs ahead of traffic, e.g. at server startup."""
+        for kind, model_name, device in specs:
+            try:
+                self.get(kind, model_name, device)
+                if warmup:
+                    self.warmup(kind, model_name, device)
+            except Exception as e:
+                logger.error(f"[ModelRegistry] Preload failed for {kind}:{model_name}: {e}")
+
+    def warmup(self, kind: str, model_name: str, device: str = "auto"):
+        """Runs one dummy inference so the first real query doesn't pay kernel/allocator setup."""
+        key = (kind, model_name, resolve_device(device))
+        stats = self._stats.get(key)
+        if stats is None or stats["warm"]:
+            return
+        warmup_fn = self._warmups.get(kind)
+        if warmup_fn:
+            start = time.perf_counter()
+            warmup_fn(self._models[key])
+            stats["warmup_ms"] = round((time.perf_counter() - start) * 1000, 1)
+        stats["warm"] = True
+
+    def warmup_all(self):
+        for kind, model_name, device in list(self._models):
+            try:
+                self.warmup(kind, model_name, device)
+            except Exception as e:
+                logger.warning(f"[ModelRegistry] Warmup failed for {kind}:{model_name}: {e}")
+
+    def unload(self, kind: str, model_name: str, device: str = "auto"):
+        key = (kind, model_name, resolve_device(device))
+        with self._lock:
+            self._models.pop(key, None)
+            self._stats.pop(key, None)
+
+    def stats(self) -> dict:
+        """Load time per model and the current resident memory of the process."""
+        return {
+            "models": [dict(s) for s in self._stats.values()],
+            "process_rss_bytes": current_rss_bytes(),
+        }
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional, Tuple
+import numpy as np
+from loguru import logger
+
+from open_web_search.schemas.results import PipelineOutput
+
+_WHITESPACE = re.compile(r"\s+")
+_PUNCT = re.compile(r"[^\w\s]")
+
+@dataclass
+class _Entry:
+    query: str
+    fingerprint: str
+    output: PipelineOutput
+    embedding: Optional[np.ndarray]
+    created_at: float
+    expires_at: float
+
+class QueryResultCache:
+    """
+    Result-level cache in front of the whole pipeline (plan, search, fetch, rerank).
+
+    - Exact lookups: normalized query + config fingerprint.
+    - Near-duplicate lookups: cosine similarity of query embeddings within the same
+      fingerprint, above a configurable threshold.
+    Entries expire after their TTL and the store is LRU-bounded.
+    """
+    _instance: Optional['QueryResultCache'] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits_exact": 0, "hits_semantic": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def get_instance(cls, max_entries: int = 256) -> 'QueryResultCache':
+        if cls._instance is None:
+            with cls._instance_lock:
+                if cls._instance is None:
+                    cls._instance = QueryResultCache(max_entries)
+        return cls._instance
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return _WHITESPACE.sub(" ", _PUNCT.sub(" ", query.lower())).strip()
+
+    @staticmethod
+    def fingerprint(config: Any, context: Optional[dict] = None) -> str:
+        """Hash of everything that changes the output: config (minus CACHE_NEUTRAL fields) and context."""
+        exclude = config.cache_neutral_fields() if hasattr(config, "cache_neutral_fields") else set()
+        payload = {
+            "config": config.model_dump(exclude=exclude) if hasattr(config, "model_dump") else config,
+            "context": context or {},
+        }
+        raw = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def _key(self, query: str, fingerprint: str) -> str:
+        return f"{fingerprint}:{self.normalize(query)}"
+
+    def get_exact(self, query: str, fingerprint: str) -> Optional[Tuple[PipelineOutput, float]]:
+        """Returns (output copy, age_seconds) on hit."""
+        key = self._key(query, fingerprint)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits_exact"] += 1
+            return entry.output.model_copy(deep=True), now - entry.created_at
+
+    def get_similar(
+        self,
+        embedding: np.ndarray,
+        fingerprint: str,
+        threshold: float
+    ) -> Optional[Tuple[PipelineOutput, float, float]]:
+        """Returns (output copy, similarity, age_seconds) for the closest entry above `threshold`."""
+        query_vec = self._unit(embedding)
+        now = time.time()
+        best_key, best_sim = None, threshold
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if entry.expires_at <= now:
+                    del self._entries[key]
+                    continue
+                if entry.fingerprint != fingerprint or entry.embedding is None:
+                    continue
+                sim = float(np.dot(entry.embedding, query_vec))
+                if sim >= best_sim:
+                    best_key, best_sim = key, sim
+            if best_key is None:
+                return None
+            entry = self._entries[best_key]
+            self._entries.move_to_end(best_key)
+            self.stats["hits_semantic"] += 1
+            return entry.output.model_copy(deep=True), best_sim, now - entry.created_at
+
+    def record_miss(self):
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def put(
+        self,
+        query: str,
+        fingerprint: str,
+        output: PipelineOutput,
+        ttl: int,
+        embedding: Optional[np.ndarray] = None
+    ):
+        now = time.time()
+        key = self._key(query, fingerprint)
+        entry = _Entry(
+            query=query,
+            fingerprint=fingerprint,
+            output=output.model_copy(deep=True),
+            embedding=self._unit(embedding) if embedding is not None else None,
+            created_at=now,
+            expires_at=now + ttl,
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _unit(vec: np.ndarray) -> np.ndarray:
+        vec = np.asarray(vec, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm > 0 else vec
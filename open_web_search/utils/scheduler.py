@@ -0,0 +1,238 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+from urllib.parse import urlparse
+from loguru import logger
+
+from open_web_search.schemas.results import FetchedPage
+
+THROTTLE_STATUSES = (429, 503)
+
+class HostThrottledError(Exception):
+    """Raised when a host is backing off for longer than the caller is willing to wait."""
+
+def throttled_page(url: str, error: HostThrottledError) -> FetchedPage:
+    """
+    Failed page for a fetch our own scheduler refused. Marked so domain health and the
+    fetch strategy don't count it against the host (no request was ever sent).
+    """
+    page = FetchedPage(url=url, error=f"Throttled: {error}")
+    page._fetch_origin = "throttled"
+    return page
+
+@dataclass
+class _HostState:
+    tokens: float
+    updated: float
+    active: int = 0
+    blocked_until: float = 0.0
+    strikes: int = 0
+    waiters: Deque[asyncio.Future] = field(default_factory=deque)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After is either delta-seconds or an HTTP-date."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class FetchScheduler:
+    """
+    Shared politeness layer for every reader (and the crawler, through its reader).
+
+    - Global cap on in-flight fetches, handed out round-robin across hosts (fair queue),
+      so five URLs from one domain can't starve the rest of the batch.
+    - Per-host concurrency cap and token bucket (`per_host_rate` req/s, `per_host_burst`).
+    - 429/503 responses put the host in backoff (Retry-After if present, else exponential).
+    """
+    def __init__(
+        self,
+        max_concurrency: int = 5,
+        per_host_concurrency: int = 2,
+        per_host_rate: float = 2.0,
+        per_host_burst: int = 4,
+        max_backoff: float = 60.0,
+        max_hosts: int = 1024
+    ):
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.per_host_rate = per_host_rate
+        self.per_host_burst = max(1, per_host_burst)
+        self.max_backoff = max_backoff
+        self.max_hosts = max_hosts
+
+        # Order doubles as the round-robin rotation: a host moves to the back once served
+        self._hosts: "OrderedDict[str, _HostState]" = OrderedDict()
+        self._active = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"granted": 0, "queued": 0, "wait_ms_total": 0.0, "throttled": 0, "rejected": 0}
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    @asynccontextmanager
+    async def slot(self, url: str, max_wait: Optional[float] = None) -> AsyncIterator[None]:
+        """Holds a fetch slot for `url`'s host for the duration of the block."""
+        host = self.host_of(url)
+        await self.acquire(host, max_wait=max_wait)
+        try:
+            yield
+        finally:
+            self.release(host)
+
+    async def acquire(self, host: str, max_wait: Optional[float] = None):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Futures and timers are loop-bound; start clean on a new loop
+            self._reset(loop)
+
+        state = self._host(host)
+        remaining_backoff = state.blocked_until - time.monotonic()
+        if max_wait is not None and remaining_backoff > max_wait:
+            self.stats["rejected"] += 1
+            raise HostThrottledError(f"{host} is backing off for {remaining_backoff:.1f}s")
+
+        fut = loop.create_future()
+        state.waiters.append(fut)
+        self._dispatch()
+        if fut.done():
+            self.stats["granted"] += 1
+            return
+
+        self.stats["queued"] += 1
+        start = time.perf_counter()
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Granted in the same tick we were cancelled: hand the slot back
+                self.release(host)
+            else:
+                try:
+                    state.waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+        self.stats["granted"] += 1
+        self.stats["wait_ms_total"] += (time.perf_counter() - start) * 1000
+
+    def release(self, host: str):
+        state = self._hosts.get(host)
+        if state is not None and state.active > 0:
+            state.active -= 1
+            self._active -= 1
+        self._dispatch()
+
+    def record_response(self, url: str, status_code: Optional[int], headers: Optional[Any] = None) -> Optional[float]:
+        """
+        Feeds a response back into the host state. Returns the backoff (seconds) when the
+        host signalled throttling, else None.
+        """
+        state = self._host(self.host_of(url))
+        if status_code in THROTTLE_STATUSES:
+            state.strikes += 1
+            retry_after = parse_retry_after(headers.get("retry-after") if headers is not None else None)
+            delay = retry_after if retry_after is not None else 2 ** (state.strikes - 1)
+            delay = min(delay, self.max_backoff)
+            state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+            self.stats["throttled"] += 1
+            logger.warning(f"[FetchScheduler] {self.host_of(url)} returned {status_code}, backing off {delay:.1f}s")
+            return delay
+        if status_code is not None and status_code < 400:
+            state.strikes = 0
+        return None
+
+    def _host(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            if len(self._hosts) >= self.max_hosts:
+                self._prune()
+            state = _HostState(tokens=float(self.per_host_burst), updated=time.monotonic())
+            self._hosts[host] = state
+        return state
+
+    def _prune(self):
+        now = time.monotonic()
+        for host, state in list(self._hosts.items()):
+            if not state.active and not state.waiters and state.blocked_until <= now:
+                del self._hosts[host]
+
+    def _refill(self, state: _HostState, now: float):
+        if self.per_host_rate > 0:
+            state.tokens = min(self.per_host_burst, state.tokens + (now - state.updated) * self.per_host_rate)
+        state.updated = now
+
+    def _delay(self, state: _HostState, now: float) -> float:
+        """Seconds until the host may start another fetch (0 = now)."""
+        if state.blocked_until > now:
+            return state.blocked_until - now
+        if self.per_host_rate <= 0:
+            return 0.0
+        self._refill(state, now)
+        return 0.0 if state.tokens >= 1 else (1 - state.tokens) / self.per_host_rate
+
+    def _dispatch(self):
+        now = time.monotonic()
+        next_wake: Optional[float] = None
+        progressed = True
+        while progressed and self._active < self.max_concurrency:
+            progressed = False
+            for host in list(self._hosts):
+                if self._active >= self.max_concurrency:
+                    break
+                state = self._hosts[host]
+                while state.waiters and state.waiters[0].done():
+                    state.waiters.popleft() # cancelled while queued
+                if not state.waiters or state.active >= self.per_host_concurrency:
+                    continue
+                delay = self._delay(state, now)
+                if delay > 0:
+                    next_wake = delay if next_wake is None else min(next_wake, delay)
+                    continue
+
+                if self.per_host_rate > 0:
+                    state.tokens -= 1
+                state.active += 1
+                self._active += 1
+                state.waiters.popleft().set_result(None)
+                self._hosts.move_to_end(host)
+                progressed = True
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if next_wake is not None and self._loop is not None:
+            self._timer = self._loop.call_later(next_wake, self._dispatch)
+
+    def _reset(self, loop: asyncio.AbstractEventLoop):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for state in self._hosts.values():
+            state.active = 0
+            state.waiters.clear()
+        self._active = 0
+        self._loop = loop
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        return {
+            **self.stats,
+            "wait_ms_total": round(self.stats["wait_ms_total"], 1),
+            "active": self._active,
+            "queued_now": sum(len(s.waiters) for s in self._hosts.values()),
+            "backing_off": {h: round(s.blocked_until - now, 1) for h, s in self._hosts.items() if s.blocked_until > now},
+        }
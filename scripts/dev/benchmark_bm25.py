@@ -0,0 +1,188 @@
+"""
+Keyword refiner benchmark: the original per-chunk Counter BM25 (score every chunk, build an
+EvidenceChunk for each, then filter) vs the inverted-index BM25 in KeywordRefiner.
+
+"chunk" columns time chunking + tokenizing the pages (split/join copies vs offsets into the
+page text), "bm25" columns time index build + scoring on pre-tokenized chunks, and "refine"
+columns time the whole refine() call: "cold" pages are chunked in the call, "warm" pages
+already carry their chunk artifact (fetched/cached pages, later research rounds). Chunk
+overlap is off so both sides see the same chunks.
+
+Usage: python scripts/dev/benchmark_bm25.py [--chunks 100,1000,10000] [--min-relevance 0.1]
+"""
+import argparse
+import asyncio
+import hashlib
+import math
+import random
+import time
+from collections import Counter
+
+from open_web_search.refiners.keyword import BM25, STOP_WORDS, KeywordRefiner, chunk_spans, tokenize
+from open_web_search.schemas.results import EvidenceChunk, FetchedPage
+
+QUERY = "battery energy density solid state electrolyte"
+
+class LegacyBM25:
+    """The pre-index BM25, verbatim in behavior."""
+    def __init__(self, corpus_tokens):
+        self.corpus_size = len(corpus_tokens)
+        self.avgdl = sum(len(doc) for doc in corpus_tokens) / self.corpus_size
+        self.k1, self.b = 1.5, 0.75
+        self.doc_freqs, self.doc_len, nd = [], [], {}
+        for doc in corpus_tokens:
+            self.doc_len.append(len(doc))
+            frequencies = Counter(doc)
+            self.doc_freqs.append(frequencies)
+            for word in frequencies:
+                nd[word] = nd.get(word, 0) + 1
+        self.idf = {w: math.log(((self.corpus_size - f + 0.5) / (f + 0.5)) + 1.0) for w, f in nd.items()}
+
+    def get_score(self, query_tokens, doc_index):
+        score, doc_len, frequencies = 0.0, self.doc_len[doc_index], self.doc_freqs[doc_index]
+        for word in query_tokens:
+            if word not in frequencies:
+                continue
+            tf = frequencies[word]
+            score += self.idf.get(word, 0) * (tf * (self.k1 + 1)) / (tf + self.k1 * (1 - self.b + self.b * (doc_len / self.avgdl)))
+        return score
+
+def legacy_tokenize(text):
+    import re
+    words = re.findall(r'\b\w+\b', text.lower())
+    return [w for w in words if w not in STOP_WORDS and len(w) > 1]
+
+def legacy_chunk(text, chunk_size):
+    """The pre-offset chunker (paragraph packing, sentence split, hard chop), verbatim in behavior."""
+    paragraphs = text.split('\n\n')
+    if len(paragraphs) == 1:
+        paragraphs = text.split('\n')
+    chunks, current, current_len = [], [], 0
+    for p in paragraphs:
+        p = p.strip()
+        if not p:
+            continue
+        if len(p) > chunk_size:
+            if current:
+                chunks.append("\n".join(current))
+                current, current_len = [], 0
+            for s in p.replace(". ", ".\n").split('\n'):
+                if len(s) > chunk_size:
+                    chunks.extend(s[i:i + chunk_size] for i in range(0, len(s), chunk_size))
+                elif current_len + len(s) > chunk_size:
+                    chunks.append("\n".join(current))
+                    current, current_len = [s], len(s)
+                else:
+                    current.append(s)
+                    current_len += len(s)
+        elif current_len + len(p) > chunk_size:
+            chunks.append("\n".join(current))
+            current, current_len = [p], len(p)
+        else:
+            current.append(p)
+            current_len += len(p)
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+def legacy_refine(refiner: KeywordRefiner, pages, query):
+    query_tokens = legacy_tokenize(query)
+    infos, corpus = [], []
+    for page in pages:
+        for chunk_text in legacy_chunk(page.text_plain, refiner.chunk_size):
+            infos.append((page.url, page.title, chunk_text))
+            corpus.append(legacy_tokenize(chunk_text))
+    bm25 = LegacyBM25(corpus)
+    raw, max_score = [], 0.0
+    for idx, (url, title, text) in enumerate(infos):
+        score = bm25.get_score(query_tokens, idx)
+        max_score = max(max_score, score)
+        raw.append({"url": url, "title": title, "content": text, "score": score, "idx": idx})
+    evidence = []
+    for r in raw:
+        normalized = (r["score"] / max_score) if max_score > 0 else 0.0
+        if normalized >= refiner.min_relevance:
+            evidence.append(EvidenceChunk(
+                url=r["url"], chunk_id=hashlib.md5(f'{r["url"]}_{r["idx"]}'.encode()).hexdigest(),
+                content=r["content"], relevance_score=normalized, title=r["title"]
+            ))
+    evidence.sort(key=lambda x: x.relevance_score, reverse=True)
+    return evidence
+
+def make_pages(n_chunks: int, chunk_size: int, rng: random.Random):
+    vocab = [f"term{i}" for i in range(5000)] + QUERY.split()
+    paragraphs_per_page = 20
+    pages = []
+    for p in range(max(1, n_chunks // paragraphs_per_page)):
+        paragraphs = []
+        for _ in range(paragraphs_per_page):
+            # One paragraph fills a chunk, so chunks ~= paragraphs
+            words = rng.choices(vocab, k=chunk_size // 8)
+            paragraphs.append(" ".join(words)[:chunk_size - 10])
+        pages.append(FetchedPage(url=f"https://site{p}.com/doc", title=f"Doc {p}", text_plain="\n\n".join(paragraphs)))
+    return pages
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", default="100,1000,10000")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--min-relevance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    refiner = KeywordRefiner(chunk_size=args.chunk_size, min_relevance=args.min_relevance)
+    print(
+        f"{'chunks':>8} {'chunk old':>10} {'chunk new':>10} {'bm25 old':>9} {'bm25 new':>9} "
+        f"{'refine old':>11} {'cold':>8} {'warm':>8} {'kept':>6}  same ranking"
+    )
+    for n in [int(c) for c in args.chunks.split(",")]:
+        pages = make_pages(n, args.chunk_size, rng)
+        query_tokens = tokenize(QUERY)
+        repeat = max(1, 3000 // n)
+
+        def legacy_chunking():
+            return [legacy_tokenize(c) for p in pages for c in legacy_chunk(p.text_plain, args.chunk_size)]
+
+        def offset_chunking():
+            out = []
+            for p in pages:
+                lowered = p.text_plain.lower()
+                out.extend(tokenize(lowered, s, e, lowered=True) for s, e in chunk_spans(p.text_plain, args.chunk_size))
+            return out
+
+        corpus = legacy_chunking()
+        def legacy_bm25():
+            bm25 = LegacyBM25(corpus)
+            return [bm25.get_score(query_tokens, i) for i in range(len(corpus))]
+
+        chunk_old = timed(legacy_chunking, repeat)
+        chunk_new = timed(offset_chunking, repeat)
+        bm25_old = timed(legacy_bm25, repeat)
+        bm25_new = timed(lambda: BM25(corpus, vocabulary=query_tokens).get_scores(query_tokens), repeat)
+        loop = asyncio.new_event_loop()
+        refine_old = timed(lambda: legacy_refine(refiner, pages, QUERY), repeat)
+
+        def cold_refine():
+            for p in pages:
+                p._chunks = None
+            return loop.run_until_complete(refiner.refine(pages, QUERY))
+
+        refine_cold = timed(cold_refine, repeat)
+        refine_warm = timed(lambda: loop.run_until_complete(refiner.refine(pages, QUERY)), repeat)
+        old = legacy_refine(refiner, pages, QUERY)
+        new = loop.run_until_complete(refiner.refine(pages, QUERY))
+        loop.close()
+        same = [(c.url, c.content) for c in old] == [(c.url, c.content) for c in new]
+        print(
+            f"{n:>8} {chunk_old:>10.2f} {chunk_new:>10.2f} {bm25_old:>9.2f} {bm25_new:>9.2f} "
+            f"{refine_old:>11.2f} {refine_cold:>8.2f} {refine_warm:>8.2f} {len(new):>6}  {same}"
+        )
+
+if __name__ == "__main__":
+    main()
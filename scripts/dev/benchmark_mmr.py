@@ -0,0 +1,66 @@
+"""
+MMR selection benchmark: the original per-candidate loop from HybridRefiner vs the
+vectorized selector (open_web_search.refiners.mmr), on random MiniLM-sized embeddings.
+
+Usage: python scripts/dev/benchmark_mmr.py [--candidates 20,200,2000] [--dim 384] [--k 15]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from open_web_search.refiners.mmr import mmr_select
+
+def loop_mmr(embeddings, relevance, urls, k=15, lambda_=0.7, max_per_source=3):
+    """The pre-vectorization HybridRefiner loop, verbatim in behavior."""
+    selected, candidates, source_counts = [], list(range(len(relevance))), {}
+    while len(selected) < k and candidates:
+        best_mmr, best_idx = -1.0, -1
+        for idx in candidates:
+            if source_counts.get(urls[idx], 0) >= max_per_source:
+                continue
+            if not selected:
+                diversity = 0.0
+            else:
+                cand = embeddings[idx]
+                sel = embeddings[selected]
+                sims = np.dot(sel, cand) / (np.linalg.norm(sel, axis=1) * np.linalg.norm(cand))
+                diversity = np.max(sims)
+            mmr = (lambda_ * relevance[idx]) - ((1 - lambda_) * diversity)
+            if mmr > best_mmr:
+                best_mmr, best_idx = mmr, idx
+        if best_idx == -1:
+            break
+        selected.append(best_idx)
+        candidates.remove(best_idx)
+        source_counts[urls[best_idx]] = source_counts.get(urls[best_idx], 0) + 1
+    return selected
+
+def timed(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", default="20,200,2000")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, default=15)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'candidates':>10} {'loop ms':>10} {'vector ms':>10} {'speedup':>8}  same picks")
+    for n in [int(c) for c in args.candidates.split(",")]:
+        embeddings = rng.standard_normal((n, args.dim)).astype(np.float32)
+        relevance = rng.random(n).tolist()
+        urls = [f"https://site{i % max(1, n // 4)}.com" for i in range(n)]
+        repeat = max(1, 2000 // n)
+
+        loop_ms = timed(lambda: loop_mmr(embeddings, relevance, urls, args.k), repeat)
+        vec_ms = timed(lambda: mmr_select(embeddings, relevance, args.k, groups=urls, max_per_group=3), repeat)
+        same = loop_mmr(embeddings, relevance, urls, args.k) == mmr_select(embeddings, relevance, args.k, groups=urls, max_per_group=3)
+        print(f"{n:>10} {loop_ms:>10.2f} {vec_ms:>10.2f} {loop_ms / vec_ms:>7.1f}x  {same}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Cold vs Warm pipeline benchmark.
+
+Cold: a new AsyncPipeline per query (engines, reader pools, models rebuilt and torn down).
+Warm: one long-lived AsyncPipeline serving every query.
+
+Usage: python scripts/dev/benchmark_warm_pipeline.py [--mode fast] [--rounds 5]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from open_web_search import AsyncPipeline, LinkerConfig
+
+QUERIES = [
+    "python asyncio tutorial",
+    "what is retrieval augmented generation",
+    "rust ownership explained",
+    "kubernetes pod lifecycle",
+    "transformer attention mechanism",
+]
+
+def _report(label: str, latencies: list):
+    print(f"{label:<6} n={len(latencies):<3} "
+          f"mean={statistics.mean(latencies):7.0f}ms  "
+          f"median={statistics.median(latencies):7.0f}ms  "
+          f"p90={sorted(latencies)[int(len(latencies) * 0.9) - 1]:7.0f}ms")
+
+async def run_cold(config: LinkerConfig, queries: list) -> list:
+    latencies = []
+    for q in queries:
+        start = time.perf_counter()
+        async with AsyncPipeline(config.model_copy(deep=True)) as pipeline:
+            await pipeline.run(q)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+async def run_warm(config: LinkerConfig, queries: list) -> list:
+    latencies = []
+    async with AsyncPipeline(config.model_copy(deep=True)) as pipeline:
+        for q in queries:
+            start = time.perf_counter()
+            await pipeline.run(q)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mode", default="fast", choices=["turbo", "fast", "balanced", "deep"])
+    parser.add_argument("--rounds", type=int, default=1, help="Passes over the query set")
+    args = parser.parse_args()
+
+    config = LinkerConfig()
+    config.set_mode(args.mode)
+    queries = QUERIES * args.rounds
+
+    print(f"Benchmarking {len(queries)} queries in '{args.mode}' mode...")
+    cold = await run_cold(config, queries)
+    warm = await run_warm(config, queries)
+
+    _report("cold", cold)
+    _report("warm", warm)
+    print(f"Per-query saving (median): {statistics.median(cold) - statistics.median(warm):.0f}ms")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+import asyncio
+import pytest
+
+from open_web_search.readers.browser_pool import BrowserContextPool
+
+
+class FakePage:
+    def __init__(self):
+        self.closed = False
+        self.calls = []
+
+    def is_closed(self):
+        return self.closed
+
+    async def evaluate(self, script):
+        self.calls.append("evaluate")
+
+    async def goto(self, url, **kwargs):
+        self.calls.append(f"goto:{url}")
+
+
+class FakeContext:
+    def __init__(self, options):
+        self.options = options
+        self.page = FakePage()
+        self.routed = False
+        self.cookies_cleared = 0
+        self.closed = False
+
+    async def route(self, pattern, handler):
+        self.routed = True
+
+    async def new_page(self):
+        return self.page
+
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+
+    async def new_context(self, **options):
+        context = FakeContext(options)
+        self.contexts.append(context)
+        return context
+
+
+@pytest.mark.asyncio
+async def test_pool_reuses_and_resets_contexts():
+    browser = FakeBrowser()
+    pool = await BrowserContextPool(browser, size=2, context_options=lambda: {"locale": "en-US"}).start()
+    assert len(browser.contexts) == 2
+    assert all(c.routed and c.options == {"locale": "en-US"} for c in browser.contexts)
+
+    for _ in range(5):
+        async with pool.page() as page:
+            await page.goto("https://example.com")
+
+    # Sequential use never needs more than the prewarmed contexts
+    assert len(browser.contexts) == 2
+    assert pool.stats["reused"] == 5
+    used = [c for c in browser.contexts if c.cookies_cleared]
+    assert used and used[0].page.calls[-1] == "goto:about:blank"
+    assert "evaluate" in used[0].page.calls
+
+
+@pytest.mark.asyncio
+async def test_pool_recycles_after_max_uses_and_on_errors():
+    browser = FakeBrowser()
+    pool = await BrowserContextPool(browser, size=1, max_uses=2).start()
+
+    for _ in range(2):
+        async with pool.page():
+            pass
+    assert browser.contexts[0].closed
+    assert pool.stats["recycled"] == 1
+
+    with pytest.raises(RuntimeError):
+        async with pool.page():
+            raise RuntimeError("navigation crashed")
+    assert len(browser.contexts) == 2 and browser.contexts[1].closed
+
+    # Crashed page (closed under us) is not put back either
+    async with pool.page() as page:
+        page.closed = True
+    assert browser.contexts[2].closed
+    assert pool.snapshot()["contexts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_bounds_concurrent_pages():
+    browser = FakeBrowser()
+    pool = await BrowserContextPool(browser, size=2).start(prewarm=0)
+    active, peak = 0, 0
+
+    async def use():
+        nonlocal active, peak
+        async with pool.page():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*[use() for _ in range(6)])
+    assert peak == 2
+    assert len(browser.contexts) == 2
+    assert pool.stats["waits"] > 0
+
+
+@pytest.mark.asyncio
+async def test_pool_rss_limit_evicts_and_stops_growth():
+    browser = FakeBrowser()
+    rss = {"value": 100}
+    pool = await BrowserContextPool(
+        browser, size=3, max_rss_bytes=500, rss_probe=lambda: rss["value"], rss_interval=0
+    ).start(prewarm=0)
+
+    rss["value"] = 1000
+    active, peak = 0, 0
+
+    async def use():
+        nonlocal active, peak
+        async with pool.page():
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+
+    await asyncio.gather(*[use() for _ in range(3)])
+    # Over the limit: only one context at a time, and it is closed after each use
+    assert peak == 1
+    assert pool.stats["rss_evictions"] == 3
+    assert all(c.closed for c in browser.contexts)
+
+
+@pytest.mark.asyncio
+async def test_pool_close_disposes_idle_contexts():
+    browser = FakeBrowser()
+    pool = await BrowserContextPool(browser, size=2).start()
+    await pool.close()
+    assert all(c.closed for c in browser.contexts)
+    with pytest.raises(RuntimeError):
+        async with pool.page():
+            pass
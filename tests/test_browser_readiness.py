@@ -0,0 +1,147 @@
+import asyncio
+import time
+import pytest
+
+from open_web_search.readers.browser import PlaywrightReader
+from open_web_search.readers.browser_pool import BrowserContextPool
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+
+class ScriptedPage:
+    """Serves a scripted sequence of readiness states; the last one repeats."""
+    def __init__(self, states, text="hello world"):
+        self.states = list(states)
+        self.text = text
+        self.url = "about:blank"
+        self.polls = 0
+        self.goto_kwargs = None
+
+    def is_closed(self):
+        return False
+
+    async def goto(self, url, **kwargs):
+        if url != "about:blank":
+            self.url = url
+            self.goto_kwargs = kwargs
+        return FakeResponse()
+
+    async def evaluate(self, script, arg=None):
+        if arg is not None: # Readiness probe
+            state = self.states[min(self.polls, len(self.states) - 1)]
+            self.polls += 1
+            return state
+        if "querySelectorAll" in script:
+            return []
+        return self.text
+
+    async def title(self):
+        return "Title"
+
+
+class FakeContext:
+    def __init__(self, page):
+        self.page = page
+
+    async def route(self, pattern, handler):
+        pass
+
+    async def new_page(self):
+        return self.page
+
+    async def clear_cookies(self):
+        pass
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, page):
+        self.page = page
+
+    async def new_context(self, **options):
+        return FakeContext(self.page)
+
+
+async def _reader(page, **kwargs) -> PlaywrightReader:
+    reader = PlaywrightReader(poll_interval=0.01, **kwargs)
+    reader.browser = object() # Skip launching Chromium
+    reader.pool = await BrowserContextPool(FakeBrowser(page), size=1).start()
+    return reader
+
+
+def _state(length, matched=False, loading=False):
+    return {"len": length, "matched": matched, "loading": loading}
+
+
+@pytest.mark.asyncio
+async def test_readiness_returns_once_text_stops_growing():
+    page = ScriptedPage([_state(0, loading=True), _state(50), _state(400), _state(400), _state(400)])
+    reader = await _reader(page, timeout=5.0)
+
+    started = time.monotonic()
+    fetched, _ = await reader.fetch_with_links("https://example.com/a")
+
+    assert fetched.text_plain == "hello world"
+    assert page.goto_kwargs["wait_until"] == "commit"
+    assert reader.readiness_stats == {"selector": 0, "stable": 1, "deadline": 0}
+    assert page.polls == 5
+    assert time.monotonic() - started < 1.0
+
+
+@pytest.mark.asyncio
+async def test_readiness_returns_on_content_selector():
+    page = ScriptedPage([_state(30, loading=True), _state(250, matched=True)])
+    reader = await _reader(page, timeout=5.0)
+
+    await reader.fetch_with_links("https://example.com/spa")
+
+    assert reader.readiness_stats["selector"] == 1
+    assert page.polls == 2
+
+
+@pytest.mark.asyncio
+async def test_readiness_gives_up_at_deadline_and_keeps_text():
+    # Text keeps growing (infinite feed): stop at the deadline but still return what is there
+    page = ScriptedPage([_state(i * 1000) for i in range(1, 1000)])
+    reader = await _reader(page, timeout=0.5)
+
+    started = time.monotonic()
+    fetched, _ = await reader.fetch_with_links("https://example.com/feed")
+
+    assert time.monotonic() - started < 0.6
+    assert reader.readiness_stats["deadline"] == 1
+    assert fetched.text_plain == "hello world"
+
+
+@pytest.mark.asyncio
+async def test_total_deadline_covers_navigation():
+    class HangingPage(ScriptedPage):
+        async def goto(self, url, **kwargs):
+            if url != "about:blank":
+                await asyncio.sleep(10)
+            return FakeResponse()
+
+    reader = await _reader(HangingPage([_state(0)]), timeout=0.2)
+    started = time.monotonic()
+    fetched, links = await reader.fetch_with_links("https://example.com/slow")
+
+    assert time.monotonic() - started < 1.0
+    assert "deadline" in fetched.error
+    assert links == []
+
+
+@pytest.mark.asyncio
+async def test_domcontentloaded_mode_skips_polling():
+    page = ScriptedPage([_state(0)])
+    reader = await _reader(page, timeout=5.0, readiness="domcontentloaded")
+
+    page.wait_for_selector = lambda *a, **k: asyncio.sleep(0)
+    await reader.fetch_with_links("https://example.com/static")
+
+    assert page.goto_kwargs["wait_until"] == "domcontentloaded"
+    assert page.polls == 0
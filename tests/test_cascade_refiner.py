@@ -0,0 +1,180 @@
+import asyncio
+import threading
+import time
+import numpy as np
+import pytest
+from open_web_search.config import LinkerConfig
+from open_web_search.core.pipeline import AsyncPipeline
+from open_web_search.refiners.cascade import CascadeRefiner
+from open_web_search.schemas.results import FetchedPage, PipelineOutput
+
+VOCAB = ["solar", "battery", "storage", "wind", "grid", "coal"]
+
+class FakeMiniLM:
+    """Bag-of-words 'embedding' over a tiny vocabulary."""
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def _vec(self, text):
+        words = text.lower().replace(".", " ").split()
+        return np.array([words.count(w) for w in VOCAB], dtype=np.float32) + 0.01
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self._vec(texts)
+        self.calls += 1
+        time.sleep(self.delay)
+        return np.stack([self._vec(t) for t in texts])
+
+class FakeCrossEncoder:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.seen = []
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        time.sleep(self.delay)
+        self.seen.extend(text for _, text in pairs)
+        # Prefers chunks mentioning 'storage', then shorter ones
+        return [1.0 if "storage" in text.lower() else 0.5 - len(text) / 1000 for _, text in pairs]
+
+PARAGRAPHS = [
+    "Solar panels feed the grid.",
+    "Battery storage smooths solar output.",
+    "Wind turbines and the grid.",
+    "Coal plants are closing.",
+    "Solar battery storage at home.",
+    "Battery chemistry basics.",
+    "Grid operators plan reserves.",
+]
+
+def _refiner(**overrides):
+    config = LinkerConfig(
+        reranker_type="cascade", max_evidence=2, chunk_size=40, chunk_overlap=0,
+        cascade_bm25_top_n=4, cascade_bi_encoder_top_m=3, **overrides
+    )
+    refiner = CascadeRefiner(config)
+    refiner.bi_encoder.model = FakeMiniLM()
+    refiner.cross_encoder.model = FakeCrossEncoder()
+    refiner.cross_encoder._is_loaded = True
+    return refiner
+
+def _pages():
+    return [FetchedPage(url="https://a.com", title="Energy", text_plain="\n\n".join(PARAGRAPHS))]
+
+@pytest.mark.asyncio
+async def test_each_stage_narrows_and_is_traced():
+    refiner = _refiner(cascade_early_exit_margin=None)
+    trace = {}
+    evidence = await refiner.refine(_pages(), "solar battery storage", trace=trace)
+
+    assert trace["refiner"] == "cascade"
+    assert [(s["stage"], s["in"], s["out"]) for s in trace["stages"]] == [
+        ("bm25", 7, 4), ("bi_encoder", 4, 3), ("cross_encoder", 3, 2)
+    ]
+    assert all(s["ms"] >= 0 for s in trace["stages"])
+    assert len(refiner.cross_encoder.model.seen) == 3 # Only the bi-encoder's top-M reach the cross-encoder
+    assert [c.content for c in evidence] == ["Solar battery storage at home.", "Battery storage smooths solar output."]
+    assert evidence[0].is_answer
+
+@pytest.mark.asyncio
+async def test_early_exit_skips_the_cross_encoder():
+    refiner = _refiner(cascade_early_exit_margin=0.3)
+    trace = {}
+    evidence = await refiner.refine(_pages(), "coal", trace=trace) # One chunk is about coal, the rest aren't
+
+    assert trace["early_exit"] == "bi_encoder"
+    assert [s["stage"] for s in trace["stages"]] == ["bm25", "bi_encoder"]
+    assert refiner.cross_encoder.model.seen == []
+    assert evidence[0].content == "Coal plants are closing."
+
+@pytest.mark.asyncio
+async def test_stage_budgets_fall_back_to_previous_order():
+    refiner = _refiner(cascade_early_exit_margin=None, cascade_bi_encoder_budget_ms=20, cascade_cross_encoder_budget_ms=1, reranker_token_budget=1)
+    refiner.bi_encoder.model = FakeMiniLM(delay=0.3)
+    refiner.cross_encoder.model = FakeCrossEncoder(delay=0.05)
+    trace = {}
+    evidence = await refiner.refine(_pages(), "solar battery storage", trace=trace)
+
+    bi, ce = trace["stages"][1], trace["stages"][2]
+    assert bi["timed_out"] and bi["ms"] < 250 # Didn't wait for the slow encoder
+    assert ce["timed_out"] and ce["scored"] == 1 # One-pair batches, only the first started in budget
+    assert len(evidence) == 2
+
+class ConcurrencyTrackingMiniLM(FakeMiniLM):
+    def __init__(self, delay):
+        super().__init__(delay)
+        self.running = self.peak = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return super().encode(texts)
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            return super().encode(texts)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+async def _wait_for_abandoned_encodes():
+    """Earlier tests may leave a timed-out encode running on the shared executor."""
+    while CascadeRefiner._abandoned:
+        await asyncio.sleep(0.01)
+
+@pytest.mark.asyncio
+async def test_timed_out_encode_makes_later_queries_skip_stage_two():
+    await _wait_for_abandoned_encodes()
+    refiner = _refiner(cascade_early_exit_margin=None, cascade_bi_encoder_budget_ms=20)
+    refiner.bi_encoder.model = model = ConcurrencyTrackingMiniLM(delay=0.3)
+    skips_before = CascadeRefiner.bi_encoder_stats["busy_skips"]
+
+    traces = []
+    for _ in range(4): # Back-to-back timeouts
+        traces.append({})
+        await refiner.refine(_pages(), "solar battery storage", trace=traces[-1])
+
+    assert traces[0]["stages"][1]["timed_out"]
+    assert all(t["stages"][1]["skipped"] == "timed-out encode still running" for t in traces[1:])
+    assert traces[-1]["bi_encoder_stats"]["busy_skips"] == skips_before + 3
+    assert model.calls == 1 # No new encodes were piled onto the running one
+
+    await _wait_for_abandoned_encodes() # Once it finishes, stage 2 runs again
+    refiner.bi_encoder.model = FakeMiniLM()
+    trace = {}
+    await refiner.refine(_pages(), "solar battery storage", trace=trace)
+    assert "skipped" not in trace["stages"][1] and not trace["stages"][1].get("timed_out")
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_encode_in_parallel():
+    await _wait_for_abandoned_encodes()
+    refiner = _refiner(cascade_early_exit_margin=None, cascade_bi_encoder_budget_ms=2000)
+    refiner.bi_encoder.model = model = ConcurrencyTrackingMiniLM(delay=0.1)
+
+    await asyncio.gather(*[refiner.refine(_pages(), "solar battery storage") for _ in range(3)])
+
+    assert model.calls == 3 and model.peak > 1
+
+@pytest.mark.asyncio
+async def test_missing_models_degrade_to_bm25():
+    refiner = _refiner()
+    refiner.bi_encoder.model = None
+    refiner.cross_encoder._is_loaded = False
+    refiner.cross_encoder._lazy_load = lambda: (_ for _ in ()).throw(ImportError("no sentence-transformers"))
+    trace = {}
+    evidence = await refiner.refine(_pages(), "solar battery storage", trace=trace)
+
+    assert trace["stages"][1]["skipped"] == "model unavailable"
+    assert trace["stages"][2]["skipped"] == "no sentence-transformers"
+    assert len(evidence) == 2 and evidence[0].relevance_score == 1.0 # BM25 order
+
+@pytest.mark.asyncio
+async def test_pipeline_records_refine_trace():
+    pipeline = AsyncPipeline.__new__(AsyncPipeline)
+    pipeline.refiner = _refiner(cascade_early_exit_margin=None)
+    output = PipelineOutput(query="solar battery storage")
+    evidence = await pipeline._refine(_pages(), output.query, output)
+    assert len(evidence) == 2
+    assert [s["stage"] for s in output.trace["refine"]["stages"]] == ["bm25", "bi_encoder", "cross_encoder"]
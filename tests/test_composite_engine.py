@@ -0,0 +1,101 @@
+import asyncio
+import time
+import pytest
+from typing import List
+from open_web_search.engines.base import BaseSearchEngine
+from open_web_search.engines.composite import CompositeSearchEngine
+from open_web_search.schemas.results import SearchResult
+
+class FakeEngine(BaseSearchEngine):
+    def __init__(self, name: str, urls: List[str], delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.urls = urls
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    async def search(self, queries: List[str]) -> List[SearchResult]:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return [SearchResult(title=u, url=u, source_engine=self.name) for u in self.urls]
+
+@pytest.mark.asyncio
+async def test_failover_skips_secondary_when_primary_succeeds():
+    primary = FakeEngine("searxng", ["https://a.com"])
+    secondary = FakeEngine("ddg", ["https://b.com"])
+    composite = CompositeSearchEngine([primary, secondary], strategy="failover")
+
+    results, telemetry = await composite.search_with_telemetry(["q"])
+    assert [r.url for r in results] == ["https://a.com"]
+    assert secondary.calls == 0
+    assert telemetry["winner"] == "searxng"
+
+@pytest.mark.asyncio
+async def test_hedged_launches_secondary_after_delay():
+    primary = FakeEngine("searxng", ["https://a.com"], delay=2.0)
+    secondary = FakeEngine("ddg", ["https://b.com"], delay=0.01)
+    composite = CompositeSearchEngine([primary, secondary], strategy="hedged", hedge_delay=0.05)
+
+    start = time.perf_counter()
+    results, telemetry = await composite.search_with_telemetry(["q"])
+    elapsed = time.perf_counter() - start
+
+    assert [r.url for r in results] == ["https://b.com"]
+    assert elapsed < 1.0, "Slow primary must not gate the response"
+    assert telemetry["winner"] == "ddg"
+    assert telemetry["engines"]["searxng"]["status"] == "cancelled"
+    assert composite.stats_snapshot()["ddg"]["win_rate"] == 1.0
+
+@pytest.mark.asyncio
+async def test_hedged_skips_delay_when_primary_fails_fast():
+    primary = FakeEngine("searxng", [], fail=True)
+    secondary = FakeEngine("ddg", ["https://b.com"])
+    composite = CompositeSearchEngine([primary, secondary], strategy="hedged", hedge_delay=10.0)
+
+    start = time.perf_counter()
+    results = await composite.search(["q"])
+    assert [r.url for r in results] == ["https://b.com"]
+    assert time.perf_counter() - start < 1.0
+    assert composite.engine_stats["searxng"]["errors"] == 1
+
+@pytest.mark.asyncio
+async def test_parallel_merges_with_rrf_and_dedups_urls():
+    primary = FakeEngine("searxng", ["https://a.com", "https://www.shared.com/", "https://c.com"])
+    secondary = FakeEngine("ddg", ["https://shared.com", "https://d.com"])
+    composite = CompositeSearchEngine([primary, secondary], strategy="parallel")
+
+    results, telemetry = await composite.search_with_telemetry(["q"])
+    urls = [r.url for r in results]
+
+    assert len(urls) == 4, "shared.com must be deduplicated"
+    assert urls[0] in ("https://www.shared.com/", "https://shared.com"), "Agreement between engines ranks first"
+    assert [r.rank for r in results] == [1, 2, 3, 4]
+    assert set(telemetry["engines"]) == {"searxng", "ddg"}
+
+class GatedEngine(FakeEngine):
+    """Answers once `gate` opens, so several engines can finish in the same loop iteration."""
+    def __init__(self, name: str, urls: List[str], gate: asyncio.Event):
+        super().__init__(name, urls)
+        self.gate = gate
+
+    async def search(self, queries: List[str]) -> List[SearchResult]:
+        self.calls += 1
+        await self.gate.wait()
+        return [SearchResult(title=u, url=u, source_engine=self.name) for u in self.urls]
+
+@pytest.mark.asyncio
+async def test_hedged_tie_goes_to_priority_and_records_real_outcomes():
+    gate = asyncio.Event()
+    primary = GatedEngine("searxng", ["https://a.com"], gate)
+    secondary = GatedEngine("ddg", ["https://b.com"], gate)
+    composite = CompositeSearchEngine([primary, secondary], strategy="hedged", hedge_delay=0.02)
+    asyncio.get_running_loop().call_later(0.1, gate.set) # Both are in flight by then
+
+    results, telemetry = await composite.search_with_telemetry(["q"])
+
+    assert [r.url for r in results] == ["https://a.com"]
+    assert telemetry["winner"] == "searxng"
+    assert telemetry["engines"]["ddg"]["status"] == "ok"
+    assert composite.engine_stats["ddg"]["cancelled"] == 0
@@ -0,0 +1,87 @@
+import threading
+import pytest
+from open_web_search.config import LinkerConfig
+from open_web_search.refiners.batching import model_max_length, plan_batches, predict_bucketed, truncate_pairs
+from open_web_search.refiners.flash import FlashRefiner
+from open_web_search.refiners.keyword import KeywordRefiner
+from open_web_search.schemas.results import FetchedPage
+
+class _Encoding(dict):
+    def __init__(self, pairs):
+        super().__init__(input_ids=[p[0] for p in pairs], offset_mapping=[p[1] for p in pairs])
+        self._seq = [p[2] for p in pairs]
+
+    def sequence_ids(self, i):
+        return self._seq[i]
+
+class _WordTokenizer:
+    """Whitespace 'fast tokenizer' with offsets: [CLS] query [SEP] text [SEP], text truncated."""
+    is_fast = True
+    model_max_length = 10 ** 30 # HF's "unknown" sentinel
+
+    def __call__(self, queries, texts, truncation, max_length, return_offsets_mapping):
+        out = []
+        for query, text in zip(queries, texts):
+            q_words = query.split()
+            spans, pos = [], 0
+            for word in text.split():
+                start = text.index(word, pos)
+                pos = start + len(word)
+                spans.append((start, pos))
+            spans = spans[:max(0, max_length - len(q_words) - 3)]
+            seq = [None] + [0] * len(q_words) + [None] + [1] * len(spans) + [None]
+            offsets = [(0, 0)] + [(0, 0)] * len(q_words) + [(0, 0)] + spans + [(0, 0)]
+            out.append((list(range(len(seq))), offsets, seq))
+        return _Encoding(out)
+
+class FakeCrossEncoder:
+    def __init__(self, tokenizer=None, max_length=None):
+        self.tokenizer = tokenizer
+        if max_length:
+            self.max_length = max_length
+        self.calls = []
+        self.threads = set()
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=None):
+        self.calls.append([text for _, text in pairs])
+        self.threads.add(threading.current_thread().name)
+        return [float(len(text)) for _, text in pairs] # Score = length, so order is checkable
+
+def test_plan_batches_sorts_and_respects_token_budget():
+    lengths = [500, 20, 30, 480, 25, 510, 40]
+    batches = plan_batches(lengths, token_budget=1024, max_batch=3)
+    assert sorted(i for b in batches for i in b) == list(range(len(lengths)))
+    flat = [lengths[i] for b in batches for i in b]
+    assert flat == sorted(lengths) # Length buckets
+    for batch in batches:
+        assert len(batch) <= 3
+        assert len(batch) == 1 or len(batch) * max(lengths[i] for i in batch) <= 1024
+    assert plan_batches([5000], token_budget=1024) == [[0]] # Oversized pair still runs, alone
+
+def test_predict_keeps_input_order_and_truncates_up_front():
+    model = FakeCrossEncoder(max_length=32)
+    texts = ["x" * 1000, "short text", "y" * 60]
+    scores = predict_bucketed(model, "query", texts, token_budget=64)
+    # Estimate path: text cut to (32 - 2 - 3) * 4 chars before predict ever sees it
+    assert scores.tolist() == [108.0, 10.0, 60.0]
+    assert model.calls[0][0] == "short text" # Shortest first
+    assert all(len(t) <= 108 for call in model.calls for t in call)
+
+def test_fast_tokenizer_truncation_cuts_on_token_boundary():
+    model = FakeCrossEncoder(tokenizer=_WordTokenizer())
+    assert model_max_length(model) == 512 # Sentinel ignored
+    texts, lengths = truncate_pairs(model, "solar power", ["one two three four five six", "tiny"], max_length=8)
+    assert texts == ["one two three", "tiny"]
+    assert lengths == [8, 6]
+
+@pytest.mark.asyncio
+async def test_flash_refiner_predicts_off_the_event_loop():
+    refiner = FlashRefiner(LinkerConfig(reranker_type="flash", max_evidence=2, reranker_token_budget=256))
+    refiner.model = FakeCrossEncoder(max_length=64)
+    refiner._is_loaded = True
+    page = FetchedPage(url="https://a.com", text_plain="Solar battery A.\n\nSolar battery storage B longer.\n\nSolar C.")
+    refiner.chunker = KeywordRefiner(chunk_size=40, min_relevance=0.0) # One paragraph per chunk
+
+    top = await refiner.refine([page], "solar battery")
+    assert [c.content for c in top] == ["Solar battery storage B longer.", "Solar battery A."]
+    assert threading.current_thread().name not in refiner.model.threads
@@ -0,0 +1,88 @@
+import time
+from open_web_search.utils.health import DomainHealth, classify_failure
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+GOOD = "x" * 400
+
+def test_classify_failure():
+    assert classify_failure(200, None, GOOD) is None
+    assert classify_failure(404, "HTTP 404", None) == "gone"
+    assert classify_failure(403, "Blocked", None) == "blocked"
+    assert classify_failure(200, None, "Please enable JavaScript to continue " + GOOD) == "blocked"
+    assert classify_failure(None, "timeout", None) == "error"
+    assert classify_failure(200, None, "tiny") == "short"
+
+def test_article_mentioning_captcha_is_not_a_challenge():
+    article = "How reCAPTCHA and Cloudflare bot checks work. " + "x" * 3000
+    assert classify_failure(200, None, article) is None
+    assert classify_failure(503, "Service Unavailable", None) == "blocked"
+    # Small non-HTML documents are the document, not a failed render
+    assert classify_failure(200, None, '{"ok": true}', doc_type="json") is None
+    assert classify_failure(200, None, '{"ok": true}') == "short"
+
+def test_short_pages_only_count_once_the_browser_gets_more():
+    health = DomainHealth(DictCache(), failure_threshold=1)
+    assert health.record_fetch("https://terse.com/1", 200, None, "tiny") == "short"
+    assert health.state("https://terse.com/x") == "closed"
+    assert health.negative("https://terse.com/1") is None
+
+    health.record_recovery("https://terse.com/1", recovered=False, after_short=True)
+    assert health.state("https://terse.com/x") == "closed"
+    health.record_recovery("https://terse.com/2", recovered=True, after_short=True)
+    assert health.state("https://terse.com/x") == "open"
+
+def test_circuit_opens_then_half_open_probe_closes_it():
+    health = DomainHealth(DictCache(), failure_threshold=2, open_seconds=0.05)
+    url = "https://www.blocked.com/a"
+    health.record_fetch(url, 403, "Blocked", None)
+    assert health.state(url) == "closed"
+    health.record_fetch("https://blocked.com/b", 403, "Blocked", None)
+    assert health.state(url) == "open"
+
+    # Open: no HTTP fetch, and nothing recovered yet -> snippet
+    assert health.route("https://blocked.com/c") == ("snippet", "circuit open")
+
+    time.sleep(0.06)
+    assert health.route("https://blocked.com/c")[0] == "fetch" # The single half-open probe
+    assert health.route("https://blocked.com/d")[0] == "snippet" # Others wait for the probe
+    health.record_fetch("https://blocked.com/c", 200, None, GOOD)
+    assert health.state(url) == "closed"
+    assert health.route("https://blocked.com/e") == ("fetch", None)
+
+def test_failed_probe_reopens_for_longer():
+    health = DomainHealth(DictCache(), failure_threshold=1, open_seconds=0.05)
+    health.record_fetch("https://a.com/1", 503, "down", None)
+    time.sleep(0.06)
+    assert health.route("https://a.com/2")[0] == "fetch"
+    health.record_fetch("https://a.com/2", 503, "down", None)
+    breaker = health._breakers["a.com"]
+    assert breaker.state == "open" and breaker.trips == 2
+    assert breaker.open_until - time.time() > 0.05
+
+def test_routes_to_browser_when_it_worked_last_time():
+    health = DomainHealth(DictCache(), failure_threshold=1)
+    health.record_fetch("https://spa.com/1", 200, None, "Please enable JavaScript")
+    health.record_recovery("https://spa.com/1", recovered=True)
+    assert health.route("https://spa.com/2") == ("browser", "circuit open")
+    # The URL itself is negative-cached with the same recovery
+    assert health.route("https://spa.com/1")[0] == "browser"
+
+def test_negative_cache_for_gone_urls_does_not_trip_domain():
+    health = DomainHealth(DictCache(), failure_threshold=1)
+    health.record_fetch("https://docs.com/missing", 404, "HTTP 404", None)
+    assert health.route("https://docs.com/missing") == ("snippet", "negative cache (gone)")
+    assert health.route("https://docs.com/other") == ("fetch", None)
+
+def test_breakers_persist_across_instances():
+    cache = DictCache()
+    DomainHealth(cache, failure_threshold=1).record_fetch("https://a.com/1", 403, "Blocked", None)
+    assert DomainHealth(cache).state("https://a.com/x") == "open"
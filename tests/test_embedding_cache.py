@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from open_web_search.utils.embedding_cache import EmbeddingCache
+
+class CountingModel:
+    def __init__(self, dim=8):
+        self.dim = dim
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        if isinstance(texts, str):
+            return self.encode([texts])[0]
+        self.encoded.extend(texts)
+        return np.stack([np.full(self.dim, len(t), dtype=np.float32) + np.arange(self.dim) for t in texts])
+
+def test_encodes_only_unseen_texts_once(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "mini/model", capacity=10)
+    model = CountingModel()
+
+    first = cache.encode(model, ["alpha", "beta", "alpha"])
+    second = cache.encode(model, ["beta", "gamma!"])
+
+    assert model.encoded == ["alpha", "beta", "gamma!"]
+    assert first.shape == (3, 8) and first.dtype == np.float32
+    np.testing.assert_array_equal(first[1], second[0])
+    assert cache.stats == {"hits": 1, "misses": 3, "evictions": 0} # In-batch duplicates are encoded once, not hits
+
+def test_rows_are_float16_and_survive_reopen(tmp_path):
+    model = CountingModel()
+    cache = EmbeddingCache(str(tmp_path), "mini", capacity=10)
+    vectors = cache.encode(model, ["persisted paragraph"])
+    cache.flush()
+
+    assert (tmp_path / "mini.f16").stat().st_size == 10 * 8 * 2
+
+    reopened = EmbeddingCache(str(tmp_path), "mini", capacity=10)
+    again = reopened.encode(model, ["persisted paragraph"])
+    assert model.encoded == ["persisted paragraph"]
+    np.testing.assert_array_equal(vectors, again)
+
+def test_late_starter_does_not_truncate_a_store_in_use(tmp_path):
+    model = CountingModel()
+    early = EmbeddingCache(str(tmp_path), "mini", capacity=10)
+    late = EmbeddingCache(str(tmp_path), "mini", capacity=10) # Opened before any file existed
+    early.encode(model, ["written by another worker"])
+    early.flush()
+
+    late.encode(model, ["new paragraph"]) # First write: finds the store instead of recreating it
+
+    assert late.get_many([late.key("written by another worker")])[0] is not None
+    assert not list(tmp_path.glob("*.tmp*"))
+
+def test_reopen_with_new_capacity_resizes(tmp_path):
+    model = CountingModel()
+    cache = EmbeddingCache(str(tmp_path), "mini", capacity=4)
+    cache.encode(model, ["a", "bb", "ccc"])
+    cache.flush()
+
+    bigger = EmbeddingCache(str(tmp_path), "mini", capacity=8)
+    assert bigger.capacity == 8
+    assert (tmp_path / "mini.f16").stat().st_size == 8 * 8 * 2
+    assert all(v is not None for v in bigger.get_many([bigger.key(t) for t in ["a", "bb", "ccc"]]))
+
+    smaller = EmbeddingCache(str(tmp_path), "mini", capacity=2)
+    assert smaller.capacity == 2 and smaller.snapshot()["rows"] == 2
+    smaller.encode(model, ["dddd"]) # Full: evicts instead of writing past the end
+    assert smaller.stats["evictions"] == 1
+
+def test_lru_eviction_reuses_oldest_row(tmp_path):
+    model = CountingModel()
+    cache = EmbeddingCache(str(tmp_path), "mini", capacity=2)
+    cache.encode(model, ["a"])
+    cache.encode(model, ["bb"])
+    cache.encode(model, ["a"]) # Touch: "bb" is now the oldest
+    cache.encode(model, ["ccc"])
+
+    assert cache.stats["evictions"] == 1
+    assert cache.get_many([cache.key("bb")]) == [None]
+    assert cache.get_many([cache.key("a")])[0] is not None
+
+def test_dimension_mismatch_is_ignored(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), "mini", capacity=4)
+    cache.encode(CountingModel(dim=8), ["x"])
+    out = cache.encode(CountingModel(dim=4), ["y"])
+    assert out.shape == (1, 4)
+    assert cache.get_many([cache.key("y")]) == [None]
+
+@pytest.mark.asyncio
+async def test_hybrid_refiner_reuses_chunk_embeddings_across_queries(tmp_path):
+    from open_web_search.refiners.hybrid import HybridRefiner
+    from open_web_search.schemas.results import FetchedPage
+
+    refiner = HybridRefiner(chunk_size=200, embedding_cache_dir=str(tmp_path))
+    model = CountingModel(dim=16)
+    refiner.model = model
+    text = " ".join(f"Rust borrow checker note {i} about lifetimes and ownership." for i in range(30))
+    pages = [FetchedPage(url="https://docs.example/rust", text_plain=text)]
+
+    await refiner.refine(pages, "rust lifetimes")
+    encoded_first = len(model.encoded)
+    await refiner.refine(pages, "rust ownership rules")
+
+    # Second query only embeds its own query text, every chunk comes from the cache
+    assert encoded_first > 1
+    assert len(model.encoded) - encoded_first <= 1
+
+def test_snapshot_all_groups_stores_by_directory(tmp_path):
+    cache = EmbeddingCache.get_instance(str(tmp_path), "mini", capacity=4)
+    cache.encode(CountingModel(), ["x"])
+
+    snapshot = EmbeddingCache.snapshot_all()[str(tmp_path.resolve())]["mini"]
+    assert snapshot["rows"] == 1 and snapshot["capacity"] == 4
@@ -0,0 +1,36 @@
+import pytest
+from open_web_search.readers.extraction import ExtractionPool, extract_document, extract_text_selectolax
+
+HTML = (
+    "<html><head><title>Python Guide</title><script>var x = 1;</script></head>"
+    "<body><nav>Home | About</nav><article>"
+    + "<p>Python is a programming language.</p>" * 5
+    + "</article><footer>Copyright</footer></body></html>"
+)
+
+def test_selectolax_strips_noise_and_keeps_title():
+    result = extract_document("selectolax", HTML.encode("utf-8"))
+    assert result["title"] == "Python Guide"
+    assert "Python is a programming language." in result["text"]
+    assert "Home | About" not in result["text"]
+    assert "var x" not in result["text"]
+    assert extract_text_selectolax(HTML) == result["text"]
+
+def test_bytes_and_str_inputs_match():
+    assert extract_document("selectolax", HTML) == extract_document("selectolax", HTML.encode("utf-8"))
+
+@pytest.mark.asyncio
+async def test_process_pool_matches_inline():
+    pool = ExtractionPool("process", workers=2)
+    try:
+        results = [await pool.extract("selectolax", HTML.encode("utf-8")) for _ in range(3)]
+        assert all(r == extract_document("selectolax", HTML) for r in results)
+        assert pool.extract_sync("selectolax", HTML)["title"] == "Python Guide"
+    finally:
+        pool.shutdown()
+
+def test_pool_instances_are_shared():
+    a = ExtractionPool.get_instance("thread", 2)
+    b = ExtractionPool.get_instance("thread", 2)
+    assert a is b
+    assert ExtractionPool.get_instance("thread", 3) is not a
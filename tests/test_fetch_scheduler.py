@@ -0,0 +1,103 @@
+import asyncio
+import time
+from email.utils import formatdate
+import pytest
+from open_web_search.utils.scheduler import FetchScheduler, HostThrottledError, parse_retry_after
+
+@pytest.mark.asyncio
+async def test_fair_queue_interleaves_hosts():
+    scheduler = FetchScheduler(max_concurrency=1, per_host_concurrency=1, per_host_rate=0)
+    order = []
+
+    async def fetch(url):
+        async with scheduler.slot(url):
+            order.append(scheduler.host_of(url))
+            await asyncio.sleep(0.01)
+
+    # Five URLs from one domain queued ahead of two others
+    urls = [f"http://a.com/{i}" for i in range(5)] + ["http://b.com/1", "http://c.com/1"]
+    await asyncio.gather(*[fetch(u) for u in urls])
+
+    assert order[:4].count("a.com") <= 2
+    assert set(order[:4]) == {"a.com", "b.com", "c.com"}
+
+@pytest.mark.asyncio
+async def test_per_host_concurrency_cap():
+    scheduler = FetchScheduler(max_concurrency=10, per_host_concurrency=2, per_host_rate=0)
+    active = peak = 0
+
+    async def fetch(url):
+        nonlocal active, peak
+        async with scheduler.slot(url):
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+
+    await asyncio.gather(*[fetch(f"http://a.com/{i}") for i in range(6)])
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_token_bucket_paces_requests():
+    scheduler = FetchScheduler(max_concurrency=10, per_host_concurrency=10, per_host_rate=20, per_host_burst=1)
+    start = time.perf_counter()
+    for _ in range(4):
+        async with scheduler.slot("http://a.com/"):
+            pass
+    # burst of 1, then 3 tokens at 20/s
+    assert time.perf_counter() - start >= 0.14
+
+@pytest.mark.asyncio
+async def test_retry_after_backoff():
+    scheduler = FetchScheduler(per_host_rate=0)
+    delay = scheduler.record_response("http://a.com/x", 429, {"retry-after": "0.2"})
+    assert delay == pytest.approx(0.2)
+
+    with pytest.raises(HostThrottledError):
+        async with scheduler.slot("http://a.com/y", max_wait=0.05):
+            pass
+
+    start = time.perf_counter()
+    async with scheduler.slot("http://a.com/y"):
+        pass
+    assert time.perf_counter() - start >= 0.15
+
+    # Other hosts are unaffected
+    start = time.perf_counter()
+    async with scheduler.slot("http://b.com/"):
+        pass
+    assert time.perf_counter() - start < 0.05
+
+def test_exponential_backoff_without_header():
+    scheduler = FetchScheduler(max_backoff=3)
+    assert scheduler.record_response("http://a.com", 503) == 1
+    assert scheduler.record_response("http://a.com", 503) == 2
+    assert scheduler.record_response("http://a.com", 503) == 3
+    scheduler.record_response("http://a.com", 200)
+    assert scheduler.record_response("http://a.com", 429) == 1
+
+def test_parse_retry_after():
+    assert parse_retry_after("5") == 5
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("garbage") is None
+    assert 8 <= parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot():
+    scheduler = FetchScheduler(max_concurrency=1, per_host_rate=0)
+    release = asyncio.Event()
+
+    async def holder():
+        async with scheduler.slot("http://a.com/1"):
+            await release.wait()
+
+    holding = asyncio.ensure_future(holder())
+    await asyncio.sleep(0)
+    waiter = asyncio.ensure_future(scheduler.acquire("b.com"))
+    await asyncio.sleep(0)
+    waiter.cancel()
+    release.set()
+    await holding
+
+    await asyncio.wait_for(scheduler.acquire("c.com"), timeout=0.5)
+    assert scheduler.snapshot()["active"] == 1
@@ -0,0 +1,57 @@
+from open_web_search.readers.strategy import FetchStrategyTable
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+def _table(**kwargs):
+    return FetchStrategyTable(DictCache(), min_samples=3, reprobe_every=5, **kwargs)
+
+def test_unknown_and_healthy_hosts_use_http():
+    table = _table()
+    assert table.choose("https://new.com/a")[0] == "fetch"
+    for _ in range(5):
+        table.record("https://ok.com/a", "http", True, 300)
+    assert table.choose("https://ok.com/b") == ("fetch", None, 0.0)
+
+def test_routes_to_browser_and_reports_savings():
+    table = _table()
+    for _ in range(3):
+        table.record("https://spa.com/a", "http", False, 1200)
+        table.record("https://spa.com/a", "browser", True, 3000)
+    route, reason, saved = table.choose("https://spa.com/b")
+    assert route == "browser"
+    assert saved == 1200 # The failed HTTP attempt we no longer pay
+    assert table.snapshot()["est_time_saved_ms"] == 1200
+
+def test_routes_to_snippet_when_nothing_works():
+    table = _table()
+    for _ in range(3):
+        table.record("https://wall.com/a", "http", False, 1000)
+        table.record("https://wall.com/a", "browser", False, 5000)
+    route, _, saved = table.choose("https://wall.com/b")
+    assert route == "snippet"
+    assert saved == 6000
+
+def test_periodic_reprobe_and_recovery():
+    table = _table()
+    for _ in range(3):
+        table.record("https://spa.com/a", "http", False, 1000)
+    routes = [table.choose("https://spa.com/x")[0] for _ in range(5)]
+    assert routes.count("fetch") == 1 # Every 5th decision re-probes HTTP
+
+    table.record("https://spa.com/x", "http", True, 400) # The probe succeeded
+    assert table.choose("https://spa.com/y")[0] == "fetch"
+
+def test_table_persists():
+    cache = DictCache()
+    table = FetchStrategyTable(cache, min_samples=1)
+    table.record("https://spa.com/a", "http", False, 1000)
+    table.record("https://spa.com/a", "http", False, 1000)
+    assert FetchStrategyTable(cache, min_samples=1).choose("https://spa.com/b")[0] == "browser"
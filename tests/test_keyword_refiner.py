@@ -0,0 +1,118 @@
+import math
+import pytest
+from collections import Counter
+from open_web_search.refiners.keyword import BM25, KeywordRefiner, chunk_spans, tokenize
+from open_web_search.schemas.results import FetchedPage
+
+CORPUS = [
+    ["solid", "state", "battery", "energy"],
+    ["battery", "battery", "recycling"],
+    ["weather", "forecast"],
+    ["energy", "density", "solid", "electrolyte", "battery", "cells"],
+    [],
+]
+
+def brute_force(corpus, query, k1=1.5, b=0.75):
+    """Textbook BM25, scoring every document."""
+    n = len(corpus)
+    avgdl = sum(len(d) for d in corpus) / n
+    df = Counter(w for d in corpus for w in set(d))
+    scores = []
+    for doc in corpus:
+        tf = Counter(doc)
+        score = 0.0
+        for word in query:
+            if word in tf:
+                idf = math.log((n - df[word] + 0.5) / (df[word] + 0.5) + 1.0)
+                score += idf * tf[word] * (k1 + 1) / (tf[word] + k1 * (1 - b + b * len(doc) / avgdl))
+        scores.append(score)
+    return scores
+
+@pytest.mark.parametrize("vocabulary", [None, ["battery", "energy", "solid"]])
+def test_index_scores_match_brute_force(vocabulary):
+    query = ["battery", "energy", "solid", "battery"]
+    bm25 = BM25(CORPUS, vocabulary=vocabulary)
+    expected = brute_force(CORPUS, query)
+
+    scores = bm25.get_scores(query)
+    assert set(scores) == {i for i, s in enumerate(expected) if s > 0} # Only postings are touched
+    for i, s in enumerate(expected):
+        assert scores.get(i, 0.0) == pytest.approx(s)
+        assert bm25.get_score(query, i) == pytest.approx(s)
+
+def test_top_k_is_best_first():
+    bm25 = BM25(CORPUS)
+    top = bm25.top_k(["battery"], 2)
+    assert [doc for doc, _ in top] == [1, 0] # tf=2 beats tf=1 in a shorter doc
+    assert top[0][1] > top[1][1]
+    assert bm25.top_k(["unknown"], 3) == []
+
+def _pages():
+    return [
+        FetchedPage(url="https://a.com", title="A", text_plain="Solid state battery energy density.\n\nUnrelated gardening notes."),
+        FetchedPage(url="https://b.com", title="B", text_plain="Battery recycling plants.\n\nWeather forecast for Tuesday."),
+    ]
+
+@pytest.mark.asyncio
+async def test_refine_only_builds_surviving_chunks():
+    refiner = KeywordRefiner(chunk_size=40, min_relevance=0.1)
+    evidence = await refiner.refine(_pages(), "solid state battery")
+    assert [c.content for c in evidence] == ["Solid state battery energy density.", "Battery recycling plants."]
+    assert evidence[0].relevance_score == 1.0
+    assert all(c.relevance_score >= 0.1 for c in evidence)
+
+@pytest.mark.asyncio
+async def test_refine_top_k_and_chunker_mode():
+    top = await KeywordRefiner(chunk_size=40, top_k=1).refine(_pages(), "battery")
+    assert len(top) == 1 and top[0].content == "Battery recycling plants." # Shorter chunk wins
+
+    # min_relevance=0 (how Hybrid/Flash use it): every chunk, matches first, then page order
+    everything = await KeywordRefiner(chunk_size=40, min_relevance=0.0).refine(_pages(), "battery")
+    assert len(everything) == 4
+    assert [c.relevance_score > 0 for c in everything] == [True, True, False, False]
+    assert everything[2].content == "Unrelated gardening notes."
+
+TEXT = (
+    "Intro paragraph about batteries.\n\n"
+    "Second paragraph. It has two sentences.\n\n"
+    "A long paragraph. " + "Filler sentence number one. " * 6 + "\n\n"
+    + "x" * 130
+)
+
+def test_tokenize_spans_without_slicing():
+    assert tokenize("The Solid-State battery is a 2x win") == ["solid", "state", "battery", "2x", "win"]
+    assert tokenize("skip THIS battery", 5, 17) == ["battery"]
+    assert tokenize("already lower", lowered=True) == ["already", "lower"]
+
+def test_chunk_spans_are_offsets_into_the_text():
+    spans = chunk_spans(TEXT, chunk_size=60)
+    assert all(0 <= s < e <= len(TEXT) for s, e in spans)
+    assert all(e - s <= 60 for s, e in spans)
+    chunks = [TEXT[s:e] for s, e in spans]
+    assert chunks[0] == "Intro paragraph about batteries."
+    # Paragraphs pack with the first sentences of a paragraph too long for one chunk
+    assert chunks[1] == "Second paragraph. It has two sentences.\n\nA long paragraph."
+    assert chunks[2] == "Filler sentence number one. Filler sentence number one."
+    assert all(c == c.strip() for c in chunks)
+    # The 130-char run is hard-chopped
+    assert chunks[-3:] == ["x" * 60, "x" * 60, "x" * 10]
+    # Without overlap nothing is repeated
+    assert all(a[1] <= b[0] for a, b in zip(spans, spans[1:]))
+
+def test_chunk_overlap_repeats_tail_on_word_boundary():
+    text = " ".join(f"word{i:02d}." for i in range(40)) # One long "paragraph" of short sentences
+    spans = chunk_spans(text, chunk_size=50, overlap=16)
+    for (s1, e1), (s2, e2) in zip(spans, spans[1:]):
+        assert s1 < s2 < e1 # Overlapping, and always progressing
+        assert e1 - s2 <= 16
+        assert s2 == 0 or text[s2 - 1] == " " # Starts on a word
+        assert e2 - s2 <= 50
+    assert spans[-1][1] == len(text)
+
+@pytest.mark.asyncio
+async def test_refine_fills_char_offsets():
+    pages = _pages()
+    evidence = await KeywordRefiner(chunk_size=40, min_relevance=0.0).refine(pages, "battery")
+    by_url = {p.url: p.text_plain for p in pages}
+    for chunk in evidence:
+        assert by_url[chunk.url][chunk.start_char:chunk.end_char] == chunk.content
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from open_web_search.refiners.mmr import mmr_select, normalize_rows
+
+def loop_mmr(embeddings, relevance, urls, k=15, lambda_=0.7, max_per_source=3):
+    # Reference: the original HybridRefiner loop
+    selected, candidates, source_counts = [], list(range(len(relevance))), {}
+    while len(selected) < k and candidates:
+        best_mmr, best_idx = -1.0, -1
+        for idx in candidates:
+            if source_counts.get(urls[idx], 0) >= max_per_source:
+                continue
+            if not selected:
+                diversity = 0.0
+            else:
+                sel = embeddings[selected]
+                sims = np.dot(sel, embeddings[idx]) / (np.linalg.norm(sel, axis=1) * np.linalg.norm(embeddings[idx]))
+                diversity = np.max(sims)
+            mmr = (lambda_ * relevance[idx]) - ((1 - lambda_) * diversity)
+            if mmr > best_mmr:
+                best_mmr, best_idx = mmr, idx
+        if best_idx == -1:
+            break
+        selected.append(best_idx)
+        candidates.remove(best_idx)
+        source_counts[urls[best_idx]] = source_counts.get(urls[best_idx], 0) + 1
+    return selected
+
+@pytest.mark.parametrize("n", [5, 20, 200])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_matches_original_loop(n, seed):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, 32)).astype(np.float32)
+    relevance = (rng.random(n) * 1.2 - 0.1).tolist()
+    urls = [f"https://site{i % 4}.com" for i in range(n)]
+
+    expected = loop_mmr(embeddings, relevance, urls)
+    assert mmr_select(embeddings, relevance, 15, groups=urls, max_per_group=3) == expected
+
+def test_source_cap_and_stop_when_exhausted():
+    embeddings = np.eye(6, dtype=np.float32)
+    relevance = [0.9, 0.8, 0.7, 0.6, 0.5, 0.4]
+    urls = ["a", "a", "a", "b", "b", "b"]
+    picks = mmr_select(embeddings, relevance, k=10, groups=urls, max_per_group=1)
+    assert picks == [0, 3]
+
+def test_prefers_diverse_over_duplicate():
+    base = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+    embeddings = np.stack([base, base * 2, np.array([0.0, 1.0, 0.0], dtype=np.float32)])
+    # The near-duplicate is more relevant than the distinct chunk, but diversity wins
+    assert mmr_select(embeddings, [0.9, 0.85, 0.6], k=2) == [0, 2]
+
+def test_edge_cases():
+    assert mmr_select(np.zeros((0, 4)), [], k=5) == []
+    zero_row = np.array([[0.0, 0.0], [1.0, 0.0]], dtype=np.float32)
+    assert not np.isnan(normalize_rows(zero_row)).any()
+    assert mmr_select(zero_row, [0.5, 0.4], k=2) == [0, 1]
+
+class _FakeModel:
+    def encode(self, texts, **kwargs):
+        def vec(text):
+            rng = np.random.default_rng(abs(hash(text)) % (2 ** 32))
+            return rng.standard_normal(16).astype(np.float32)
+        return vec(texts) if isinstance(texts, str) else np.stack([vec(t) for t in texts])
+
+@pytest.mark.asyncio
+async def test_hybrid_refiner_caps_chunks_per_source():
+    from open_web_search.refiners.hybrid import HybridRefiner
+    from open_web_search.schemas.results import FetchedPage
+
+    refiner = HybridRefiner(chunk_size=200)
+    refiner.model = _FakeModel()
+    text = " ".join(f"Python fact number {i} about interpreters and bytecode." for i in range(60))
+    pages = [FetchedPage(url=f"https://site{s}.com/a", text_plain=text) for s in range(2)]
+
+    chunks = await refiner.refine(pages, "python interpreters")
+
+    assert 0 < len(chunks) <= 6
+    assert max(sum(c.url == p.url for c in chunks) for p in pages) <= 3
@@ -0,0 +1,53 @@
+import threading
+import time
+from open_web_search.utils.models import ModelRegistry
+
+class DummyModel:
+    def __init__(self, name: str, device: str):
+        self.name = name
+        self.device = device
+        self.warmed = False
+
+def test_registry_loads_once_per_key():
+    registry = ModelRegistry()
+    load_calls = []
+
+    def loader(name, device):
+        load_calls.append((name, device))
+        time.sleep(0.05) # Simulate slow weight loading
+        return DummyModel(name, device)
+
+    registry.register_loader("dummy", loader)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("dummy", "mini", "cpu"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert load_calls == [("mini", "cpu")]
+    assert all(m is results[0] for m in results)
+
+    # Different device is a different instance
+    other = registry.get("dummy", "mini", "cuda")
+    assert other is not results[0]
+    assert len(load_calls) == 2
+
+def test_registry_warmup_and_stats():
+    registry = ModelRegistry()
+
+    def warmup(model):
+        model.warmed = True
+
+    registry.register_loader("dummy", DummyModel, warmup=warmup)
+    registry.preload([("dummy", "mini", "cpu")])
+
+    model = registry.get("dummy", "mini", "cpu")
+    assert model.warmed
+
+    stats = registry.stats()
+    assert stats["models"][0]["model"] == "mini"
+    assert stats["models"][0]["warm"] is True
+    assert stats["models"][0]["load_ms"] >= 0
+    assert "process_rss_bytes" in stats
@@ -0,0 +1,30 @@
+import asyncio
+import pytest
+from open_web_search.crawling.crawler import NeuralCrawler
+from open_web_search.schemas.results import FetchedPage
+
+class LinkingReader:
+    """Every page links to three more pages on the same site."""
+    async def fetch_with_links(self, url: str):
+        await asyncio.sleep(0.01)
+        links = [{"url": f"{url}/{i}", "text": "next", "context": ""} for i in range(3)]
+        return FetchedPage(url=url, status_code=200, text_plain="page " * 100), links
+
+class FollowEverything:
+    def score_links(self, candidates, query):
+        for c in candidates:
+            c.score = 0.9
+        return candidates
+
+@pytest.mark.asyncio
+async def test_concurrent_crawls_keep_their_own_budget():
+    crawler = NeuralCrawler(LinkingReader(), FollowEverything(), max_pages_per_domain=3)
+
+    first, second = await asyncio.gather(
+        crawler.crawl(["https://a.com"], "q", max_pages=10),
+        crawler.crawl(["https://a.com"], "q", max_pages=10)
+    )
+
+    # Each crawl gets the full per-domain budget and its own visited set
+    assert len(first) == len(second) == 3
+    assert [p.url for p in first] == [p.url for p in second]
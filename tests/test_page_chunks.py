@@ -0,0 +1,97 @@
+import pytest
+from open_web_search.core.synthesizer import AnswerSynthesizer
+from open_web_search.refiners.chunks import Chunker
+from open_web_search.refiners.hybrid import HybridRefiner
+from open_web_search.refiners.keyword import KeywordRefiner
+from open_web_search.schemas.results import EvidenceChunk, FetchedPage
+from open_web_search.utils.cache import PageCache, TieredPageStore
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+    def __contains__(self, key):
+        return key in self.data
+
+TEXT = "\n\n".join(f"Paragraph {i} about solar panels and battery storage." for i in range(30))
+
+class CountingChunker(Chunker):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.builds = 0
+
+    def build(self, url, text):
+        self.builds += 1
+        return super().build(url, text)
+
+def _page(url="https://a.com/x"):
+    return FetchedPage(url=url, status_code=200, title="Solar", text_plain=TEXT, text_markdown=TEXT)
+
+def test_artifact_has_offsets_tokens_and_stable_ids():
+    chunker = Chunker(chunk_size=120, chunk_overlap=20)
+    chunks = chunker.build("https://a.com/x", TEXT)
+    assert len(chunks) > 1
+    for i, (start, end) in enumerate(chunks.spans):
+        assert chunks.content(i) == TEXT[start:end]
+        assert "solar" in chunks.tokens[i]
+    # Same url + text + settings -> same ids (across requests and processes)
+    assert chunker.build("https://a.com/x", TEXT).chunk_ids == chunks.chunk_ids
+    assert Chunker(chunk_size=120).key != chunker.key
+
+@pytest.mark.asyncio
+async def test_refiners_share_the_page_artifact():
+    page = _page()
+    keyword = KeywordRefiner(chunk_size=120, min_relevance=0.0)
+    keyword.chunker = CountingChunker(120)
+    first = await keyword.refine([page], "battery storage")
+    second = await keyword.refine([page.model_copy(deep=True)], "solar panels") # Copies keep the artifact
+    assert keyword.chunker.builds == 1
+    assert {c.chunk_id for c in first} == {c.chunk_id for c in second}
+
+    # Another refiner with the same settings reuses it too
+    hybrid = HybridRefiner(chunk_size=120)
+    artifact = page._chunks
+    await hybrid.keyword_refiner.refine([page], "battery")
+    assert page._chunks is artifact
+
+    # Text changes invalidate it
+    page.text_plain = "Completely different battery text."
+    await keyword.refine([page], "battery")
+    assert keyword.chunker.builds == 2
+
+def test_page_cache_chunks_on_put_and_disk_load():
+    cache = DictCache()
+    chunker = CountingChunker(120)
+    page_cache = PageCache(cache, store=TieredPageStore(cache), chunker=chunker)
+
+    page = _page()
+    entry = page_cache.put(page.url, page, body=b"<html></html>", extractor="selectolax@1")
+    assert chunker.is_current(page) and chunker.builds == 1 # The reader's page is chunked on fetch
+
+    hot = page_cache.load(page.url, entry, "selectolax@1")
+    assert chunker.is_current(hot) and chunker.builds == 1 # Hot tier keeps the chunks
+
+    page_cache.store._hot.clear()
+    cold = page_cache.load(page.url, entry, "selectolax@1")
+    assert chunker.is_current(cold) and chunker.builds == 2 # Chunked once when loaded from disk
+    assert page_cache.load(page.url, entry, "selectolax@1")._chunks is cold._chunks
+    assert chunker.builds == 2
+
+def test_synthesizer_skips_text_already_in_context():
+    text = "alpha beta gamma delta epsilon"
+    first = EvidenceChunk(url="u", chunk_id="1", content=text[0:16], start_char=0, end_char=16, relevance_score=1.0)
+    overlapping = EvidenceChunk(url="u", chunk_id="2", content=text[11:30], start_char=11, end_char=30, relevance_score=0.9)
+    inside = EvidenceChunk(url="u", chunk_id="3", content=text[6:10], start_char=6, end_char=10, relevance_score=0.8)
+    other_page = EvidenceChunk(url="v", chunk_id="4", content=text[0:16], start_char=0, end_char=16, relevance_score=0.7)
+
+    seen = {"u": [(0, 16)]}
+    assert AnswerSynthesizer._unseen_content(first, {}) == "alpha beta gamma"
+    assert AnswerSynthesizer._unseen_content(overlapping, seen) == " delta epsilon"
+    assert AnswerSynthesizer._unseen_content(inside, seen) is None
+    assert AnswerSynthesizer._unseen_content(other_page, seen) == "alpha beta gamma"
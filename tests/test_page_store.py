@@ -0,0 +1,97 @@
+import pytest
+from open_web_search.schemas.results import FetchedPage
+from open_web_search.utils.cache import PageCache, TieredPageStore
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+    def __contains__(self, key):
+        return key in self.data
+
+HTML = ("<html><body><article>" + "<p>Python is a programming language.</p>" * 200 + "</article></body></html>").encode()
+TEXT = "Python is a programming language. " * 200
+
+def _page(url="https://a.com/x", markdown=None):
+    return FetchedPage(url=url, status_code=200, title="Python", text_plain=TEXT, text_markdown=markdown or TEXT)
+
+def test_blobs_are_compressed_and_deduplicated():
+    store = TieredPageStore(DictCache())
+    d1 = store.put_blob("raw", HTML)
+    d2 = store.put_blob("raw", HTML)
+    assert d1 == d2
+    assert store.get_blob("raw", d1) == HTML
+    stats = store.stats()
+    assert stats["bytes_stored"] < len(HTML) / 5
+    assert stats["bytes_deduped"] == len(HTML)
+    assert stats["bytes_saved"] > len(HTML)
+
+def test_identical_markdown_is_stored_once():
+    cache = DictCache()
+    page_cache = PageCache(cache, store=TieredPageStore(cache))
+    entry = page_cache.put("https://a.com/x", _page(), body=HTML, extractor="selectolax@1")
+    assert entry.markdown_digest is None
+    assert len([k for k in cache.data if k.startswith("blob:text:")]) == 1
+
+    entry = page_cache.put("https://a.com/y", _page("https://a.com/y", markdown="# Python"), body=HTML, extractor="selectolax@1")
+    assert entry.markdown_digest is not None
+    page_cache.store._hot.clear()
+    loaded = page_cache.load("https://a.com/y", entry, "selectolax@1")
+    assert loaded.text_markdown == "# Python"
+    assert loaded.text_plain == TEXT
+
+def test_load_from_disk_then_memory():
+    cache = DictCache()
+    store = TieredPageStore(cache)
+    page_cache = PageCache(cache, store=store)
+    page_cache.put("https://a.com/x", _page(), body=HTML, extractor="selectolax@1")
+    store._hot.clear()
+    store._hot_bytes = 0
+
+    entry = page_cache.get("https://a.com/x")
+    first = page_cache.load("https://a.com/x", entry, "selectolax@1")
+    second = page_cache.load("https://a.com/x", entry, "selectolax@1")
+    assert first.title == "Python" and first.text_plain == TEXT
+    assert store.counters["hits_disk"] == 1
+    assert store.counters["hits_memory"] == 1
+
+    # Returned pages are copies: mutations don't leak into the cache
+    second.text_plain = "mutated"
+    assert page_cache.load("https://a.com/x", entry, "selectolax@1").text_plain == TEXT
+
+def test_extractor_change_keeps_raw_html():
+    cache = DictCache()
+    page_cache = PageCache(cache, store=TieredPageStore(cache))
+    entry = page_cache.put("https://a.com/x", _page(), body=HTML, extractor="selectolax@1")
+    assert page_cache.load("https://a.com/x", entry, "selectolax@2") is None
+    assert page_cache.raw(entry) == HTML
+
+def test_hot_tier_respects_memory_limit():
+    store = TieredPageStore(DictCache(), memory_limit_bytes=10_000)
+    for i in range(10):
+        store.hot_put(f"k{i}", object(), 3_000)
+    stats = store.stats()
+    assert stats["memory_bytes"] <= 10_000
+    assert stats["memory_entries"] == 3
+    assert store.hot_get("k9") is not None
+    assert store.hot_get("k0") is None
+
+def test_instances_are_per_cache_dir(tmp_path):
+    from open_web_search.utils.cache import CacheManager
+    first = CacheManager.get_instance(cache_dir=str(tmp_path / "a"))
+    second = CacheManager.get_instance(cache_dir=str(tmp_path / "b"))
+
+    assert first is not second
+    assert CacheManager.get_instance(cache_dir=str(tmp_path / "a" / ".." / "a")) is first
+    assert TieredPageStore.get_instance(first) is not TieredPageStore.get_instance(second)
+    assert TieredPageStore.get_instance(first) is TieredPageStore.get_instance(first)
+
+    first.set("k", "only in a")
+    assert second.get("k") is None
+    assert {first.cache_dir, second.cache_dir} <= set(TieredPageStore.stats_all())
@@ -0,0 +1,93 @@
+import os
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from open_web_search.readers.pdf_reader import PdfReader, PdfTooLargeError, select_pages
+
+BODY = b"%PDF-1.4\n" + b"x" * 50_000
+LANDING = b"<html><head><title>Paper</title></head><body><main>" + b"<p>Abstract of the paper.</p>" * 10 + b"</main></body></html>"
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/pdf/landing":
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html")
+            self.send_header("Content-Length", str(len(LANDING)))
+            self.end_headers()
+            self.wfile.write(LANDING)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        if self.path == "/chunked.pdf":
+            # No Content-Length: only the streamed byte count can enforce the cap
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            for start in range(0, len(BODY), 8192):
+                part = BODY[start:start + 8192]
+                self.wfile.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+            self.wfile.write(b"0\r\n\r\n")
+            return
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+def test_select_pages_reads_lead_then_matching_sections():
+    sections = [("Introduction", 2), ("Related Work", 4), ("Energy Results", 7), ("Conclusion", 9)]
+    order = select_pages(10, sections, query="energy consumption results")
+    assert order[:4] == [0, 1, 7, 8]
+    assert sorted(order) == list(range(10))
+
+def test_select_pages_without_query_is_document_order():
+    assert select_pages(5, [("Results", 3)]) == [0, 1, 2, 3, 4]
+    assert select_pages(0, [], query="anything") == []
+
+@pytest.mark.asyncio
+async def test_small_pdf_stays_in_memory(local_server):
+    reader = PdfReader()
+    download = await reader._download(f"{local_server}/doc.pdf")
+    assert download.source == BODY
+    await reader.close()
+
+@pytest.mark.asyncio
+async def test_large_pdf_spills_to_tempfile(local_server):
+    reader = PdfReader(spill_bytes=10_000)
+    download = await reader._download(f"{local_server}/chunked.pdf")
+    try:
+        assert isinstance(download.source, str)
+        with open(download.source, "rb") as f:
+            assert f.read() == BODY
+    finally:
+        download.cleanup()
+    assert not os.path.exists(download.source)
+    await reader.close()
+
+@pytest.mark.asyncio
+async def test_pdf_over_max_bytes_is_rejected(local_server):
+    reader = PdfReader(max_bytes=20_000, spill_bytes=10_000)
+    with pytest.raises(PdfTooLargeError):
+        await reader._download(f"{local_server}/doc.pdf") # Declared length
+    with pytest.raises(PdfTooLargeError):
+        await reader._download(f"{local_server}/chunked.pdf") # Streamed
+    await reader.close()
+
+@pytest.mark.asyncio
+async def test_pdf_looking_url_serving_html_is_extracted_as_html(local_server):
+    reader = PdfReader(extraction_mode="thread")
+    page = (await reader.read_many([f"{local_server}/pdf/landing"]))[0]
+    await reader.close()
+
+    assert page.error is None
+    assert page.metadata == {"doc_type": "html"}
+    assert page.title == "Paper"
+    assert "Abstract of the paper." in page.text_plain
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+from open_web_search.config import LinkerConfig
+from open_web_search.schemas.results import PipelineOutput
+from open_web_search.server.pool import PipelinePool
+
+class FakePipeline:
+    def __init__(self, config: LinkerConfig):
+        self.config = config
+        self.runs = 0
+        self.started = False
+        self.closed = False
+
+    async def start(self):
+        self.started = True
+        return self
+
+    async def run(self, query: str) -> PipelineOutput:
+        self.runs += 1
+        await asyncio.sleep(0.05)
+        return PipelineOutput(query=query)
+
+    async def aclose(self):
+        self.closed = True
+
+class SlowStartPipeline(FakePipeline):
+    async def start(self):
+        await asyncio.sleep(0.2) # Model loads / browser launch
+        return await super().start()
+
+def _config():
+    return LinkerConfig(mode="fast")
+
+@pytest.mark.asyncio
+async def test_pool_coalesces_identical_concurrent_queries():
+    pool = PipelinePool(factory=FakePipeline)
+
+    outputs = await asyncio.gather(*[
+        pool.run(("fast",), _config, "What is Python?  ") for _ in range(20)
+    ] + [pool.run(("fast",), _config, "what is python?")])
+
+    pipeline = await pool.get(("fast",), _config)
+    assert pipeline.started
+    assert pipeline.runs == 1
+    assert pool.stats["coalesced"] == 20
+    assert all(o is outputs[0] for o in outputs)
+
+    # Once finished, the same query runs again
+    await pool.run(("fast",), _config, "what is python?")
+    assert pipeline.runs == 2
+
+@pytest.mark.asyncio
+async def test_pool_reuses_and_evicts_pipelines():
+    pool = PipelinePool(factory=FakePipeline, max_pipelines=2)
+
+    first = await pool.get("a", _config)
+    assert await pool.get("a", _config) is first
+    await pool.get("b", _config)
+    await pool.get("c", _config) # Evicts "a" (least recently used)
+
+    assert "a" not in pool
+    assert first.closed
+    assert pool.stats["pipelines_built"] == 3
+
+    await pool.aclose()
+    assert pool.snapshot()["pipelines"] == 0
+
+@pytest.mark.asyncio
+async def test_identical_requests_on_a_cold_key_coalesce():
+    pool = PipelinePool(factory=SlowStartPipeline)
+
+    first, second = await asyncio.gather(
+        pool.run("cold", _config, "what is python?"),
+        pool.run("cold", _config, "What is Python?")
+    )
+
+    pipeline = await pool.get("cold", _config)
+    assert first is second
+    assert pipeline.runs == 1
+    assert pool.stats["pipelines_built"] == 1
+    assert pool.stats["coalesced"] == 1
+
+@pytest.mark.asyncio
+async def test_cold_build_does_not_block_warm_keys():
+    pool = PipelinePool(factory=SlowStartPipeline)
+    await pool.get("warm", _config)
+
+    cold = asyncio.ensure_future(pool.get("cold", _config))
+    await asyncio.sleep(0.01) # Cold build is now starting
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    await pool.run("warm", _config, "quick question")
+    assert loop.time() - started < 0.15
+    assert not cold.done()
+
+    # Concurrent gets for the cold key share its single build
+    assert await asyncio.gather(cold, pool.get("cold", _config)) == [cold.result()] * 2
+    assert pool.stats["pipelines_built"] == 2
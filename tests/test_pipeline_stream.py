@@ -0,0 +1,315 @@
+import asyncio
+import pytest
+from typing import List
+from open_web_search.engines.base import BaseSearchEngine
+from open_web_search.readers.base import BaseReader
+from open_web_search.refiners.keyword import KeywordRefiner
+from open_web_search.schemas.results import SearchResult, FetchedPage
+
+PAGE_TEXT = "Python is a programming language. " * 20
+
+class FakeEngine(BaseSearchEngine):
+    async def search(self, queries: List[str]) -> List[SearchResult]:
+        results = []
+        for q in queries:
+            results.append(SearchResult(title=q, url=f"https://{q}.example.com", snippet="python snippet " * 5, source_engine="fake"))
+        return results
+
+class SlowReader(BaseReader):
+    """Every page is fast except the ones containing 'slow'."""
+    async def read_many(self, urls: List[str]) -> List[FetchedPage]:
+        pages = []
+        for url in urls:
+            await asyncio.sleep(5.0 if "slow" in url else 0.01)
+            pages.append(FetchedPage(url=url, status_code=200, text_plain=PAGE_TEXT))
+        return pages
+
+class FakePlanner:
+    def __init__(self, queries: List[str]):
+        self.queries = queries
+
+    async def plan(self, query, context=None):
+        return self.queries
+
+def _wire(pipeline, queries: List[str]):
+    pipeline.config.enable_stealth_escalation = False
+    pipeline.config.enable_result_cache = False
+    pipeline.health = None
+    pipeline.strategy = None
+    pipeline.engine = FakeEngine()
+    pipeline.reader = SlowReader()
+    pipeline.planner = FakePlanner(queries)
+    pipeline.refiner = KeywordRefiner(chunk_size=500, min_relevance=0.0)
+    return pipeline
+
+@pytest.mark.asyncio
+async def test_stream_yields_partial_events_and_done(pipeline):
+    _wire(pipeline, ["fast", "also-fast"])
+
+    events = [e async for e in pipeline.run_stream("python language")]
+    types = [e.type for e in events]
+
+    assert types[0] == "plan"
+    assert types[-1] == "done"
+    assert types.count("page") == 2
+    assert "evidence" in types
+    output = events[-1].output
+    assert len(output.pages) == 2
+    assert output.evidence
+    assert output.telemetry["stream"]["deadline_hit"] is False
+
+@pytest.mark.asyncio
+async def test_stream_deadline_returns_best_so_far(pipeline):
+    _wire(pipeline, ["fast", "slow"])
+
+    events = [e async for e in pipeline.run_stream("python language", deadline=1.0)]
+    output = events[-1].output
+
+    assert output.telemetry["stream"]["deadline_hit"] is True
+    assert output.elapsed_ms < 3000, "Slow URL should not gate the response"
+    assert [p.url for p in output.pages] == ["https://fast.example.com"]
+    assert output.evidence and all(c.url == "https://fast.example.com" for c in output.evidence)
+
+class ClosableReader(SlowReader):
+    def __init__(self):
+        self.close_calls = 0
+
+    async def close(self):
+        self.close_calls += 1
+
+@pytest.mark.asyncio
+async def test_pipeline_reuses_resources_across_runs(pipeline):
+    _wire(pipeline, ["fast", "also-fast"])
+    reader = ClosableReader()
+    pipeline.reader = reader
+
+    async with pipeline:
+        first = await pipeline.run("python language")
+        second = await pipeline.run("python language")
+        assert reader.close_calls == 0, "Reader must stay open between runs"
+
+    assert len(first.pages) == len(second.pages) == 2
+    assert reader.close_calls == 1
+    await pipeline.aclose()  # Idempotent
+    assert reader.close_calls == 1
+
+@pytest.mark.asyncio
+async def test_result_cache_short_circuits_repeat_queries(pipeline):
+    from open_web_search.utils.query_cache import QueryResultCache
+    _wire(pipeline, ["fast", "also-fast"])
+    pipeline.config.enable_result_cache = True
+    QueryResultCache.get_instance().clear()
+
+    first = await pipeline.run("Python   language?")
+    pipeline.reader = None # A cache hit must not touch the reader
+    second = await pipeline.run("python language")
+
+    assert first.telemetry["result_cache"]["status"] == "miss"
+    assert second.telemetry["result_cache"]["status"] == "hit"
+    assert second.telemetry["result_cache"]["match"] == "exact"
+    assert [c.chunk_id for c in second.evidence] == [c.chunk_id for c in first.evidence]
+    QueryResultCache.get_instance().clear()
+
+class EmbeddingKeywordRefiner(KeywordRefiner):
+    """Keyword refiner with a blocking embed_query that records which thread ran it."""
+    def __init__(self):
+        super().__init__(chunk_size=500, min_relevance=0.0)
+        self.threads = []
+
+    def embed_query(self, query: str):
+        import threading
+        import numpy as np
+        self.threads.append(threading.get_ident())
+        return np.ones(4, dtype=np.float32)
+
+@pytest.mark.asyncio
+async def test_result_cache_embeds_queries_off_the_event_loop(pipeline):
+    import threading
+    from open_web_search.utils.query_cache import QueryResultCache
+    _wire(pipeline, ["fast"])
+    pipeline.config.enable_result_cache = True
+    pipeline.config.result_cache_similarity = 0.9
+    pipeline.refiner = refiner = EmbeddingKeywordRefiner()
+    QueryResultCache.get_instance().clear()
+
+    await pipeline.run("python language")
+    second = await pipeline.run("python programming language")
+
+    assert second.telemetry["result_cache"]["match"] == "semantic"
+    assert len(refiner.threads) == 3 # Lookup miss, store, semantic lookup
+    assert threading.get_ident() not in refiner.threads
+    QueryResultCache.get_instance().clear()
+
+class BlockedReader(SlowReader):
+    """'blocked' hosts answer 403; records every URL it is asked for."""
+    def __init__(self):
+        self.requested = []
+
+    async def read_many(self, urls: List[str]) -> List[FetchedPage]:
+        self.requested.extend(urls)
+        await asyncio.sleep(0.02)
+        return [
+            FetchedPage(url=u, status_code=403, error="Blocked or failed. Status: 403") if "blocked" in u
+            else FetchedPage(url=u, status_code=200, text_plain=PAGE_TEXT)
+            for u in urls
+        ]
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_fetch_and_uses_snippet(pipeline):
+    from open_web_search.utils.health import DomainHealth
+    _wire(pipeline, ["fast", "blocked"])
+    pipeline.health = DomainHealth(DictCache(), failure_threshold=1)
+    pipeline.reader = reader = BlockedReader()
+
+    first = await pipeline.run("python language")
+    assert "https://blocked.example.com" in reader.requested
+    assert pipeline.health.state("https://blocked.example.com") == "open"
+
+    reader.requested.clear()
+    events = [e async for e in pipeline.run_stream("python language")]
+    second = events[-1].output
+
+    assert reader.requested == ["https://fast.example.com"], "Open circuit must skip the HTTP fetch"
+    snippet_page = next(p for p in second.pages if p.url == "https://blocked.example.com")
+    assert "Summary (from Search Engine)" in snippet_page.text_plain
+    assert len(first.pages) == len(second.pages) == 2
+
+class FakeBrowser(BlockedReader):
+    """Renders every page fine (JS sites included)."""
+    async def read_many(self, urls: List[str]) -> List[FetchedPage]:
+        self.requested.extend(urls)
+        return [FetchedPage(url=u, status_code=200, text_plain=PAGE_TEXT) for u in urls]
+
+@pytest.mark.asyncio
+async def test_learned_strategy_sends_js_host_straight_to_browser(pipeline):
+    from open_web_search.readers.strategy import FetchStrategyTable
+    _wire(pipeline, ["fast", "blocked"])
+    pipeline.config.enable_stealth_escalation = True
+    pipeline.strategy = FetchStrategyTable(DictCache(), min_samples=2, reprobe_every=100)
+    pipeline.reader = reader = BlockedReader()
+    pipeline._resilient_browser = browser = FakeBrowser()
+
+    for _ in range(2): # HTTP fails, browser recovers: the table learns
+        await pipeline.run("python language")
+    assert reader.requested.count("https://blocked.example.com") == 2
+
+    reader.requested.clear()
+    output = await pipeline.run("python language")
+
+    assert "https://blocked.example.com" not in reader.requested, "Learned route must skip the HTTP attempt"
+    assert browser.requested[-1] == "https://blocked.example.com"
+    assert output.telemetry["fetch_routing"]["direct_browser"] == 1
+    assert output.telemetry["fetch_routing"]["est_time_saved_ms"] > 0
+    assert len(output.pages) == 2
+
+class BrowserOnlyStrategy:
+    """Learned table that would send every URL to the browser."""
+    def choose(self, url):
+        return "browser", "learned: http fails, browser works", 1500.0
+
+@pytest.mark.asyncio
+async def test_half_open_probe_is_not_rerouted_by_strategy(pipeline):
+    import time
+    from open_web_search.utils.health import DomainHealth
+    _wire(pipeline, ["fast"])
+    pipeline.config.enable_stealth_escalation = True
+    pipeline.health = health = DomainHealth(DictCache(), failure_threshold=1, open_seconds=0.01)
+    pipeline.strategy = BrowserOnlyStrategy()
+    health.record_fetch("https://blocked.example.com/a", 503, "down", None)
+    time.sleep(0.02)
+
+    fetch_urls, browser_urls, _ = pipeline._route_reads(
+        ["https://blocked.example.com/b", "https://fast.example.com"], "req_test"
+    )
+
+    assert fetch_urls == ["https://blocked.example.com/b"], "The half-open probe must go over HTTP"
+    assert browser_urls == ["https://fast.example.com"]
+
+class OriginReader(SlowReader):
+    """'throttled' hosts are refused by our own scheduler, 'cached' ones come from the page cache."""
+    async def read_many(self, urls: List[str]) -> List[FetchedPage]:
+        from open_web_search.utils.scheduler import HostThrottledError, throttled_page
+        pages = []
+        for u in urls:
+            if "throttled" in u:
+                pages.append(throttled_page(u, HostThrottledError("backing off")))
+                continue
+            page = FetchedPage(url=u, status_code=200, text_plain=PAGE_TEXT)
+            if "cached" in u:
+                page._fetch_origin = "cache"
+            pages.append(page)
+        return pages
+
+class RecordingStrategy:
+    def __init__(self):
+        self.recorded = []
+
+    def choose(self, url):
+        return "fetch", None, 0.0
+
+    def record(self, url, fetcher, ok, latency_ms):
+        self.recorded.append((url, fetcher, ok))
+
+@pytest.mark.asyncio
+async def test_throttled_fetches_are_not_held_against_the_host(pipeline):
+    from open_web_search.utils.health import DomainHealth
+    _wire(pipeline, ["fast", "throttled"])
+    pipeline.health = health = DomainHealth(DictCache(), failure_threshold=1)
+    pipeline.strategy = strategy = RecordingStrategy()
+    pipeline.reader = OriginReader()
+
+    await pipeline.run("python language")
+
+    assert health.state("https://throttled.example.com") == "closed"
+    assert health.negative("https://throttled.example.com") is None
+    assert [url for url, _, _ in strategy.recorded] == ["https://fast.example.com"]
+
+@pytest.mark.asyncio
+async def test_cached_pages_do_not_close_a_half_open_circuit(pipeline):
+    import time
+    from open_web_search.utils.health import DomainHealth
+    _wire(pipeline, ["cached"])
+    pipeline.health = health = DomainHealth(DictCache(), failure_threshold=1, open_seconds=0.01)
+    pipeline.strategy = strategy = RecordingStrategy()
+    pipeline.reader = OriginReader()
+    health.record_fetch("https://cached.example.com/x", 503, "down", None)
+    time.sleep(0.02)
+
+    await pipeline.run("python language") # Gets the probe slot, but the page comes from cache
+
+    assert health.state("https://cached.example.com") == "half_open"
+    assert strategy.recorded == []
+    assert health.route("https://cached.example.com/live")[0] == "fetch" # The probe slot was handed back
+
+class CountingRefiner(KeywordRefiner):
+    """Stands in for a cross-encoder refiner: counts how many pages each refine() call scores."""
+    def __init__(self):
+        super().__init__(chunk_size=500, min_relevance=0.0)
+        self.calls = []
+
+    async def refine(self, pages, query):
+        self.calls.append(len(pages))
+        return await super().refine(pages, query)
+
+@pytest.mark.asyncio
+async def test_stream_runs_the_model_reranker_only_in_the_final_pass(basic_config):
+    from open_web_search.core.pipeline import AsyncPipeline
+    basic_config.reranker_type = "flash"
+    pipeline = _wire(AsyncPipeline(config=basic_config), ["fast", "also-fast"])
+    pipeline.refiner = model = CountingRefiner()
+
+    events = [e async for e in pipeline.run_stream("python language")]
+
+    assert any(e.type == "evidence" for e in events) # Streamed pages are scored with BM25
+    assert model.calls == [2] # One model pass over every page
+    assert events[-1].output.evidence
@@ -0,0 +1,72 @@
+import time
+import numpy as np
+from open_web_search.config import LinkerConfig
+from open_web_search.schemas.results import PipelineOutput, EvidenceChunk
+from open_web_search.utils.query_cache import QueryResultCache
+
+def _output(query: str) -> PipelineOutput:
+    return PipelineOutput(query=query, evidence=[
+        EvidenceChunk(url="https://a.com", chunk_id="c1", content="answer", relevance_score=0.9)
+    ])
+
+def test_exact_hit_uses_normalized_query_and_fingerprint():
+    cache = QueryResultCache()
+    fp = QueryResultCache.fingerprint(LinkerConfig(mode="fast"))
+    cache.put("What is Python?", fp, _output("What is Python?"), ttl=60)
+
+    hit = cache.get_exact("  what is   python ", fp)
+    assert hit is not None
+    output, age = hit
+    assert output.evidence[0].chunk_id == "c1"
+
+    # Different config => different fingerprint => miss
+    other_fp = QueryResultCache.fingerprint(LinkerConfig(mode="deep"))
+    assert cache.get_exact("what is python", other_fp) is None
+    # Context is part of the fingerprint too
+    assert QueryResultCache.fingerprint(LinkerConfig(mode="fast"), {"blocked_domains": ["x.com"]}) != fp
+
+def test_semantic_hit_respects_threshold():
+    cache = QueryResultCache()
+    fp = "fp"
+    cache.put("python release date", fp, _output("python release date"), ttl=60, embedding=np.array([1.0, 0.0, 0.0]))
+
+    near = cache.get_similar(np.array([0.99, 0.05, 0.0]), fp, threshold=0.95)
+    assert near is not None and near[1] > 0.95
+
+    assert cache.get_similar(np.array([0.0, 1.0, 0.0]), fp, threshold=0.95) is None
+    assert cache.get_similar(np.array([1.0, 0.0, 0.0]), "other-fp", threshold=0.95) is None
+
+def test_ttl_and_lru_eviction():
+    cache = QueryResultCache(max_entries=2)
+    cache.put("a", "fp", _output("a"), ttl=0)
+    time.sleep(0.01)
+    assert cache.get_exact("a", "fp") is None
+
+    cache.put("a", "fp", _output("a"), ttl=60)
+    cache.put("b", "fp", _output("b"), ttl=60)
+    cache.get_exact("a", "fp") # "a" becomes most recently used
+    cache.put("c", "fp", _output("c"), ttl=60)
+
+    assert cache.get_exact("b", "fp") is None
+    assert cache.get_exact("a", "fp") is not None
+    assert cache.stats["evictions"] == 1
+
+def test_cached_output_is_isolated_from_mutation():
+    cache = QueryResultCache()
+    original = _output("q")
+    cache.put("q", "fp", original, ttl=60)
+    original.evidence.clear()
+
+    output, _ = cache.get_exact("q", "fp")
+    output.evidence[0].content = "changed"
+    assert cache.get_exact("q", "fp")[0].evidence[0].content == "answer"
+
+def test_fingerprint_ignores_cache_neutral_fields():
+    neutral = LinkerConfig.cache_neutral_fields()
+    assert {"llm_api_key", "reranker_token_budget", "page_cache_memory_mb"} <= neutral
+    assert "chunk_size" not in neutral
+
+    base = QueryResultCache.fingerprint(LinkerConfig(mode="fast"))
+    tuned = LinkerConfig(mode="fast", reranker_token_budget=2048, embedding_cache_size=10, llm_api_key="secret")
+    assert QueryResultCache.fingerprint(tuned) == base
+    assert QueryResultCache.fingerprint(LinkerConfig(mode="fast", chunk_size=300)) != base
@@ -0,0 +1,30 @@
+from open_web_search.readers.router import current_extractor, looks_like_pdf_url, sniff_document_type
+
+def test_magic_bytes_beat_declared_type():
+    assert sniff_document_type("text/html", b"%PDF-1.5\n...", "https://a.com/view") == "pdf"
+    assert sniff_document_type("application/octet-stream", b"\n%PDF-1.4", "https://a.com/dl?id=1") == "pdf"
+
+def test_declared_content_types():
+    assert sniff_document_type("text/html; charset=utf-8", b"{}") == "html"
+    assert sniff_document_type("application/ld+json", b"<p>") == "json"
+    assert sniff_document_type("application/rss+xml", b"") == "xml"
+    assert sniff_document_type("text/xml", b"") == "xml"
+    assert sniff_document_type("text/plain", b"hello") == "text"
+    assert sniff_document_type("application/xhtml+xml", b"") == "html"
+
+def test_body_shape_and_url_fallbacks():
+    assert sniff_document_type(None, b"\xef\xbb\xbf  <!DOCTYPE html><html>") == "html"
+    assert sniff_document_type("", b"<?xml version='1.0'?><rss>") == "xml"
+    assert sniff_document_type(None, b'  [{"a": 1}]') == "json"
+    assert sniff_document_type(None, b"plain words", "https://a.com/notes.txt") == "text"
+    assert sniff_document_type(None, b"plain words", "https://a.com/page") == "html"
+
+def test_pdf_url_guess_ignores_query_string():
+    assert looks_like_pdf_url("https://a.com/paper.pdf?download=1")
+    assert looks_like_pdf_url("https://arxiv.org/pdf/2401.00001")
+    assert not looks_like_pdf_url("https://a.com/pdf-tools")
+
+def test_current_extractor_keeps_document_type():
+    assert current_extractor("json@1", "selectolax@1") == "json@1"
+    assert current_extractor("selectolax@1", "selectolax@2") == "selectolax@2"
+    assert current_extractor(None, "trafilatura@1") == "trafilatura@1"
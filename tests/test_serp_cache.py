@@ -0,0 +1,79 @@
+import asyncio
+import pytest
+from typing import List
+from open_web_search.engines.base import BaseSearchEngine
+from open_web_search.engines.cached import CachedSearchEngine
+from open_web_search.schemas.results import SearchResult
+
+class DictCache:
+    """In-memory stand-in for CacheManager."""
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+class CountingEngine(BaseSearchEngine):
+    def __init__(self, region: str = "us-en"):
+        self.region = region
+        self.calls = []
+
+    async def search(self, queries: List[str]) -> List[SearchResult]:
+        self.calls.extend(queries)
+        return [SearchResult(title=q, url=f"https://example.com/{len(self.calls)}", source_engine="fake") for q in queries]
+
+@pytest.mark.asyncio
+async def test_serp_cache_hits_normalized_query():
+    engine = CountingEngine()
+    cached = CachedSearchEngine(engine, cache=DictCache())
+
+    first = await cached.search(["Python Asyncio"])
+    second = await cached.search(["  python   asyncio "])
+
+    assert engine.calls == ["Python Asyncio"]
+    assert [r.url for r in first] == [r.url for r in second]
+    assert cached.stats == {"hits": 1, "stale_hits": 0, "misses": 1, "refreshes": 0}
+
+@pytest.mark.asyncio
+async def test_serp_cache_key_includes_region():
+    cache = DictCache()
+    await CachedSearchEngine(CountingEngine(region="us-en"), cache=cache).search(["python"])
+    kr_engine = CountingEngine(region="kr-kr")
+    await CachedSearchEngine(kr_engine, cache=cache).search(["python"])
+    assert kr_engine.calls == ["python"]
+
+def test_news_queries_get_short_ttl():
+    cached = CachedSearchEngine(CountingEngine(), ttl=3600, news_ttl=60, cache=DictCache())
+    assert cached.ttl_for("latest AI news") == 60
+    assert cached.ttl_for("election results 2026") == 60
+    assert cached.ttl_for("how does TCP slow start work") == 3600
+
+@pytest.mark.asyncio
+async def test_stale_while_revalidate():
+    engine = CountingEngine()
+    cached = CachedSearchEngine(engine, ttl=0, news_ttl=0, stale_ttl=60, cache=DictCache())
+
+    first = await cached.search(["python"])
+    stale = await cached.search(["python"]) # Expired but within stale window
+
+    assert [r.url for r in stale] == [r.url for r in first], "Stale SERP served immediately"
+    await asyncio.gather(*cached._refresh_tasks)
+    assert engine.calls == ["python", "python"]
+    assert cached.stats["stale_hits"] == 1
+    assert cached.stats["refreshes"] == 1
+
+@pytest.mark.asyncio
+async def test_empty_results_are_not_cached():
+    class EmptyEngine(CountingEngine):
+        async def search(self, queries):
+            self.calls.extend(queries)
+            return []
+
+    engine = EmptyEngine()
+    cached = CachedSearchEngine(engine, cache=DictCache())
+    await cached.search(["python"])
+    await cached.search(["python"])
+    assert engine.calls == ["python", "python"]
@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from open_web_search.readers.v2_reader import V2Reader
+from open_web_search.schemas.results import FetchedPage
+from open_web_search.utils.cache import PageCache
+
+ARTICLE = "<html><body><nav>menu</nav><article>" + "<p>Python is a programming language.</p>" * 20 + "</article></body></html>"
+
+# Non-HTML bodies whose URLs give no hint of their type
+DOCUMENTS = {
+    "/download?id=7": ("application/octet-stream", b"%PDF-1.7\n%binary report"),
+    "/api/items": ("application/json", b'{"title": "Items", "items": [{"name": "Python", "kind": "language"}]}'),
+    "/feed": ("application/rss+xml", b"<?xml version='1.0'?><rss><channel><title>News</title>"
+              b"<item><title>Python 4 released</title><description><![CDATA[<p>Big <b>news</b></p>]]></description></item>"
+              b"</channel></rss>"),
+}
+
+class _Handler(BaseHTTPRequestHandler):
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+    throttled = set()
+    full_bodies = 0
+
+    def do_GET(self):
+        if self.path in DOCUMENTS:
+            content_type, body = DOCUMENTS[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            _Handler.full_bodies += 1
+            return
+        if self.path.startswith("/etag") and self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.send_header("ETag", '"v1"')
+            self.end_headers()
+            return
+        if self.path.startswith("/throttled") and self.path not in _Handler.throttled:
+            _Handler.throttled.add(self.path)
+            self.send_response(429)
+            self.send_header("Retry-After", "0.3")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        with _Handler.lock:
+            _Handler.active += 1
+            _Handler.peak = max(_Handler.peak, _Handler.active)
+        time.sleep(0.1)
+        body = ARTICLE.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        if self.path.startswith("/etag"):
+            self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+        _Handler.full_bodies += 1
+        with _Handler.lock:
+            _Handler.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+class NullCache:
+    def get(self, key):
+        return None
+
+    def __contains__(self, key):
+        return False
+
+    def set(self, key, value, expire=None):
+        pass
+
+class DictCache:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, expire=None):
+        self.data[key] = value
+
+    def __contains__(self, key):
+        return key in self.data
+
+@pytest.fixture
+def local_server():
+    _Handler.active = _Handler.peak = 0
+    _Handler.throttled = set()
+    _Handler.full_bodies = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+@pytest.mark.asyncio
+async def test_v2_reader_async_fetch_respects_per_host_cap(local_server, tmp_path):
+    reader = V2Reader(concurrency=8, max_per_host=2, cache_dir=str(tmp_path))
+    reader.page_cache = PageCache(NullCache()) # Force network
+
+    urls = [f"{local_server}/page{i}" for i in range(6)]
+    pages = await reader.read_many(urls)
+    await reader.close()
+
+    assert [p.status_code for p in pages] == [200] * 6
+    assert all("Python is a programming language." in p.text_plain for p in pages)
+    assert "menu" not in pages[0].text_plain
+    assert _Handler.peak <= 2
+
+@pytest.mark.asyncio
+async def test_v2_reader_retries_after_429(local_server, tmp_path):
+    reader = V2Reader(concurrency=4, cache_dir=str(tmp_path))
+    reader.page_cache = PageCache(NullCache())
+
+    start = time.perf_counter()
+    pages = await reader.read_many([f"{local_server}/throttled"])
+    elapsed = time.perf_counter() - start
+    await reader.close()
+
+    assert pages[0].status_code == 200
+    assert elapsed >= 0.3 # Honored Retry-After before retrying
+    assert reader.scheduler.stats["throttled"] == 1
+
+@pytest.mark.asyncio
+async def test_v2_reader_revalidates_expired_page_with_etag(local_server, tmp_path):
+    page_cache = PageCache(DictCache(), namespace="v2page", ttl=0)
+    reader = V2Reader(concurrency=2, cache_dir=str(tmp_path), page_cache=page_cache)
+    url = f"{local_server}/etag"
+
+    first = (await reader.read_many([url]))[0]
+    second = (await reader.read_many([url]))[0] # expired (ttl=0) -> conditional GET -> 304
+    await reader.close()
+
+    assert second.text_plain == first.text_plain
+    assert first._fetch_origin is None and second._fetch_origin == "cache"
+    assert _Handler.full_bodies == 1
+    assert page_cache.stats["revalidated"] == 1
+    assert page_cache.get(url).etag == '"v1"'
+
+@pytest.mark.asyncio
+async def test_v2_reader_skips_extraction_for_unchanged_body(local_server, tmp_path):
+    page_cache = PageCache(DictCache(), namespace="v2page", ttl=0)
+    reader = V2Reader(concurrency=2, cache_dir=str(tmp_path), page_cache=page_cache)
+    url = f"{local_server}/no-validators"
+
+    await reader.read_many([url])
+    await reader.read_many([url]) # No ETag: full 200, but the body hash matches
+    await reader.close()
+
+    assert _Handler.full_bodies == 2
+    assert page_cache.stats["unchanged_body"] == 1
+
+@pytest.mark.asyncio
+async def test_v2_reader_reextracts_from_raw_html_on_extractor_change(local_server, tmp_path):
+    page_cache = PageCache(DictCache(), namespace="v2page")
+    reader = V2Reader(concurrency=2, cache_dir=str(tmp_path), page_cache=page_cache)
+    url = f"{local_server}/page"
+
+    await reader.read_many([url])
+    reader.extractor = "selectolax@999" # Simulates an extraction logic upgrade
+    page = (await reader.read_many([url]))[0]
+    await reader.close()
+
+    assert "Python is a programming language." in page.text_plain
+    assert _Handler.full_bodies == 1 # No refetch
+    assert page_cache.counters["reextracted"] == 1
+
+class FakePdfReader:
+    def __init__(self):
+        self.bodies = []
+
+    async def parse(self, url, source, query=None, final_url=None, status_code=200):
+        self.bodies.append(source)
+        return FetchedPage(url=url, status_code=200, text_plain="parsed pdf", metadata={"doc_type": "pdf"})
+
+@pytest.mark.asyncio
+async def test_v2_reader_hands_sniffed_pdf_to_pdf_reader_without_refetch(local_server, tmp_path):
+    pdf_reader = FakePdfReader()
+    reader = V2Reader(concurrency=2, cache_dir=str(tmp_path), page_cache=PageCache(DictCache()), pdf_reader=pdf_reader)
+
+    page = (await reader.read_many([f"{local_server}/download?id=7"]))[0]
+    await reader.close()
+
+    assert page.text_plain == "parsed pdf"
+    assert pdf_reader.bodies == [DOCUMENTS["/download?id=7"][1]]
+    assert _Handler.full_bodies == 1
+
+@pytest.mark.asyncio
+async def test_v2_reader_routes_json_and_feeds(local_server, tmp_path):
+    page_cache = PageCache(DictCache())
+    reader = V2Reader(concurrency=2, cache_dir=str(tmp_path), page_cache=page_cache)
+
+    api, feed = await reader.read_many([f"{local_server}/api/items", f"{local_server}/feed"])
+    cached = (await reader.read_many([f"{local_server}/feed"]))[0]
+    await reader.close()
+
+    assert api.metadata == {"doc_type": "json"}
+    assert "items.name: Python" in api.text_plain and api.title == "Items"
+    assert feed.metadata == {"doc_type": "xml"} and feed.title == "News"
+    assert "Python 4 released\nBig news" in feed.text_plain
+    # Served from cache under its own extractor id, not re-extracted as HTML
+    assert cached.text_plain == feed.text_plain
+    assert page_cache.get(f"{local_server}/feed").extractor == "xml@1"
+    assert _Handler.full_bodies == 2